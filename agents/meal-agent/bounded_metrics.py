@@ -0,0 +1,123 @@
+"""
+Bounded Agent Metrics for HOH Meal Agent
+
+strands' EventLoopMetrics keeps every trace, cycle duration and agent
+invocation for the life of the agent. Cached agents live as long as the
+warm container, so that history (traces hold whole tool result
+messages) grows with every request and get_summary() walks all of it.
+
+BoundedEventLoopMetrics keeps traces, cycle durations and invocations in
+ring buffers and starts a fresh window whenever the agent is invoked
+(strands calls reset_usage_metrics() at the start of each invocation).
+cycle_count, tool_metrics and accumulated_usage - what AgentResult.metrics
+reports - then describe the current invocation only. Totals for the
+container's lifetime are kept as rolling aggregates: counts, sums and a
+cycle duration histogram.
+"""
+
+import os
+import bisect
+from collections import Counter, deque
+from typing import Any, Dict, List
+
+from strands.telemetry.metrics import AgentInvocation, EventLoopMetrics, Trace
+from strands.types.content import Message
+from strands.types.event_loop import Metrics, Usage
+from strands.types.tools import ToolUse
+
+METRICS_MAX_TRACES = int(os.getenv('METRICS_MAX_TRACES', '50'))
+METRICS_MAX_INVOCATIONS = int(os.getenv('METRICS_MAX_INVOCATIONS', '4'))
+
+# Upper bounds (seconds) of the cycle duration histogram; the last bucket is open-ended
+CYCLE_DURATION_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+USAGE_KEYS = ('inputTokens', 'outputTokens', 'totalTokens', 'cacheReadInputTokens', 'cacheWriteInputTokens')
+
+
+class BoundedEventLoopMetrics(EventLoopMetrics):
+    """EventLoopMetrics with O(1) retention and per-invocation windows.
+
+    Args:
+        max_traces: Cycle traces and durations kept for the current window
+        max_invocations: AgentInvocation records kept
+        reset_per_invocation: Start a fresh window at every invocation
+    """
+
+    def __init__(
+        self,
+        max_traces: int = METRICS_MAX_TRACES,
+        max_invocations: int = METRICS_MAX_INVOCATIONS,
+        reset_per_invocation: bool = True,
+    ):
+        super().__init__()
+        self.reset_per_invocation = reset_per_invocation
+        self.traces = deque(maxlen=max_traces)
+        self.cycle_durations = deque(maxlen=max_traces)
+        self.agent_invocations = deque(maxlen=max_invocations)
+
+        # Window duration is summed separately: the ring buffer may have dropped cycles
+        self.window_seconds = 0.0
+        self.totals: Counter = Counter()
+        self.cycle_histogram: List[int] = [0] * (len(CYCLE_DURATION_BUCKETS) + 1)
+
+    def reset(self) -> None:
+        """Start a new window with an empty invocation; lifetime totals are kept."""
+        self.cycle_count = 0
+        self.tool_metrics = {}
+        self.traces.clear()
+        self.cycle_durations.clear()
+        self.agent_invocations.clear()
+        self.accumulated_usage = Usage(inputTokens=0, outputTokens=0, totalTokens=0)
+        self.accumulated_metrics = Metrics(latencyMs=0)
+        self.window_seconds = 0.0
+        # Cycles always record into the latest invocation
+        self.agent_invocations.append(AgentInvocation())
+
+    def reset_usage_metrics(self) -> None:
+        if self.reset_per_invocation:
+            self.reset()
+        else:
+            super().reset_usage_metrics()
+        self.totals['invocations'] += 1
+
+    def start_cycle(self, attributes: Dict[str, Any]) -> Any:
+        self.totals['cycles'] += 1
+        return super().start_cycle(attributes)
+
+    def end_cycle(self, start_time: float, cycle_trace: Trace, attributes: Any = None) -> None:
+        super().end_cycle(start_time, cycle_trace, attributes)
+        duration = self.cycle_durations[-1]
+        self.window_seconds += duration
+        self.totals['cycleSeconds'] += duration
+        self.cycle_histogram[bisect.bisect_left(CYCLE_DURATION_BUCKETS, duration)] += 1
+
+    def add_tool_usage(self, tool: ToolUse, duration: float, tool_trace: Trace, success: bool, message: Message) -> None:
+        super().add_tool_usage(tool, duration, tool_trace, success, message)
+        self.totals['toolCalls'] += 1
+        self.totals['toolErrors'] += int(not success)
+        self.totals['toolSeconds'] += duration
+
+    def update_usage(self, usage: Usage) -> None:
+        super().update_usage(usage)
+        for key in USAGE_KEYS:
+            self.totals[key] += usage.get(key, 0)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """strands' summary for the current window, plus lifetime aggregates."""
+        summary = super().get_summary()
+        summary['total_duration'] = self.window_seconds
+        summary['average_cycle_time'] = self.window_seconds / self.cycle_count if self.cycle_count else 0
+        summary['lifetime'] = self.lifetime_summary()
+        return summary
+
+    def lifetime_summary(self) -> Dict[str, Any]:
+        """Counts, sums and the cycle duration histogram since the agent was created."""
+        cycles = self.totals['cycles']
+        labels = [f"le{bound:g}s" for bound in CYCLE_DURATION_BUCKETS] + ['inf']
+        return {
+            **{key: self.totals[key] for key in ('invocations', 'cycles', 'toolCalls', 'toolErrors') + USAGE_KEYS},
+            'cycleSeconds': self.totals['cycleSeconds'],
+            'toolSeconds': self.totals['toolSeconds'],
+            'averageCycleSeconds': self.totals['cycleSeconds'] / cycles if cycles else 0,
+            'cycleHistogram': dict(zip(labels, self.cycle_histogram)),
+        }
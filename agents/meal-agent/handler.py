@@ -9,11 +9,14 @@ using the Meal Recommendation Agent.
 import os
 import json
 import logging
+from collections import OrderedDict
 from typing import Any, Dict
 
 from strands import Agent
 from strands.models import BedrockModel
 
+from bounded_metrics import BoundedEventLoopMetrics
+
 # Import tools
 from tools.dynamo_tools import (
     get_family_members,
@@ -58,44 +61,61 @@ You have access to tools that let you:
 - Be conversational and explain your reasoning
 """
 
-# Cache for agent instances (warm starts)
-_agent_cache: Dict[str, Agent] = {}
+# Cache for agent instances (warm starts), bounded with LRU eviction
+MAX_CACHED_AGENTS = int(os.getenv('MAX_CACHED_AGENTS', '32'))
+_agent_cache: 'OrderedDict[str, Agent]' = OrderedDict()
+
+# Model client shared by all cached agents
+_model = None
 
 
 def get_agent(household_id: str) -> Agent:
     """
     Get or create an agent instance for the given household.
-    Uses caching for Lambda warm starts.
+    Uses an LRU cache for Lambda warm starts so mixed-household traffic
+    reuses agents without growing memory without bound.
     """
-    if household_id not in _agent_cache:
-        model = BedrockModel(
+    global _model
+
+    if household_id in _agent_cache:
+        _agent_cache.move_to_end(household_id)
+        return _agent_cache[household_id]
+
+    if _model is None:
+        _model = BedrockModel(
             model_id=os.getenv('MODEL_ID', 'us.anthropic.claude-sonnet-4-5-20250929-v1:0'),
             region_name=os.getenv('AWS_REGION', 'us-east-1')
         )
 
-        system_prompt = SYSTEM_PROMPT + f"\n\n## Context\nHousehold: {household_id}"
-
-        agent = Agent(
-            model=model,
-            system_prompt=system_prompt,
-            tools=[
-                get_family_members,
-                get_family_preferences,
-                get_meal_plan,
-                save_meal_plan,
-                get_aggregated_dietary_needs,
-                search_recipes,
-                search_recipes_by_ingredients,
-                get_recipe_details,
-                generate_meal_plan_from_api,
-                get_random_recipes,
-            ]
-        )
-
-        _agent_cache[household_id] = agent
-        logger.info(f"Created new agent for household: {household_id}")
-
-    return _agent_cache[household_id]
+    system_prompt = SYSTEM_PROMPT + f"\n\n## Context\nHousehold: {household_id}"
+
+    agent = Agent(
+        model=_model,
+        system_prompt=system_prompt,
+        tools=[
+            get_family_members,
+            get_family_preferences,
+            get_meal_plan,
+            save_meal_plan,
+            get_aggregated_dietary_needs,
+            search_recipes,
+            search_recipes_by_ingredients,
+            get_recipe_details,
+            generate_meal_plan_from_api,
+            get_random_recipes,
+        ]
+    )
+    # Bounded, per-invocation metrics so long-lived cached agents stay O(1) in memory
+    agent.event_loop_metrics = BoundedEventLoopMetrics()
+
+    _agent_cache[household_id] = agent
+    logger.info(f"Created new agent for household: {household_id}")
+
+    while len(_agent_cache) > MAX_CACHED_AGENTS:
+        evicted, _ = _agent_cache.popitem(last=False)
+        logger.info(f"Evicted cached agent for household: {evicted}")
+
+    return agent
 
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
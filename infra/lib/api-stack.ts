@@ -231,6 +231,7 @@ export class ApiStack extends cdk.Stack {
         USERS_TABLE: usersTable.tableName,
         MEAL_PLANS_TABLE: mealPlansTable.tableName,
         SPOONACULAR_SECRET_NAME: 'hoh/spoonacular-api-key',
+        RECIPE_CACHE_TABLE: mealPlansTable.tableName, // Shared recipe details cache (RECIPE#<id>)
         MODEL_ID: 'us.anthropic.claude-3-5-haiku-20241022-v1:0', // Using Haiku for cost efficiency
         ALLOWED_ORIGINS: allowedOrigins.join(','),
         LOG_LEVEL: 'INFO',
@@ -257,6 +258,16 @@ export class ApiStack extends cdk.Stack {
       ],
     }));
 
+    // Allow the meal agent to invoke itself for async plan generation jobs
+    // (ARN pattern avoids a circular dependency between the function and its role)
+    mealAgentFn.addToRolePolicy(new iam.PolicyStatement({
+      effect: iam.Effect.ALLOW,
+      actions: ['lambda:InvokeFunction'],
+      resources: [
+        `arn:aws:lambda:${this.region}:${this.account}:function:${this.stackName}-MealAgentFn*`,
+      ],
+    }));
+
     // Allow generatePlanFn to invoke the meal agent
     mealAgentFn.grantInvoke(generatePlanFn);
 
@@ -52,6 +52,7 @@ export class DataStack extends cdk.Stack {
     // Meal Plans table - stores generated meal plans and shopping lists
     // PK: HOUSEHOLD#<householdId>
     // SK: PLAN#<startDate> | LIST#<planId>
+    // Also holds the agent's shared recipe cache: PK: RECIPE#<recipeId>, SK: DETAILS
     this.mealPlansTable = new dynamodb.Table(this, 'MealPlansTable', {
       tableName: 'hoh-meal-plans-2026',
       partitionKey: {
@@ -0,0 +1,164 @@
+"""
+Agent Pool for HOH Meal Agent
+
+Warm Lambda containers serve requests for many households. Instead of
+keeping a single agent (rebuilt whenever the household changes) or an
+unbounded cache, agents are kept in an LRU pool keyed by household and
+session, bounded by both agent count and an estimate of conversation
+memory.
+
+Only the per-household parts (system prompt, conversation) live on each
+agent. The model client, tool registry and tool specs are built once per
+container and shared by every pooled agent. Each agent's event loop
+metrics are bounded and reset per invocation (see bounded_metrics), so a
+long-lived agent does not accumulate traces.
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from strands import Agent
+from strands.tools.registry import ToolRegistry
+
+from bounded_metrics import BoundedEventLoopMetrics
+
+logger = logging.getLogger()
+
+AGENT_POOL_MAX_AGENTS = int(os.getenv('AGENT_POOL_MAX_AGENTS', '32'))
+AGENT_POOL_MAX_BYTES = int(os.getenv('AGENT_POOL_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Rough fixed cost of an agent object beyond its conversation history
+AGENT_BASE_BYTES = 64 * 1024
+
+PoolKey = Tuple[str, str]
+
+
+class SharedToolRegistry(ToolRegistry):
+    """Tool registry shared across pooled agents.
+
+    The HOH tool set never changes after start-up, so the normalized and
+    validated tool config is computed once and reused on every model call
+    instead of being rebuilt per cycle. Temporary tools (e.g. structured
+    output) change the registered names and bypass the memoized config.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._config_cache: Optional[Tuple[Tuple[str, ...], Dict[str, Any]]] = None
+
+    def get_all_tools_config(self) -> Dict[str, Any]:
+        names = tuple(sorted(self.registry)) + tuple(sorted(self.dynamic_tools))
+        if self._config_cache is not None and self._config_cache[0] == names:
+            return self._config_cache[1]
+
+        config = super().get_all_tools_config()
+        self._config_cache = (names, config)
+        return config
+
+
+def build_shared_tool_registry(tools: List[Any]) -> SharedToolRegistry:
+    """Register the tools once for every agent in the container."""
+    registry = SharedToolRegistry()
+    registry.process_tools(tools)
+    registry.initialize_tools(False)
+    return registry
+
+
+def create_pooled_agent(model: Any, tool_registry: ToolRegistry, system_prompt: Any, **kwargs: Any) -> Agent:
+    """Create an agent that reuses a shared model and tool registry."""
+    agent = Agent(model=model, system_prompt=system_prompt, **kwargs)
+    agent.tool_registry = tool_registry
+    agent.event_loop_metrics = BoundedEventLoopMetrics()
+    return agent
+
+
+def estimate_agent_bytes(agent: Any) -> int:
+    """Approximate an agent's memory footprint from its conversation history."""
+    try:
+        return AGENT_BASE_BYTES + len(json.dumps(agent.messages, default=str))
+    except Exception:
+        return AGENT_BASE_BYTES
+
+
+class AgentPool:
+    """LRU pool of agents keyed by (household, session), bounded by count and bytes."""
+
+    def __init__(
+        self,
+        create_agent: Callable[[str], Any],
+        max_agents: int = AGENT_POOL_MAX_AGENTS,
+        max_bytes: int = AGENT_POOL_MAX_BYTES,
+        estimate_bytes: Callable[[Any], int] = estimate_agent_bytes,
+    ):
+        self.create_agent = create_agent
+        self.max_agents = max_agents
+        self.max_bytes = max_bytes
+        self.estimate_bytes = estimate_bytes
+
+        self._agents: 'OrderedDict[PoolKey, Any]' = OrderedDict()
+        self._sizes: Dict[PoolKey, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _key(household_id: str, session_id: Optional[str]) -> PoolKey:
+        return household_id, session_id or 'default'
+
+    def get(self, household_id: str, session_id: Optional[str] = None) -> Any:
+        """Get the pooled agent for a household/session, creating it on a miss."""
+        key = self._key(household_id, session_id)
+
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                self._stats['hits'] += 1
+                return agent
+            self._stats['misses'] += 1
+
+        agent = self.create_agent(household_id)
+
+        with self._lock:
+            self._agents[key] = agent
+            self._sizes[key] = self.estimate_bytes(agent)
+            self._evict(keep=key)
+
+        logger.info(f"Created agent for household: {household_id} (pool size {len(self._agents)})")
+        return agent
+
+    def record_usage(self, household_id: str, session_id: Optional[str] = None) -> None:
+        """Re-measure an agent after an invocation grew its conversation, evicting if over budget."""
+        key = self._key(household_id, session_id)
+
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is None:
+                return
+            self._sizes[key] = self.estimate_bytes(agent)
+            self._evict(keep=key)
+
+    def _evict(self, keep: PoolKey) -> None:
+        """Drop least recently used agents until within both limits (caller holds the lock)."""
+        while len(self._agents) > 1 and (
+            len(self._agents) > self.max_agents or sum(self._sizes.values()) > self.max_bytes
+        ):
+            oldest = next(iter(self._agents))
+            if oldest == keep:
+                break
+            self._agents.pop(oldest)
+            self._sizes.pop(oldest, None)
+            self._stats['evictions'] += 1
+            logger.info(f"Evicted agent for household: {oldest[0]}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            return {
+                **self._stats,
+                'size': len(self._agents),
+                'bytes': sum(self._sizes.values()),
+            }
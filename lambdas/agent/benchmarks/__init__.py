@@ -0,0 +1,22 @@
+"""
+Offline benchmarks for the HOH Meal Agent
+
+Runs the Lambda handler end to end against recorded Spoonacular fixtures,
+an in-memory DynamoDB and a scripted model, and reports latency per phase,
+agent cycles, tool calls, HTTP calls and estimated tokens per scenario.
+Nothing here is packaged by build.sh.
+
+Run from lambdas/agent with:
+
+    python -m benchmarks [scenario ...] [--iterations N] [--model-latency-ms MS]
+"""
+
+import os
+
+# Keep the runs hermetic: no disk caches, no bundled corpus, no real tables
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+os.environ.pop('RECIPE_CACHE_TABLE', None)
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+os.environ.setdefault('USERS_TABLE', 'hoh-users-bench')
+os.environ.setdefault('MEAL_PLANS_TABLE', 'hoh-meal-plans-bench')
@@ -0,0 +1,46 @@
+"""
+Offline benchmark CLI
+
+Usage: python -m benchmarks [scenario ...] [--iterations N] [--json PATH]
+"""
+
+import sys
+import json
+import logging
+import argparse
+from typing import List, Optional
+
+from benchmarks.scenarios import SCENARIOS, Latency, format_results, run_scenario
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Offline Meal Agent benchmarks')
+    parser.add_argument('scenarios', nargs='*', choices=[[]] + list(SCENARIOS), metavar='scenario',
+                        help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--iterations', type=int, default=3, help='Runs per scenario; the first is cold')
+    parser.add_argument('--model-latency-ms', type=float, default=0, help='Simulated latency per model call')
+    parser.add_argument('--model-ms-per-token', type=float, default=0, help='Simulated time per output token')
+    parser.add_argument('--http-latency-ms', type=float, default=0, help='Simulated latency per Spoonacular call')
+    parser.add_argument('--dynamo-latency-ms', type=float, default=0, help='Simulated latency per DynamoDB call')
+    parser.add_argument('--json', metavar='PATH', help='Also write every iteration as JSON')
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    latency = Latency(args.model_latency_ms, args.model_ms_per_token, args.http_latency_ms, args.dynamo_latency_ms)
+
+    results = {}
+    failed = False
+    for name in args.scenarios or list(SCENARIOS):
+        results[name] = run_scenario(name, max(1, args.iterations), latency)
+        failed = failed or any(r['statusCode'] != 200 for r in results[name])
+        print(format_results(name, results[name]))
+        print()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,455 @@
+"""
+Offline stand-ins for the services the Meal Agent calls
+
+- FakeDynamoDB: in-memory tables with the get_item / put_item / query /
+  update_item subset the handler, household context and tools use.
+- SpoonacularFixtures: an httpx MockTransport that answers the Spoonacular
+  endpoints from a recorded recipe catalog (recipe information payloads).
+- ScriptedModel: a strands Model that replays scripted turns (text or tool
+  uses) instead of calling Bedrock.
+
+All three count their calls into a shared Recorder and can add a fixed
+latency per call, so benchmarks can model network time without a network.
+"""
+
+import re
+import copy
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+from strands.models.model import Model
+
+from tools.compliance import forbidden_mask, is_compliant, recipe_mask
+
+
+class Recorder:
+    """Thread-safe counters and phase timings for one benchmark iteration."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.tool_calls: Counter = Counter()
+        self.tokens: Counter = Counter()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+            self.phases.clear()
+            self.tool_calls.clear()
+            self.tokens.clear()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[name] += amount
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] += seconds * 1000
+
+    def add_tool_call(self, name: str) -> None:
+        with self._lock:
+            self.tool_calls[name] += 1
+
+    def add_tokens(self, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.tokens['input'] += input_tokens
+            self.tokens['output'] += output_tokens
+
+
+def _sleep(latency_ms: float) -> None:
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+
+
+# ---------------------------------------------------------------------------
+# DynamoDB
+# ---------------------------------------------------------------------------
+
+_KEY_CONDITION = re.compile(r'^PK = (:\w+)(?: AND begins_with\(SK, (:\w+)\))?$')
+_UPDATE_CLAUSE = re.compile(r'\b(SET|ADD|REMOVE)\b')
+# Commas between clauses, not inside if_not_exists(path, :value)
+_TOP_LEVEL_COMMA = re.compile(r',(?![^(]*\))')
+
+
+def _to_dynamo(value: Any) -> Any:
+    """Round-trip like boto3: floats are rejected, ints come back as Decimal."""
+    if isinstance(value, float):
+        raise TypeError('Float types are not supported. Use Decimal types instead.')
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, dict):
+        return {k: _to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_dynamo(v) for v in value]
+    return value
+
+
+class FakeTable:
+    """One in-memory table keyed by (PK, SK)."""
+
+    def __init__(self, name: str, recorder: Recorder, latency_ms: float = 0):
+        self.name = name
+        self.recorder = recorder
+        self.latency_ms = latency_ms
+        self.items: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _op(self, op: str) -> None:
+        self.recorder.count(f'dynamodb.{op}')
+        _sleep(self.latency_ms)
+
+    def get_item(self, Key: Dict[str, str], **kwargs: Any) -> Dict[str, Any]:
+        self._op('get_item')
+        with self._lock:
+            item = self.items.get((Key['PK'], Key['SK']))
+        return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def put_item(self, Item: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self._op('put_item')
+        with self._lock:
+            self.items[(Item['PK'], Item['SK'])] = _to_dynamo(copy.deepcopy(Item))
+        return {}
+
+    def query(
+        self,
+        KeyConditionExpression: str,
+        ExpressionAttributeValues: Dict[str, Any],
+        ScanIndexForward: bool = True,
+        Limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        self._op('query')
+        match = _KEY_CONDITION.match(' '.join(KeyConditionExpression.split()))
+        if not match:
+            raise NotImplementedError(f"Unsupported KeyConditionExpression: {KeyConditionExpression}")
+        pk = ExpressionAttributeValues[match.group(1)]
+        prefix = ExpressionAttributeValues[match.group(2)] if match.group(2) else ''
+
+        with self._lock:
+            items = [
+                copy.deepcopy(item) for (item_pk, sk), item in sorted(self.items.items())
+                if item_pk == pk and sk.startswith(prefix)
+            ]
+        if not ScanIndexForward:
+            items.reverse()
+        if Limit:
+            items = items[:Limit]
+        return {'Items': items, 'Count': len(items)}
+
+    def update_item(
+        self,
+        Key: Dict[str, str],
+        UpdateExpression: str,
+        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+        ReturnValues: str = 'NONE',
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """SET (plain, list index and if_not_exists), ADD and REMOVE; conditions always pass."""
+        self._op('update_item')
+        values = _to_dynamo(ExpressionAttributeValues or {})
+        names = ExpressionAttributeNames or {}
+
+        with self._lock:
+            item = self.items.setdefault((Key['PK'], Key['SK']), dict(Key))
+            parts = _UPDATE_CLAUSE.split(UpdateExpression)
+            for action, body in zip(parts[1::2], parts[2::2]):
+                for clause in (c.strip() for c in _TOP_LEVEL_COMMA.split(body) if c.strip()):
+                    self._apply(item, action, clause, values, names)
+            result = copy.deepcopy(item)
+
+        return {'Attributes': result} if ReturnValues != 'NONE' else {}
+
+    @staticmethod
+    def _apply(item: Dict[str, Any], action: str, clause: str, values: Dict[str, Any], names: Dict[str, str]) -> None:
+        def resolve(token: str) -> str:
+            return names.get(token, token)
+
+        if action == 'REMOVE':
+            item.pop(resolve(clause), None)
+            return
+        if action == 'ADD':
+            path, value = clause.split()
+            item[resolve(path)] = item.get(resolve(path), 0) + values[value]
+            return
+
+        path, expression = (side.strip() for side in clause.split('=', 1))
+        fallback = re.match(r'if_not_exists\(([^,]+),\s*(:\w+)\)', expression)
+        index = re.match(r'^(\S+?)\[(\d+)\]$', path)
+        if fallback:
+            item.setdefault(resolve(path), values[fallback.group(2)])
+        elif index:
+            item[resolve(index.group(1))][int(index.group(2))] = values[expression]
+        else:
+            item[resolve(path)] = values[expression]
+
+
+class FakeDynamoDB:
+    """Stand-in for the boto3 DynamoDB resource: Table(name) returns a shared FakeTable."""
+
+    def __init__(self, recorder: Recorder, latency_ms: float = 0):
+        self.recorder = recorder
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, FakeTable] = {}
+        self._lock = threading.Lock()
+
+    def Table(self, name: str) -> FakeTable:
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = FakeTable(name, self.recorder, self.latency_ms)
+            return self.tables[name]
+
+    def load(self, table_name: str, items: Iterable[Dict[str, Any]]) -> None:
+        table = self.Table(table_name)
+        for item in items:
+            table.items[(item['PK'], item['SK'])] = _to_dynamo(copy.deepcopy(item))
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in self.tables.values():
+                table.items.clear()
+
+
+# ---------------------------------------------------------------------------
+# Spoonacular
+# ---------------------------------------------------------------------------
+
+class SpoonacularFixtures:
+    """Answers Spoonacular endpoints from a catalog of recorded recipe information payloads."""
+
+    def __init__(self, recipes: List[Dict[str, Any]], recorder: Recorder, latency_ms: float = 0, seed: int = 0):
+        self.recipes = recipes
+        self.by_id = {recipe['id']: recipe for recipe in recipes}
+        self.masks = {recipe['id']: recipe_mask(recipe.get('extendedIngredients', [])) for recipe in recipes}
+        self.recorder = recorder
+        self.latency_ms = latency_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # Transport for the shared client
+
+    def transport(self) -> httpx.MockTransport:
+        def handle(request: httpx.Request) -> httpx.Response:
+            _sleep(self.latency_ms)
+            return self.respond(request)
+        return httpx.MockTransport(handle)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        params = dict(request.url.params)
+        self.recorder.count('http')
+        self.recorder.count(f'http.{_endpoint_name(path)}')
+
+        if path == '/recipes/complexSearch':
+            body = self.complex_search(params)
+        elif path == '/recipes/random':
+            body = self.random_recipes(params)
+        elif path == '/recipes/informationBulk':
+            ids = [int(i) for i in params.get('ids', '').split(',') if i.strip()]
+            body = [self.by_id[i] for i in ids if i in self.by_id]
+        elif path == '/recipes/findByIngredients':
+            body = self.find_by_ingredients(params)
+        elif path == '/mealplanner/generate':
+            body = self.meal_plan(params)
+        elif re.match(r'^/recipes/\d+/information$', path):
+            recipe = self.by_id.get(int(path.split('/')[2]))
+            if recipe is None:
+                return httpx.Response(404, json={'status': 'failure', 'code': 404})
+            body = recipe
+        else:
+            return httpx.Response(404, json={'status': 'failure', 'code': 404})
+
+        return httpx.Response(200, json=body, headers={'X-API-Quota-Left': '1000'})
+
+    def _matches(self, recipe: Dict[str, Any], params: Dict[str, str]) -> bool:
+        words = params.get('query', '').lower().split()
+        title = recipe['title'].lower()
+        if words and not all(word in title for word in words):
+            return False
+        for key, field in (('type', 'dishTypes'), ('cuisine', 'cuisines')):
+            wanted = params.get(key, '').lower()
+            if wanted and wanted not in [value.lower() for value in recipe.get(field, [])]:
+                return False
+        # Spoonacular ANDs comma-separated diets
+        labels = [value.lower() for value in recipe.get('diets', [])]
+        if any(d.strip() not in labels for d in params.get('diet', '').lower().split(',') if d.strip()):
+            return False
+        if params.get('maxReadyTime') and recipe.get('readyInMinutes', 0) > int(params['maxReadyTime']):
+            return False
+        intolerances = [i for i in params.get('intolerances', '').split(',') if i.strip()]
+        if intolerances and is_compliant(self.masks[recipe['id']], forbidden_mask(intolerances)) is False:
+            return False
+        return True
+
+    def complex_search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        matches = [recipe for recipe in self.recipes if self._matches(recipe, params)]
+        if params.get('sort') == 'random':
+            with self._lock:
+                matches = self._random.sample(matches, len(matches))
+        offset = int(params.get('offset', 0))
+        results = matches[offset:offset + int(params.get('number', 10))]
+        return {'results': results, 'offset': offset, 'number': len(results), 'totalResults': len(matches)}
+
+    def random_recipes(self, params: Dict[str, str]) -> Dict[str, Any]:
+        tags = [tag.strip().lower() for tag in params.get('tags', '').split(',') if tag.strip()]
+        matches = [
+            recipe for recipe in self.recipes
+            if all(tag in [v.lower() for v in recipe.get('dishTypes', []) + recipe.get('diets', []) + recipe.get('cuisines', [])]
+                   for tag in tags)
+        ]
+        with self._lock:
+            picked = self._random.sample(matches, min(len(matches), int(params.get('number', 1))))
+        return {'recipes': picked}
+
+    def find_by_ingredients(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        pantry = [i.strip().lower() for i in params.get('ingredients', '').split(',') if i.strip()]
+        results = []
+        for recipe in self.recipes:
+            used = [i for i in recipe['extendedIngredients'] if any(p in i['name'] for p in pantry)]
+            if not used:
+                continue
+            missed = [i for i in recipe['extendedIngredients'] if i not in used]
+            results.append({
+                'id': recipe['id'],
+                'title': recipe['title'],
+                'image': recipe['image'],
+                'usedIngredientCount': len(used),
+                'missedIngredientCount': len(missed),
+                'usedIngredients': used,
+                'missedIngredients': missed,
+            })
+        results.sort(key=lambda r: (-r['usedIngredientCount'], r['missedIngredientCount']))
+        return results[:int(params.get('number', 10))]
+
+    def meal_plan(self, params: Dict[str, str]) -> Dict[str, Any]:
+        with self._lock:
+            picked = self._random.sample(self.recipes, 3)
+        return {
+            'meals': [
+                {'id': r['id'], 'title': r['title'], 'readyInMinutes': r['readyInMinutes'],
+                 'servings': r['servings'], 'sourceUrl': r['sourceUrl'], 'imageType': 'jpg'}
+                for r in picked
+            ],
+            'nutrients': {'calories': 2000.0, 'protein': 90.0, 'fat': 70.0, 'carbohydrates': 240.0},
+        }
+
+
+def _endpoint_name(path: str) -> str:
+    return re.sub(r'/\d+/', '/{id}/', path).strip('/')
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+# A turn is {'text': str} and/or {'tool_uses': [{'name': str, 'input': dict}]},
+# or a callable that builds one from the request (messages, tool specs, system prompt)
+Turn = Union[Dict[str, Any], Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count (~4 characters per token) for text or JSON-able content."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    return max(1, len(text) // 4)
+
+
+class ScriptedModel(Model):
+    """A strands Model that replays scripted turns instead of calling Bedrock.
+
+    Each stream() call consumes the next turn. Once the script runs out the
+    model ends the turn with a short text reply, so a loop always stops.
+    Token usage is estimated from the request and reply sizes.
+    """
+
+    def __init__(
+        self,
+        turns: Iterable[Turn],
+        recorder: Recorder,
+        latency_ms: float = 0,
+        ms_per_output_token: float = 0,
+    ):
+        self.turns = list(turns)
+        self.recorder = recorder
+        self.latency_ms = latency_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.config: Dict[str, Any] = {'model_id': 'scripted'}
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError('ScriptedModel only supports structured output through the output tool')
+        yield  # pragma: no cover
+
+    def _next_turn(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.requests.append(request)
+            turn = self.turns.pop(0) if self.turns else {'text': 'Done.'}
+        return turn(request) if callable(turn) else turn
+
+    async def stream(
+        self,
+        messages,
+        tool_specs=None,
+        system_prompt=None,
+        *,
+        tool_choice=None,
+        system_prompt_content=None,
+        invocation_state=None,
+        **kwargs,
+    ):
+        started = time.perf_counter()
+        request = {
+            'messages': messages,
+            'tool_specs': tool_specs or [],
+            'system_prompt': system_prompt_content or system_prompt,
+            'tool_choice': tool_choice,
+        }
+        turn = self._next_turn(request)
+        tool_uses = turn.get('tool_uses', [])
+        text = turn.get('text', '' if tool_uses else 'Done.')
+
+        input_tokens = estimate_tokens([request['system_prompt'], request['tool_specs'], messages])
+        output_tokens = estimate_tokens([text, tool_uses])
+        delay = self.latency_ms + self.ms_per_output_token * output_tokens
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        yield {'messageStart': {'role': 'assistant'}}
+        if text:
+            yield {'contentBlockStart': {'start': {}}}
+            yield {'contentBlockDelta': {'delta': {'text': text}}}
+            yield {'contentBlockStop': {}}
+        for index, tool_use in enumerate(tool_uses):
+            yield {'contentBlockStart': {'start': {'toolUse': {
+                'toolUseId': f"tooluse_{len(self.requests)}_{index}",
+                'name': tool_use['name'],
+            }}}}
+            yield {'contentBlockDelta': {'delta': {'toolUse': {'input': json.dumps(tool_use.get('input', {}))}}}}
+            yield {'contentBlockStop': {}}
+        yield {'messageStop': {'stopReason': 'tool_use' if tool_uses else 'end_turn'}}
+
+        elapsed = time.perf_counter() - started
+        yield {'metadata': {
+            'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens, 'totalTokens': input_tokens + output_tokens},
+            'metrics': {'latencyMs': int(elapsed * 1000)},
+        }}
+
+        self.recorder.count('model_calls')
+        self.recorder.add_tokens(input_tokens, output_tokens)
+        self.recorder.add_phase('model', elapsed)
@@ -0,0 +1,371 @@
+"""
+Benchmark scenarios for the Meal Agent handler
+
+Each scenario sends an API Gateway event through meal_agent_handler.handler
+inside an OfflineEnvironment: DynamoDB, Spoonacular and Bedrock are
+replaced by the stand-ins in benchmarks.fakes, and the container's caches
+and agent pool start empty. The first iteration of a scenario runs cold;
+later iterations reuse the warm container state, like a warm Lambda.
+"""
+
+import io
+import os
+import re
+import json
+import time
+import contextlib
+import statistics
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.fakes import FakeDynamoDB, Recorder, ScriptedModel, SpoonacularFixtures, Turn
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+START_DATE = '2026-01-12'
+
+PLANNER_USER = 'bench-user-1'
+PLANNER_HOUSEHOLD = 'hh-planner'
+AGENT_USER = 'bench-user-2'
+AGENT_HOUSEHOLD = 'hh-agent'
+
+# Functions timed as phases: (module, attribute, phase name). Phases nest
+# (the explanation phase includes its model call), so they do not sum to the total.
+PHASES = [
+    ('meal_agent_handler', 'get_user_household_id', 'household_lookup'),
+    ('meal_agent_handler', 'get_household_context', 'household_context'),
+    ('meal_agent_handler', 'get_agent', 'agent_acquire'),
+    ('meal_agent_handler', 'explain_meal_plan', 'explanation'),
+    ('meal_agent_handler', 'save_generated_plan', 'save'),
+    ('weekly_planner', 'fetch_candidate_pools', 'candidate_pools'),
+    ('weekly_planner', 'build_weekly_plan', 'planner'),
+]
+
+
+class Latency(NamedTuple):
+    """Simulated service latency per call (milliseconds)."""
+    model_ms: float = 0
+    model_ms_per_output_token: float = 0
+    http_ms: float = 0
+    dynamodb_ms: float = 0
+
+
+def load_fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+def api_event(user_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """An API Gateway proxy event with Cognito claims."""
+    return {
+        'httpMethod': 'POST',
+        'path': '/agent',
+        'headers': {'origin': 'https://www.homeoperationshub.com'},
+        'requestContext': {'authorizer': {'claims': {'sub': user_id}}},
+        'body': json.dumps(body),
+    }
+
+
+class _LambdaContext:
+    function_name = 'hoh-meal-agent-bench'
+    aws_request_id = 'bench'
+
+
+class OfflineEnvironment:
+    """Patches the handler's service clients with offline stand-ins while active."""
+
+    def __init__(self, latency: Latency = Latency()):
+        self.latency = latency
+        self.recorder = Recorder()
+        self.recipes = load_fixture('spoonacular_recipes.json')['recipes']
+        self.dynamodb = FakeDynamoDB(self.recorder, latency.dynamodb_ms)
+        self.spoonacular = SpoonacularFixtures(self.recipes, self.recorder, latency.http_ms)
+        self.model: Optional[ScriptedModel] = None
+        self._stack = contextlib.ExitStack()
+
+    def __enter__(self) -> 'OfflineEnvironment':
+        import household_context
+        import meal_agent_handler
+        import model_registry
+        import tools
+        import tools.dynamo_tools
+        import tools.household_cache
+        import tools.http_client
+        import tools.pantry_matcher
+        import tools.rate_limiter
+        import tools.recipe_cache
+        import tools.recipe_corpus
+        import tools.shopping_list
+        import tools.spoonacular_tools
+
+        sync_client = httpx.Client(base_url=tools.http_client.SPOONACULAR_BASE_URL, transport=self.spoonacular.transport())
+        self._stack.callback(sync_client.close)
+
+        patches = [
+            # Services
+            patch.object(household_context, '_dynamodb', self.dynamodb),
+            patch.object(tools.dynamo_tools, 'dynamodb', self.dynamodb),
+            patch.object(tools.shopping_list, 'dynamodb', self.dynamodb),
+            patch.object(tools.http_client, 'get_client', lambda: sync_client),
+            patch.object(tools.spoonacular_tools, '_get_api_key', lambda: 'bench-api-key'),
+            patch.object(model_registry, 'get_model', self._get_model),
+            patch.object(model_registry, 'get_cached_model', self._get_model),
+            # Container state starts cold
+            patch.object(meal_agent_handler, '_agent_pool', None),
+            patch.object(tools.recipe_cache, '_recipe_cache', None),
+            patch.object(tools.recipe_corpus, '_recipe_corpus', None),
+            patch.object(tools.pantry_matcher, '_pantry_matcher', None),
+            patch.object(tools.rate_limiter, '_limiter', None),
+        ]
+        for module_name, attribute, phase in PHASES:
+            module = __import__(module_name)
+            patches.append(patch.object(module, attribute, self._timed(getattr(module, attribute), phase)))
+        for name in tools.__all__:
+            agent_tool = getattr(tools, name)
+            patches.append(patch.object(agent_tool, 'stream', self._counted_stream(agent_tool)))
+
+        for p in patches:
+            self._stack.enter_context(p)
+        tools.household_cache.household_cache.clear()
+        self._stack.callback(tools.household_cache.household_cache.clear)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stack.close()
+
+    def seed(self) -> None:
+        """Reset the tables to the household fixtures."""
+        import household_context
+
+        households = load_fixture('households.json')
+        self.dynamodb.clear()
+        self.dynamodb.load(household_context.USERS_TABLE, households['users'])
+        self.dynamodb.load(household_context.MEAL_PLANS_TABLE, households['mealPlans'])
+
+    def _get_model(self, *args: Any, **kwargs: Any) -> ScriptedModel:
+        if self.model is None:
+            raise RuntimeError('No scripted model set for this iteration')
+        return self.model
+
+    def _timed(self, func: Callable[..., Any], phase: str) -> Callable[..., Any]:
+        recorder = self.recorder
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.add_phase(phase, time.perf_counter() - started)
+        return timed
+
+    def _counted_stream(self, agent_tool: Any) -> Callable[..., Any]:
+        original = agent_tool.stream
+        recorder = self.recorder
+
+        async def stream(tool_use: Any, invocation_state: Any, **kwargs: Any) -> Any:
+            recorder.add_tool_call(agent_tool.tool_name)
+            started = time.perf_counter()
+            try:
+                async for event in original(tool_use, invocation_state, **kwargs):
+                    yield event
+            finally:
+                recorder.add_phase('tools', time.perf_counter() - started)
+        return stream
+
+    def recipes_of(self, dish_type: str) -> List[Dict[str, Any]]:
+        return [recipe for recipe in self.recipes if dish_type in recipe['dishTypes']]
+
+    def seed_plan(self, household_id: str, start_date: str) -> None:
+        """Store a full PLAN#<startDate> week built from the fixture catalog."""
+        from meal_plan_schema import expected_slots
+
+        import household_context
+
+        breakfasts = self.recipes_of('breakfast')
+        mains = self.recipes_of('main course')
+        meals = []
+        for index, (date, day, meal_type) in enumerate(expected_slots(start_date)):
+            pool = breakfasts if meal_type == 'breakfast' else mains
+            recipe = pool[(index // 3 if meal_type == 'breakfast' else index) % len(pool)]
+            meals.append({
+                'date': date, 'day': day, 'mealType': meal_type,
+                'recipeId': str(recipe['id']), 'recipeName': recipe['title'],
+                'readyInMinutes': recipe['readyInMinutes'], 'servings': recipe['servings'],
+            })
+        self.dynamodb.load(household_context.MEAL_PLANS_TABLE, [{
+            'PK': f'HOUSEHOLD#{household_id}', 'SK': f'PLAN#{start_date}',
+            'startDate': start_date, 'meals': meals, 'version': 1,
+        }])
+
+
+# ---------------------------------------------------------------------------
+# Scripted turns
+# ---------------------------------------------------------------------------
+
+def _first_user_text(request: Dict[str, Any]) -> str:
+    for message in request['messages']:
+        if message['role'] == 'user':
+            return ''.join(block.get('text', '') for block in message['content'])
+    return ''
+
+
+def candidate_ids(prompt: str) -> Dict[str, List[str]]:
+    """Candidate recipe IDs per meal type from the generation prompt (see compact_candidates)."""
+    ids: Dict[str, List[str]] = {}
+    for meal_type in ('breakfast', 'lunch', 'dinner'):
+        section = re.search(rf'^{meal_type.title()}:\n((?:- .*\n?)*)', prompt, re.MULTILINE)
+        ids[meal_type] = re.findall(r'^- (\d+) \|', section.group(1), re.MULTILINE) if section else []
+    return ids
+
+
+def bulk_details_turn(request: Dict[str, Any]) -> Dict[str, Any]:
+    ids = candidate_ids(_first_user_text(request))
+    return {'tool_uses': [{'name': 'get_recipe_details_bulk', 'input': {'recipe_ids': ids['dinner'][:3]}}]}
+
+
+def weekly_plan_turn(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a full week through the WeeklyMealPlan tool, picked from the prompt's candidates."""
+    from meal_plan_schema import expected_slots
+
+    prompt = _first_user_text(request)
+    start_date = re.search(r'starting (\d{4}-\d{2}-\d{2})', prompt).group(1)
+    ids = candidate_ids(prompt)
+    titles = dict(re.findall(r'^- (\d+) \| ([^|]+?) \|', prompt, re.MULTILINE))
+    used = set()
+
+    meals = []
+    for date, day, meal_type in expected_slots(start_date):
+        recipe_id = next((i for i in ids[meal_type] if i not in used), None)
+        if recipe_id is None:
+            continue
+        used.add(recipe_id)
+        meals.append({'date': date, 'day': day, 'mealType': meal_type,
+                      'recipeId': recipe_id, 'recipeName': titles[recipe_id]})
+    return {'tool_uses': [{'name': 'WeeklyMealPlan', 'input': {
+        'meals': meals, 'explanation': 'Tacos on Tuesday, soup on Sunday and plenty of variety.',
+    }}]}
+
+
+class Scenario(NamedTuple):
+    description: str
+    user_id: str
+    body: Dict[str, Any]
+    turns: Callable[[], List[Turn]]
+    setup: Optional[Callable[[OfflineEnvironment], None]] = None
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'generate_planner': Scenario(
+        'Deterministic planner week, model only writes the explanation',
+        PLANNER_USER,
+        {'action': 'generate', 'startDate': START_DATE},
+        lambda: [{'text': 'A varied week that keeps peanuts off the table and dinners under 45 minutes.'}],
+    ),
+    'generate_agent': Scenario(
+        'Free-text preferences: agent picks from candidates, returns WeeklyMealPlan',
+        AGENT_USER,
+        {'action': 'generate', 'startDate': START_DATE},
+        lambda: [bulk_details_turn, weekly_plan_turn],
+    ),
+    'chat': Scenario(
+        'Chat turn with a dietary-needs lookup and a recipe search',
+        PLANNER_USER,
+        {'message': 'What quick chicken dinner could we make tonight?'},
+        lambda: [
+            {'tool_uses': [{'name': 'get_aggregated_dietary_needs', 'input': {'household_id': PLANNER_HOUSEHOLD}}]},
+            {'tool_uses': [{'name': 'search_recipes', 'input': {
+                'query': 'chicken', 'meal_type': 'main course', 'intolerances': 'peanut', 'max_ready_time': 30,
+            }}]},
+            {'text': 'Try the Chicken Stir Fry - it is peanut-free and ready in 25 minutes.'},
+        ],
+    ),
+    'chat_swap_meal': Scenario(
+        'Chat turn that swaps one dinner in a saved plan',
+        PLANNER_USER,
+        {'message': "Swap Wednesday's dinner for something vegetarian"},
+        lambda: [
+            {'tool_uses': [{'name': 'get_meal_plan', 'input': {'household_id': PLANNER_HOUSEHOLD, 'start_date': START_DATE}}]},
+            {'tool_uses': [{'name': 'search_recipes', 'input': {'query': '', 'diet': 'vegetarian', 'meal_type': 'main course'}}]},
+            {'tool_uses': [{'name': 'update_meal_slot', 'input': {
+                'household_id': PLANNER_HOUSEHOLD, 'start_date': START_DATE, 'date': '2026-01-14', 'meal_type': 'dinner',
+                'meal': {'recipeId': '700425', 'recipeName': 'Chickpea Curry'},
+            }}]},
+            {'text': "Wednesday's dinner is now Chickpea Curry."},
+        ],
+        lambda env: env.seed_plan(PLANNER_HOUSEHOLD, START_DATE),
+    ),
+    'shopping_list': Scenario(
+        'Shopping list for a saved week (no model call)',
+        PLANNER_USER,
+        {'action': 'shopping_list', 'startDate': START_DATE, 'pantryItems': ['rice', 'garlic']},
+        lambda: [],
+        lambda env: env.seed_plan(PLANNER_HOUSEHOLD, START_DATE),
+    ),
+}
+
+
+def run_scenario(name: str, iterations: int = 3, latency: Latency = Latency()) -> List[Dict[str, Any]]:
+    """Run a scenario in a fresh offline container; returns one result per iteration."""
+    import meal_agent_handler
+    import tools.rate_limiter
+
+    scenario = SCENARIOS[name]
+    results = []
+    with OfflineEnvironment(latency) as env:
+        for iteration in range(iterations):
+            # Same data every iteration (a generated week would otherwise become
+            # "recently used" for the next); container caches stay warm
+            env.seed()
+            if scenario.setup:
+                scenario.setup(env)
+            # Back-to-back iterations would otherwise drain the Spoonacular token
+            # bucket and measure throttling waits instead of request latency
+            tools.rate_limiter._limiter = None
+            env.recorder.reset()
+            env.model = ScriptedModel(
+                scenario.turns(), env.recorder, latency.model_ms, latency.model_ms_per_output_token
+            )
+
+            started = time.perf_counter()
+            # The agents' printing callback handler streams to stdout; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = meal_agent_handler.handler(api_event(scenario.user_id, scenario.body), _LambdaContext())
+            total_ms = (time.perf_counter() - started) * 1000
+
+            results.append({
+                'scenario': name,
+                'iteration': iteration + 1,
+                'statusCode': response['statusCode'],
+                'totalMs': round(total_ms, 2),
+                'modelCalls': env.recorder.counts['model_calls'],
+                'toolCalls': dict(env.recorder.tool_calls),
+                'httpCalls': env.recorder.counts['http'],
+                'dynamodbCalls': sum(v for k, v in env.recorder.counts.items() if k.startswith('dynamodb.')),
+                'calls': dict(sorted(env.recorder.counts.items())),
+                'tokens': {'input': env.recorder.tokens['input'], 'output': env.recorder.tokens['output']},
+                'phasesMs': {phase: round(ms, 2) for phase, ms in sorted(env.recorder.phases.items())},
+            })
+    return results
+
+
+def format_results(name: str, results: List[Dict[str, Any]]) -> str:
+    """Cold (first) and warm (median of the rest) rows plus the cold run's phases."""
+    lines = [f"{name} - {SCENARIOS[name].description}"]
+    lines.append(f"  {'run':<6}{'status':>7}{'total ms':>10}{'cycles':>8}{'tools':>7}{'http':>6}{'dynamo':>8}{'tokens in/out':>16}")
+
+    def row(label: str, result: Dict[str, Any], total_ms: float) -> str:
+        tokens = f"{result['tokens']['input']}/{result['tokens']['output']}"
+        return (f"  {label:<6}{result['statusCode']:>7}{total_ms:>10.1f}{result['modelCalls']:>8}"
+                f"{sum(result['toolCalls'].values()):>7}{result['httpCalls']:>6}{result['dynamodbCalls']:>8}{tokens:>16}")
+
+    lines.append(row('cold', results[0], results[0]['totalMs']))
+    if len(results) > 1:
+        warm = results[1:]
+        lines.append(row('warm', warm[-1], statistics.median(r['totalMs'] for r in warm)))
+    phases = ', '.join(f"{phase} {ms:.1f}ms" for phase, ms in results[0]['phasesMs'].items())
+    lines.append(f"  phases (cold): {phases or '-'}")
+    if results[0]['toolCalls']:
+        lines.append(f"  tool calls (cold): {', '.join(f'{k} x{v}' for k, v in results[0]['toolCalls'].items())}")
+    return '\n'.join(lines)
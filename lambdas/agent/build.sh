@@ -20,8 +20,22 @@ pip install -r requirements.txt -t package --platform manylinux2014_x86_64 --onl
 # Copy source files
 echo "📄 Copying source files..."
 cp meal_agent_handler.py package/
+cp household_context.py package/
+cp agent_pool.py package/
+cp bounded_metrics.py package/
+cp model_registry.py package/
+cp weekly_planner.py package/
+cp meal_plan_schema.py package/
+cp plan_jobs.py package/
+cp model_router.py package/
+cp request_metrics.py package/
 cp -r tools package/
 
+# Freeze the @tool specs so cold starts skip Pydantic schema generation
+# (uses the packaged dependencies, so build with the Lambda's Python version)
+echo "🧊 Precompiling tool specs..."
+(cd package && TOOL_SPEC_MANIFEST= python -m tools.tool_specs tools/tool_specs.json)
+
 # Create zip (optional - CDK can use the directory)
 # cd package && zip -r ../deployment.zip . && cd ..
 
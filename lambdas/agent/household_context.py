@@ -0,0 +1,232 @@
+"""
+Household Context Loader for HOH Meal Agent
+
+Loads everything the generation path needs about a household in one
+round trip. Members and preferences share the HOUSEHOLD#<id> partition of
+the users table, so a single partition Query returns both; the recent
+PLAN# items live in the meal plans table and are queried concurrently.
+
+The DynamoDB resource is created once per container and reused across
+warm invocations.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, TypedDict
+
+logger = logging.getLogger()
+
+USERS_TABLE = os.getenv('USERS_TABLE', 'hoh-users-2026')
+MEAL_PLANS_TABLE = os.getenv('MEAL_PLANS_TABLE', 'hoh-meal-plans-2026')
+
+_dynamodb = None
+_dynamodb_lock = threading.Lock()
+
+
+class HouseholdMember(TypedDict):
+    id: str
+    name: str
+    age: Optional[Any]
+    dietaryRestrictions: List[str]
+    allergies: List[str]
+    likes: List[str]
+    dislikes: List[str]
+    sameAsAdults: bool
+    mealPreferences: Optional[Dict[str, Any]]
+
+
+class HouseholdPreferences(TypedDict):
+    mealSuggestionMode: str
+    cookingTime: str
+    typicalBreakfast: List[str]
+    typicalLunch: List[str]
+    typicalDinner: List[str]
+    typicalSnacks: List[str]
+    additionalPreferences: str
+
+
+class AggregatedNeeds(TypedDict):
+    allRestrictions: List[str]
+    allAllergies: List[str]
+    allDislikes: List[str]
+
+
+class HouseholdContext(TypedDict):
+    householdId: str
+    members: List[HouseholdMember]
+    preferences: HouseholdPreferences
+    aggregatedNeeds: AggregatedNeeds
+    recentRecipes: List[str]
+
+
+def get_dynamodb():
+    """Get the container-wide DynamoDB resource, creating it on first use."""
+    global _dynamodb
+
+    if _dynamodb is None:
+        with _dynamodb_lock:
+            if _dynamodb is None:
+                import boto3
+                _dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+    return _dynamodb
+
+
+def member_from_item(item: Dict[str, Any]) -> HouseholdMember:
+    """Convert a MEMBER# item to the member format used by the agent."""
+    return {
+        'id': item['SK'].replace('MEMBER#', ''),
+        'name': item.get('name', 'Unknown'),
+        'age': item.get('age'),
+        'dietaryRestrictions': item.get('dietaryRestrictions', []),
+        'allergies': item.get('allergies', []),
+        'likes': item.get('likes', []),
+        'dislikes': item.get('dislikes', []),
+        'sameAsAdults': item.get('sameAsAdults', True),
+        'mealPreferences': item.get('mealPreferences'),
+    }
+
+
+def preferences_from_item(item: Dict[str, Any]) -> HouseholdPreferences:
+    """Convert the PREFERENCES item (or {}) to preferences with defaults."""
+    return {
+        'mealSuggestionMode': item.get('mealSuggestionMode', 'ai_and_user'),
+        'cookingTime': item.get('cookingTime', 'medium'),
+        'typicalBreakfast': item.get('typicalBreakfast', []),
+        'typicalLunch': item.get('typicalLunch', []),
+        'typicalDinner': item.get('typicalDinner', []),
+        'typicalSnacks': item.get('typicalSnacks', []),
+        'additionalPreferences': item.get('additionalPreferences', ''),
+    }
+
+
+def aggregate_needs(members: List[HouseholdMember]) -> AggregatedNeeds:
+    """Combine restrictions, allergies and dislikes across members."""
+    all_restrictions = set()
+    all_allergies = set()
+    all_dislikes = set()
+
+    for member in members:
+        all_restrictions.update(member.get('dietaryRestrictions', []))
+        all_allergies.update(member.get('allergies', []))
+        all_dislikes.update(member.get('dislikes', []))
+
+    return {
+        'allRestrictions': list(all_restrictions),
+        'allAllergies': list(all_allergies),
+        'allDislikes': list(all_dislikes),
+    }
+
+
+def recent_recipes_from_plans(items: List[Dict[str, Any]]) -> List[str]:
+    """Collect recipe IDs and lowercased names from PLAN# items."""
+    recent_recipes = set()
+    for item in items:
+        for meal in item.get('meals', []):
+            recipe_id = meal.get('recipeId', '')
+            # Only track Spoonacular recipe IDs (numeric)
+            if recipe_id and str(recipe_id).isdigit():
+                recent_recipes.add(str(recipe_id))
+            # Also track recipe names to avoid similar meals
+            recipe_name = meal.get('recipeName', '').lower()
+            if recipe_name:
+                recent_recipes.add(recipe_name)
+    return list(recent_recipes)
+
+
+def get_user_household_id(user_id: str) -> Optional[str]:
+    """Get the household ID for a user from their PROFILE item."""
+    table = get_dynamodb().Table(USERS_TABLE)
+
+    try:
+        response = table.get_item(
+            Key={'PK': f'USER#{user_id}', 'SK': 'PROFILE'}
+        )
+        item = response.get('Item', {})
+        return item.get('householdId')
+    except Exception as e:
+        logger.error(f"Error getting user household: {e}")
+        return None
+
+
+def query_household_items(household_id: str, table: Any = None) -> List[Dict[str, Any]]:
+    """Read the whole HOUSEHOLD#<id> partition of the users table (members and preferences)."""
+    if table is None:
+        table = get_dynamodb().Table(USERS_TABLE)
+
+    items = []
+    kwargs = {
+        'KeyConditionExpression': 'PK = :pk',
+        'ExpressionAttributeValues': {':pk': f'HOUSEHOLD#{household_id}'},
+    }
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def query_recent_plans(household_id: str, weeks_back: int = 4) -> List[Dict[str, Any]]:
+    """Get the most recent PLAN# items for a household."""
+    table = get_dynamodb().Table(MEAL_PLANS_TABLE)
+
+    response = table.query(
+        KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
+        ExpressionAttributeValues={
+            ':pk': f'HOUSEHOLD#{household_id}',
+            ':sk': 'PLAN#',
+        },
+        ScanIndexForward=False,  # Most recent first
+        Limit=weeks_back,
+    )
+    return response.get('Items', [])
+
+
+def build_context(household_id: str, household_items: List[Dict[str, Any]]) -> HouseholdContext:
+    """Build the household context from the items of its users-table partition."""
+    members = []
+    prefs_item: Dict[str, Any] = {}
+
+    for item in household_items:
+        sk = item.get('SK', '')
+        if sk.startswith('MEMBER#'):
+            members.append(member_from_item(item))
+        elif sk == 'PREFERENCES':
+            prefs_item = item
+
+    return {
+        'householdId': household_id,
+        'members': members,
+        'preferences': preferences_from_item(prefs_item),
+        'aggregatedNeeds': aggregate_needs(members),
+        'recentRecipes': [],
+    }
+
+
+def load_household_context(household_id: str, weeks_back: int = 4) -> HouseholdContext:
+    """Load members, preferences, aggregated needs and recent recipes concurrently.
+
+    Failures degrade the same way the individual lookups always have: an
+    empty context or an empty recent-recipes list, logged as errors.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        household_future = executor.submit(query_household_items, household_id)
+        plans_future = executor.submit(query_recent_plans, household_id, weeks_back)
+
+        try:
+            household_items = household_future.result()
+        except Exception as e:
+            logger.error(f"Error getting household context: {e}")
+            household_items = []
+
+        try:
+            plan_items = plans_future.result()
+        except Exception as e:
+            logger.error(f"Error getting recent recipes: {e}")
+            plan_items = []
+
+    context = build_context(household_id, household_items)
+    context['recentRecipes'] = recent_recipes_from_plans(plan_items)
+    return context
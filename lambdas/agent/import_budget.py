@@ -0,0 +1,187 @@
+"""
+Cold-start import budget for the Meal Agent Lambda
+
+Every cold start pays for the modules the handler imports before it can
+answer. Requests that fail validation, or only need a household lookup,
+should never load the agent stack (strands, the model SDKs, httpx, numpy).
+
+Each scenario runs a statement in a fresh interpreter with
+`python -X importtime`, parses the per-module breakdown, and checks it
+against a time budget and a list of modules that must not be loaded.
+
+Run with: python import_budget.py [scenario ...] [--top N]
+
+Exits non-zero when a scenario goes over budget or loads a forbidden
+module. Development tool only - not copied into the Lambda package.
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Top-level packages the early-exit paths must not import
+AGENT_STACK = ('strands', 'anthropic', 'openai', 'httpx', 'numpy', 'pydantic', 'opentelemetry')
+AWS_SDK = ('boto3', 'botocore')
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$')
+
+
+class Scenario(NamedTuple):
+    statement: str
+    budget_ms: float
+    forbidden: Tuple[str, ...]
+    description: str
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'cold_start': Scenario(
+        'import meal_agent_handler',
+        150.0,
+        AGENT_STACK + AWS_SDK,
+        'Handler module import (runs on every cold start)',
+    ),
+    'early_exit': Scenario(
+        'import meal_agent_handler; meal_agent_handler.handler({}, None)',
+        150.0,
+        AGENT_STACK + AWS_SDK,
+        'Request rejected before any lookup (401, no user ID)',
+    ),
+    'household_lookup': Scenario(
+        'import household_context; household_context.get_dynamodb()',
+        600.0,
+        AGENT_STACK,
+        'Household context lookup (DynamoDB only)',
+    ),
+    'planner': Scenario(
+        'import weekly_planner, tools.compliance, tools.recipe_corpus',
+        150.0,
+        AGENT_STACK + AWS_SDK,
+        'Deterministic planner and recipe corpus',
+    ),
+    'tools': Scenario(
+        'import tools.dynamo_tools, tools.spoonacular_tools',
+        2000.0,
+        ('numpy',),
+        'Tool modules (loaded with the agent)',
+    ),
+}
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class ScenarioResult(NamedTuple):
+    name: str
+    total_ms: float
+    records: List[ImportRecord]
+    loaded_forbidden: List[str]
+    error: Optional[str]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.total_ms > SCENARIOS[self.name].budget_ms
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and not self.loaded_forbidden and not self.over_budget
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse `-X importtime` stderr into records (depth 0 = imported directly)."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), max(0, (len(indent) - 1) // 2)))
+    return records
+
+
+def loaded_packages(records: List[ImportRecord]) -> set:
+    """Top-level package names of every imported module."""
+    return {record.module.split('.')[0] for record in records}
+
+
+def _importtime(statement: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.setdefault('AWS_REGION', 'us-east-1')
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=AGENT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+_startup_modules: Optional[set] = None
+
+
+def startup_modules() -> set:
+    """Modules the interpreter imports before running any statement (not counted)."""
+    global _startup_modules
+    if _startup_modules is None:
+        _startup_modules = {r.module for r in parse_importtime(_importtime('pass').stderr)}
+    return _startup_modules
+
+
+def run_scenario(name: str) -> ScenarioResult:
+    """Run one scenario in a fresh interpreter and check it against its budget."""
+    scenario = SCENARIOS[name]
+    proc = _importtime(scenario.statement)
+    startup = startup_modules()
+    records = [r for r in parse_importtime(proc.stderr) if r.module not in startup]
+    total_us = sum(r.cumulative_us for r in records if r.depth == 0)
+    packages = loaded_packages(records)
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f'exit {proc.returncode}'
+
+    return ScenarioResult(
+        name=name,
+        total_ms=total_us / 1000,
+        records=records,
+        loaded_forbidden=sorted(p for p in scenario.forbidden if p in packages),
+        error=error,
+    )
+
+
+def format_result(result: ScenarioResult, top: int = 10) -> str:
+    scenario = SCENARIOS[result.name]
+    status = 'OK' if result.ok else 'FAIL'
+    lines = [f"[{status}] {result.name}: {result.total_ms:.1f}ms / {scenario.budget_ms:.0f}ms - {scenario.description}"]
+    if result.error:
+        lines.append(f"    error: {result.error}")
+    if result.loaded_forbidden:
+        lines.append(f"    forbidden modules loaded: {', '.join(result.loaded_forbidden)}")
+    for record in sorted(result.records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"    {record.cumulative_us / 1000:8.1f}ms  {record.self_us / 1000:7.1f}ms self  {record.module}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check cold-start import time against budgets')
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--top', type=int, default=10, help='Slowest modules to list per scenario')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = [run_scenario(name) for name in args.scenarios or SCENARIOS]
+    for result in results:
+        print(format_result(result, args.top))
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
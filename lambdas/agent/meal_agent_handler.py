@@ -8,164 +8,102 @@ using the Strands-based Meal Agent with Claude Haiku for cost-effective intellig
 import os
 import json
 import logging
-import boto3
 import random
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timedelta
 
+from request_metrics import instrument_handler, metrics_hooks, phase, set_action
+
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
 
-# Lazy imports for cold start optimization
-_agent = None
-_agent_household = None
+# Lazy imports for cold start optimization - built on first chat request
+_agent_pool = None
+
+SYSTEM_PROMPT = """You are the HOH (Home Operations Hub) Meal Planning Assistant - a friendly, knowledgeable AI that helps families plan delicious, personalized meals.
+
+## Your Personality
+- Warm and approachable, like a helpful friend who loves cooking
+- Enthusiastic about food but respectful of dietary needs and preferences
+- Practical and understanding of busy family life
+
+## Your Capabilities
+You have access to tools that let you:
+1. **Understand the Family**: Get family members, their dietary restrictions, allergies, likes/dislikes
+2. **Know Their Preferences**: Retrieve meal preferences, cooking time limits, typical meals
+3. **Find Perfect Recipes**: Search for recipes by cuisine, diet, ingredients, cooking time (use get_recipe_details_bulk when you need details for several recipes at once)
+4. **Generate Meal Plans**: Create weekly meal plans considering all family needs
+5. **Save Plans**: Persist meal plans for the family (to swap one meal, use update_meal_slot instead of re-saving the whole week)
+6. **Shopping Lists**: Build the grocery list for a saved plan with generate_shopping_list (it sums and scales ingredients for you)
+
+## Key Guidelines
+- **Allergies are NON-NEGOTIABLE** - never suggest recipes with allergens (recipe details list them under `contains`; no need to read every ingredient)
+- **Respect dietary restrictions** - vegetarian, vegan, gluten-free, etc.
+- **Consider cooking time** - quick meals for busy nights
+- **Provide variety** - don't repeat meals too often
+- Be conversational and explain your reasoning
+- Keep responses concise but helpful
+"""
+
+GENERATION_SYSTEM_PROMPT = """You are a meal planning AI that generates personalized weekly meal plans.
+You have access to the Spoonacular API to search for recipes.
+Always return the plan through the WeeklyMealPlan tool.
+
+**CANDIDATE RECIPES ARE PROVIDED**:
+- Fresh breakfast, lunch and dinner candidates are listed in the request
+- Build the plan from them; they already give you variety
+- Only use a tool if the candidates cannot satisfy a specific preference
+
+VARIETY REQUIREMENTS:
+- NEVER repeat the same recipe in a week
+- Mix cuisines: Italian, Mexican, Asian, Indian, Mediterranean, American
+- Mix proteins: chicken, beef, fish, pork, turkey, vegetarian
+- When using search_recipes, use offset parameter (10, 20, 30, etc.) for variety
+- Fetch details for many recipes with ONE get_recipe_details_bulk call, not one get_recipe_details call per recipe
+
+Be efficient - make zero or one tool call besides returning the plan."""
+
+# Follow-up calls that fill slots missing from a structured plan
+PLAN_REPAIR_ATTEMPTS = int(os.getenv('PLAN_REPAIR_ATTEMPTS', '2'))
 
 
 def get_user_household_id(user_id: str) -> str:
     """Get the household ID for a user from DynamoDB."""
-    dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-    table = dynamodb.Table(os.getenv('USERS_TABLE', 'hoh-users-2026'))
+    from household_context import get_user_household_id as lookup_household_id
 
-    try:
-        response = table.get_item(
-            Key={'PK': f'USER#{user_id}', 'SK': 'PROFILE'}
-        )
-        item = response.get('Item', {})
-        return item.get('householdId')
-    except Exception as e:
-        logger.error(f"Error getting user household: {e}")
-        return None
+    return lookup_household_id(user_id)
 
 
 def get_recent_recipes(household_id: str, weeks_back: int = 4) -> list:
     """Get recipe IDs used in recent meal plans to avoid repetition."""
-    dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-    table = dynamodb.Table(os.getenv('MEAL_PLANS_TABLE', 'hoh-meal-plans-2026'))
+    from household_context import query_recent_plans, recent_recipes_from_plans
 
     try:
-        # Query recent meal plans
-        response = table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={
-                ':pk': f'HOUSEHOLD#{household_id}'
-            },
-            ScanIndexForward=False,  # Most recent first
-            Limit=weeks_back
-        )
-
-        recent_recipes = set()
-        for item in response.get('Items', []):
-            for meal in item.get('meals', []):
-                recipe_id = meal.get('recipeId', '')
-                # Only track Spoonacular recipe IDs (numeric)
-                if recipe_id and str(recipe_id).isdigit():
-                    recent_recipes.add(str(recipe_id))
-                # Also track recipe names to avoid similar meals
-                recipe_name = meal.get('recipeName', '').lower()
-                if recipe_name:
-                    recent_recipes.add(recipe_name)
-
-        return list(recent_recipes)
+        return recent_recipes_from_plans(query_recent_plans(household_id, weeks_back))
     except Exception as e:
         logger.error(f"Error getting recent recipes: {e}")
         return []
 
 
 def get_household_context(household_id: str) -> dict:
-    """Get all household context: family members, preferences, and dietary needs."""
-    dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-    table = dynamodb.Table(os.getenv('USERS_TABLE', 'hoh-users-2026'))
-
-    context = {
-        'householdId': household_id,
-        'members': [],
-        'preferences': {},
-        'aggregatedNeeds': {
-            'allRestrictions': [],
-            'allAllergies': [],
-            'allDislikes': [],
-        }
-    }
-
-    try:
-        # Get family members
-        members_response = table.query(
-            KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
-            ExpressionAttributeValues={
-                ':pk': f'HOUSEHOLD#{household_id}',
-                ':sk': 'MEMBER#'
-            }
-        )
-
-        all_restrictions = set()
-        all_allergies = set()
-        all_dislikes = set()
-
-        for item in members_response.get('Items', []):
-            member = {
-                'id': item['SK'].replace('MEMBER#', ''),
-                'name': item.get('name', 'Unknown'),
-                'age': item.get('age'),
-                'dietaryRestrictions': item.get('dietaryRestrictions', []),
-                'allergies': item.get('allergies', []),
-                'likes': item.get('likes', []),
-                'dislikes': item.get('dislikes', []),
-                'sameAsAdults': item.get('sameAsAdults', True),
-                'mealPreferences': item.get('mealPreferences'),
-            }
-            context['members'].append(member)
-
-            for r in member['dietaryRestrictions']:
-                all_restrictions.add(r)
-            for a in member['allergies']:
-                all_allergies.add(a)
-            for d in member['dislikes']:
-                all_dislikes.add(d)
-
-        context['aggregatedNeeds'] = {
-            'allRestrictions': list(all_restrictions),
-            'allAllergies': list(all_allergies),
-            'allDislikes': list(all_dislikes),
-        }
-
-        # Get preferences
-        prefs_response = table.get_item(
-            Key={
-                'PK': f'HOUSEHOLD#{household_id}',
-                'SK': 'PREFERENCES'
-            }
-        )
-
-        prefs_item = prefs_response.get('Item', {})
-        context['preferences'] = {
-            'mealSuggestionMode': prefs_item.get('mealSuggestionMode', 'ai_and_user'),
-            'cookingTime': prefs_item.get('cookingTime', 'medium'),
-            'typicalBreakfast': prefs_item.get('typicalBreakfast', []),
-            'typicalLunch': prefs_item.get('typicalLunch', []),
-            'typicalDinner': prefs_item.get('typicalDinner', []),
-            'typicalSnacks': prefs_item.get('typicalSnacks', []),
-            'additionalPreferences': prefs_item.get('additionalPreferences', ''),
-        }
-
-        return context
-
-    except Exception as e:
-        logger.error(f"Error getting household context: {e}")
-        return context
+    """Get all household context: family members, preferences, dietary needs and recent recipes.
 
+    Members, preferences and recent plans are loaded concurrently in one round trip.
+    """
+    from household_context import load_household_context
 
-def get_agent(household_id: str):
-    """Get or create the meal agent for a household."""
-    global _agent, _agent_household
+    with phase('householdContext'):
+        return load_household_context(household_id, weeks_back=4)
 
-    # Reuse agent if same household (Lambda warm start)
-    if _agent is not None and _agent_household == household_id:
-        return _agent
 
+def _create_agent_pool():
+    """Build the container-wide agent pool and the parts its agents share."""
     # Import here to speed up cold starts
-    from strands import Agent
-    from strands.models import BedrockModel
+    from agent_pool import AgentPool, build_shared_tool_registry, create_pooled_agent
+    from model_registry import get_cached_model, cached_system_prompt
+    from model_router import SMALL_MODEL_ID
 
     # Import custom tools
     from tools.dynamo_tools import (
@@ -173,109 +111,235 @@ def get_agent(household_id: str):
         get_family_preferences,
         get_meal_plan,
         save_meal_plan,
+        update_meal_slot,
         get_aggregated_dietary_needs,
     )
     from tools.spoonacular_tools import (
         search_recipes,
         search_recipes_by_ingredients,
         get_recipe_details,
+        get_recipe_details_bulk,
         generate_meal_plan_from_api,
         get_random_recipes,
     )
+    from tools.shopping_list import generate_shopping_list
 
-    SYSTEM_PROMPT = """You are the HOH (Home Operations Hub) Meal Planning Assistant - a friendly, knowledgeable AI that helps families plan delicious, personalized meals.
+    # Small-tier model on the shared client for all pooled agents; the chat
+    # handler swaps in the routed model per turn (see model_router)
+    # Tool specs and the static system prompt are marked cacheable
+    model = get_cached_model(SMALL_MODEL_ID)
 
-## Your Personality
-- Warm and approachable, like a helpful friend who loves cooking
-- Enthusiastic about food but respectful of dietary needs and preferences
-- Practical and understanding of busy family life
+    # Tool registry and specs are built once and shared by all pooled agents
+    tool_registry = build_shared_tool_registry([
+        get_family_members,
+        get_family_preferences,
+        get_meal_plan,
+        save_meal_plan,
+        update_meal_slot,
+        get_aggregated_dietary_needs,
+        search_recipes,
+        search_recipes_by_ingredients,
+        get_recipe_details,
+        get_recipe_details_bulk,
+        generate_meal_plan_from_api,
+        get_random_recipes,
+        generate_shopping_list,
+    ])
+
+    def create_agent(household_id: str):
+        return create_pooled_agent(
+            model,
+            tool_registry,
+            # Household-specific context goes after the cache point
+            cached_system_prompt(SYSTEM_PROMPT, f"\n\n## Context\nHousehold: {household_id}"),
+            hooks=[metrics_hooks],
+        )
 
-## Your Capabilities
-You have access to tools that let you:
-1. **Understand the Family**: Get family members, their dietary restrictions, allergies, likes/dislikes
-2. **Know Their Preferences**: Retrieve meal preferences, cooking time limits, typical meals
-3. **Find Perfect Recipes**: Search for recipes by cuisine, diet, ingredients, cooking time
-4. **Generate Meal Plans**: Create weekly meal plans considering all family needs
-5. **Save Plans**: Persist meal plans for the family
+    return AgentPool(create_agent)
 
-## Key Guidelines
-- **Allergies are NON-NEGOTIABLE** - never suggest recipes with allergens
-- **Respect dietary restrictions** - vegetarian, vegan, gluten-free, etc.
-- **Consider cooking time** - quick meals for busy nights
-- **Provide variety** - don't repeat meals too often
-- Be conversational and explain your reasoning
-- Keep responses concise but helpful
-"""
 
-    # Create model with Claude 4.5 Haiku for cost efficiency
-    model = BedrockModel(
-        model_id=os.getenv('MODEL_ID', 'us.anthropic.claude-haiku-4-5-20251001-v1:0'),
-        region_name=os.getenv('AWS_REGION', 'us-east-1')
-    )
+def get_agent_pool():
+    """Get the container-wide agent pool, creating it on first use."""
+    global _agent_pool
 
-    # Create agent
-    _agent = Agent(
-        model=model,
-        system_prompt=SYSTEM_PROMPT + f"\n\n## Context\nHousehold: {household_id}",
-        tools=[
-            get_family_members,
-            get_family_preferences,
-            get_meal_plan,
-            save_meal_plan,
-            get_aggregated_dietary_needs,
-            search_recipes,
-            search_recipes_by_ingredients,
-            get_recipe_details,
-            generate_meal_plan_from_api,
-            get_random_recipes,
-        ]
-    )
-    _agent_household = household_id
+    if _agent_pool is None:
+        _agent_pool = _create_agent_pool()
+    return _agent_pool
+
+
+def get_agent(household_id: str, session_id: Optional[str] = None):
+    """Get or create the meal agent for a household (and optional chat session)."""
+    return get_agent_pool().get(household_id, session_id)
+
+
+def save_generated_plan(
+    household_id: str,
+    start_date: str,
+    user_id: str,
+    meals: list,
+    mode: str,
+    explanation: str,
+) -> dict:
+    """Persist a generated plan as the household's PLAN#<startDate> item and return the API result."""
+    from household_context import get_dynamodb
+
+    table = get_dynamodb().Table(os.getenv('MEAL_PLANS_TABLE', 'hoh-meal-plans-2026'))
+
+    # Calculate end date
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end_date = (start + timedelta(days=6)).strftime('%Y-%m-%d')
+
+    fields = {
+        'startDate': start_date,
+        'endDate': end_date,
+        'meals': meals,
+        'mealSuggestionMode': mode,
+        'generatedBy': user_id,
+        'generatedAt': datetime.utcnow().isoformat(),
+        'generatedByAgent': True,
+        'explanation': explanation,
+        'ttl': int(datetime.utcnow().timestamp()) + (90 * 24 * 60 * 60),
+    }
+
+    # Update rather than put so a regenerated week keeps a version for update_meal_slot's
+    # conditional writes, and a version read before the regeneration no longer matches
+    with phase('save'):
+        table.update_item(
+            Key={'PK': f'HOUSEHOLD#{household_id}', 'SK': f'PLAN#{start_date}'},
+            UpdateExpression='SET ' + ', '.join(f'#{name} = :{name}' for name in fields) + ' ADD #version :one',
+            ExpressionAttributeNames={**{f'#{name}': name for name in fields}, '#version': 'version'},
+            ExpressionAttributeValues={**{f':{name}': value for name, value in fields.items()}, ':one': 1},
+        )
+
+    return {
+        'status': 'success',
+        'startDate': start_date,
+        'endDate': end_date,
+        'meals': meals,
+        'mealSuggestionMode': mode,
+        'explanation': explanation,
+    }
+
+
+def explain_meal_plan(context: dict, meals: list) -> str:
+    """Ask the model for a short explanation of a planner-built week.
+
+    This is the only LLM call on the deterministic path; it falls back to a
+    template summary if the model is unavailable.
+    """
+    from weekly_planner import summarize_plan
+
+    try:
+        from strands import Agent
+        from model_registry import get_model
+
+        model = get_model(os.getenv('MODEL_ID', 'us.anthropic.claude-haiku-4-5-20251001-v1:0'), max_tokens=200)
+        explainer = Agent(model=model, callback_handler=None, hooks=[metrics_hooks])
+
+        week = '\n'.join(f"- {m['day']} {m['mealType']}: {m['recipeName']}" for m in meals)
+        prompt = f"""In 2-3 friendly sentences, explain how this weekly meal plan fits the household.
+
+Preferences: {json.dumps(context.get('preferences', {}), default=str)}
+Dietary needs: {json.dumps(context.get('aggregatedNeeds', {}), default=str)}
+
+Plan:
+{week}
+
+Reply with the explanation text only."""
+
+        explanation = str(explainer(prompt)).strip()
+        if explanation:
+            return explanation
+    except Exception as e:
+        logger.warning(f"Plan explanation failed, using summary: {e}")
 
-    logger.info(f"Created agent for household: {household_id}")
-    return _agent
+    return summarize_plan(meals)
 
 
-def generate_meal_plan_with_agent(household_id: str, start_date: str, user_id: str) -> dict:
+def generate_meal_plan_with_agent(
+    household_id: str,
+    start_date: str,
+    user_id: str,
+    on_progress: Optional[Callable[[List[dict]], None]] = None,
+) -> dict:
     """
     Generate a personalized meal plan using the AI agent.
 
     This function:
     1. Gets household context (members, preferences, dietary needs)
-    2. Creates a focused prompt with all the context
-    3. Uses Claude Haiku to intelligently plan meals
+    2. Builds the week with the deterministic planner when possible,
+       using the model only for the explanation text
+    3. Otherwise creates a focused prompt and uses Claude Haiku to plan meals
     4. Saves the plan to DynamoDB
 
     Args:
         household_id: The household to generate meals for
         start_date: Start date in YYYY-MM-DD format
         user_id: The user who requested the plan
+        on_progress: Called with the meals chosen so far as the week fills
+            (used by plan jobs to report per-day progress)
 
     Returns:
         Dictionary with meal plan or error
     """
     from strands import Agent
-    from strands.models import BedrockModel
+    from strands.types.exceptions import StructuredOutputException
+    from model_registry import get_cached_model, cached_system_prompt, log_token_usage
+    from meal_plan_schema import WeeklyMealPlan, missing_slots, merge_meals, repair_prompt
+    from model_router import classify_request, model_id_for, can_escalate, route_metrics
     from tools.spoonacular_tools import (
         search_recipes,
         get_recipe_details,
+        get_recipe_details_bulk,
         generate_meal_plan_from_api,
     )
 
     try:
-        # Get household context
+        # Get household context and recently used recipes (to avoid repetition) in one round trip
         context = get_household_context(household_id)
+        recent_recipes = context['recentRecipes']
         logger.info(f"Household context: {json.dumps(context, default=str)[:500]}")
-
-        # Get recently used recipes to avoid repetition
-        recent_recipes = get_recent_recipes(household_id, weeks_back=4)
         logger.info(f"Recent recipes to avoid: {len(recent_recipes)} items")
 
+        # Primary path: deterministic planner. Free-text preferences need the
+        # model to interpret them, and needs the planner cannot enforce (see
+        # planner_blockers) need the model to check them, so those households
+        # go through the agent.
+        preferences = context['preferences']
+        from weekly_planner import (
+            fetch_candidate_pools, build_weekly_plan, compact_candidates, hydrate_meals, planner_blockers,
+        )
+
+        # Fetch every candidate pool concurrently up front; both the planner and
+        # the agent fallback work from these instead of serial tool calls
+        with phase('candidatePools'):
+            pools = fetch_candidate_pools(context)
+        logger.info(f"Prefetched candidates: { {k: len(v) for k, v in pools.items()} }")
+
+        planner_enabled = os.getenv('PLANNER_ENABLED', 'true').lower() == 'true'
+        blockers = planner_blockers(context)
+        if blockers:
+            logger.info(f"Planner cannot enforce {blockers}, using the agent")
+        if planner_enabled and not blockers and not preferences.get('additionalPreferences', '').strip():
+            with phase('planner'):
+                meals = build_weekly_plan(context, recent_recipes, start_date, pools, on_progress=on_progress)
+            if meals:
+                logger.info(f"Planner built {len(meals)} meals without the agent loop")
+                explanation = explain_meal_plan(context, meals)
+                return save_generated_plan(
+                    household_id,
+                    start_date,
+                    user_id,
+                    meals,
+                    preferences.get('mealSuggestionMode', 'ai_and_user'),
+                    explanation,
+                )
+            logger.info("Planner could not fill every slot, falling back to agent")
+
         # Generate random offsets for variety
         random_offset = random.randint(10, 50)
         variety_seed = random.randint(1000, 9999)
 
-        preferences = context['preferences']
         members = context['members']
         aggregated = context['aggregatedNeeds']
 
@@ -365,132 +429,100 @@ Use Spoonacular to find new recipes for variety on other days.
 ## Recently Used (AVOID THESE):
 {', '.join(recent_recipes[:30]) if recent_recipes else 'None - this is a fresh start!'}
 
+## Candidate Recipes (already fetched for you - id | title | minutes | cuisine):
+{compact_candidates(pools, recent_recipes)}
+
 {mode_instruction}
 
 ## Instructions:
 1. First, analyze the additional preferences to understand special requirements
-2. **GET RANDOM RECIPES FIRST** - This is required for variety:
-   - Call get_random_recipes(number=7, tags="breakfast") for breakfast ideas
-   - Call get_random_recipes(number=7, tags="lunch,main course") for lunch ideas
-   - Call get_random_recipes(number=7, tags="dinner,main course") for dinner ideas
-3. When using search_recipes, ALWAYS use offset={random_offset} to skip common results
+2. **PICK FROM THE CANDIDATE RECIPES ABOVE** - they were fetched fresh for variety. Only call search_recipes (at most once) if a preference cannot be met from the candidates
+3. If you do use search_recipes, ALWAYS use offset={random_offset} to skip common results
 4. Mix cuisines across the week: Italian, Mexican, Asian, Indian, Mediterranean, American
 5. Vary proteins: chicken, beef, fish, pork, turkey, vegetarian
 6. Create a meal plan for 7 days (Monday to Sunday) with breakfast, lunch, and dinner
-7. Each meal must have: recipeId, recipeName, recipeImage (URL), readyInMinutes, servings, sourceUrl
+7. Each meal must have: recipeId, recipeName, recipeImage (URL), readyInMinutes, servings, sourceUrl (for candidate recipes you may leave recipeImage, servings and sourceUrl null - they are filled in automatically)
 8. For user-provided meals without Spoonacular data, use recipeId like "user-meal-name-timestamp"
 9. Consider cooking time limits for each meal
 10. NEVER use the same recipe twice in a week
-
-Return the meal plan in this exact JSON format:
-{{
-  "meals": [
-    {{
-      "date": "YYYY-MM-DD",
-      "day": "monday",
-      "mealType": "breakfast|lunch|dinner|snacks",
-      "recipeId": "string",
-      "recipeName": "string",
-      "recipeImage": "url or null",
-      "readyInMinutes": number or null,
-      "servings": number or null,
-      "sourceUrl": "url or null",
-      "source": "user_preference|ai_suggest",
-      "isUserMeal": true|false
-    }}
-  ],
-  "explanation": "Brief explanation of how you incorporated the preferences"
-}}"""
-
-        # Create a one-off agent for meal generation
-        model = BedrockModel(
-            model_id=os.getenv('MODEL_ID', 'us.anthropic.claude-haiku-4-5-20251001-v1:0'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
-
-        meal_agent = Agent(
-            model=model,
-            system_prompt="""You are a meal planning AI that generates personalized weekly meal plans.
-You have access to the Spoonacular API to search for recipes.
-Always respond with valid JSON in the specified format.
-
-**CRITICAL - USE get_random_recipes TOOL**:
-- Call get_random_recipes(number=5, tags="breakfast") for breakfast ideas
-- Call get_random_recipes(number=5, tags="lunch,main course") for lunch ideas
-- Call get_random_recipes(number=5, tags="dinner,main course") for dinner ideas
-- This ensures you get FRESH, DIFFERENT recipes each time!
-
-VARIETY REQUIREMENTS:
-- NEVER repeat the same recipe in a week
-- Mix cuisines: Italian, Mexican, Asian, Indian, Mediterranean, American
-- Mix proteins: chicken, beef, fish, pork, turkey, vegetarian
-- When using search_recipes, use offset parameter (10, 20, 30, etc.) for variety
-
-Be aggressive with variety - make 3-5 API calls with different parameters.""",
-            tools=[
-                search_recipes,
-                get_recipe_details,
-                generate_meal_plan_from_api,
-            ]
-        )
-
-        logger.info(f"Calling agent with prompt: {generation_prompt[:500]}...")
-        response = meal_agent(generation_prompt)
-        response_text = str(response) if response else ""
-        logger.info(f"Agent response: {response_text[:1000]}...")
-
-        # Parse the response to extract JSON
+11. If you need full details for several recipes, make ONE get_recipe_details_bulk call with all their IDs - never call get_recipe_details once per meal
+
+Return the finished plan through the WeeklyMealPlan tool, with a brief explanation of how you incorporated the preferences."""
+
+        route = classify_request(action='generate')
+
+        def plan_with(model_id: str, escalated: bool = False):
+            """Run the generation agent on a model; returns (meals, explanation, missing slots)."""
+            # Create a one-off agent for meal generation
+            # Reuses the container's shared bedrock-runtime client and warm connections
+            meal_agent = Agent(
+                model=get_cached_model(model_id),
+                system_prompt=cached_system_prompt(GENERATION_SYSTEM_PROMPT),
+                tools=[
+                    search_recipes,
+                    get_recipe_details,
+                    get_recipe_details_bulk,
+                    generate_meal_plan_from_api,
+                ],
+                hooks=[metrics_hooks],
+            )
+
+            logger.info(f"Calling agent ({model_id}) with prompt: {generation_prompt[:500]}...")
+            started = time.perf_counter()
+            response = meal_agent(generation_prompt, structured_output_model=WeeklyMealPlan)
+            route_metrics.record(
+                route, model_id, (time.perf_counter() - started) * 1000,
+                log_token_usage('Generation', response), escalated,
+            )
+
+            plan = response.structured_output
+            meals = [meal.model_dump() for meal in plan.meals]
+            if on_progress:
+                on_progress(meals)
+
+            # Re-request only the empty slots instead of regenerating the week
+            for attempt in range(PLAN_REPAIR_ATTEMPTS):
+                missing = missing_slots(meals, start_date)
+                if not missing:
+                    break
+                logger.info(f"Repairing {len(missing)} missing slots (attempt {attempt + 1})")
+                try:
+                    repair = meal_agent(repair_prompt(missing), structured_output_model=WeeklyMealPlan)
+                except StructuredOutputException as e:
+                    logger.error(f"Plan repair failed: {e}")
+                    break
+                log_token_usage('Repair', repair)
+                meals = merge_meals(meals, [meal.model_dump() for meal in repair.structured_output.meals], start_date)
+                if on_progress:
+                    on_progress(meals)
+
+            return meals, plan.explanation, missing_slots(meals, start_date)
+
+        model_id = model_id_for(route)
         try:
-            # Try to find JSON in the response
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                result = json.loads(json_str)
-                meals = result.get('meals', [])
-                explanation = result.get('explanation', '')
-
-                # Save to DynamoDB
-                dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-                table = dynamodb.Table(os.getenv('MEAL_PLANS_TABLE', 'hoh-meal-plans-2026'))
-
-                # Calculate end date
-                start = datetime.strptime(start_date, '%Y-%m-%d')
-                end_date = (start + timedelta(days=6)).strftime('%Y-%m-%d')
-
-                table.put_item(Item={
-                    'PK': f'HOUSEHOLD#{household_id}',
-                    'SK': f'PLAN#{start_date}',
-                    'startDate': start_date,
-                    'endDate': end_date,
-                    'meals': meals,
-                    'mealSuggestionMode': mode,
-                    'generatedBy': user_id,
-                    'generatedAt': datetime.utcnow().isoformat(),
-                    'generatedByAgent': True,
-                    'explanation': explanation,
-                    'ttl': int(datetime.utcnow().timestamp()) + (90 * 24 * 60 * 60),
-                })
-
-                return {
-                    'status': 'success',
-                    'startDate': start_date,
-                    'endDate': end_date,
-                    'meals': meals,
-                    'mealSuggestionMode': mode,
-                    'explanation': explanation,
-                }
-            else:
-                raise ValueError("No JSON found in response")
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse agent response as JSON: {e}")
-            logger.error(f"Response was: {response_text}")
+            meals, explanation, missing = plan_with(model_id)
+        except StructuredOutputException as e:
+            logger.error(f"Agent did not return a valid meal plan: {e}")
+            meals, explanation, missing = None, '', None
+
+        # Escalate to the larger model when the plan failed validation or is still incomplete
+        if (meals is None or missing) and can_escalate(model_id):
+            logger.info(f"Escalating {route} from {model_id} to {model_id_for(route, escalated=True)}")
+            try:
+                meals, explanation, missing = plan_with(model_id_for(route, escalated=True), escalated=True)
+            except StructuredOutputException as e:
+                logger.error(f"Escalated agent did not return a valid meal plan: {e}")
+
+        if meals is None:
             return {
                 'status': 'error',
                 'error': 'Failed to parse meal plan from agent',
-                'raw_response': response_text[:500]
             }
+        if missing:
+            logger.warning(f"Saving plan with {len(missing)} unfilled slots")
+
+        meals = hydrate_meals(meals, pools)
+        return save_generated_plan(household_id, start_date, user_id, meals, mode, explanation)
 
     except Exception as e:
         logger.error(f"Error generating meal plan with agent: {e}", exc_info=True)
@@ -510,18 +542,33 @@ def get_cors_origin(event: dict) -> str:
     return allowed_origins[0] if allowed_origins else 'https://www.homeoperationshub.com'
 
 
+@instrument_handler
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler for the Meal Agent API.
 
-    Supports two modes:
+    Supports these modes:
     1. Chat mode: { "message": "user's question" }
     2. Generate mode: { "action": "generate", "startDate": "YYYY-MM-DD" }
+    3. Async generate mode: { "action": "generate_async", "startDate": "YYYY-MM-DD" }
+    4. Job status: { "action": "job_status", "jobId": "..." }
+    5. Shopping list: { "action": "shopping_list", "startDate": "YYYY-MM-DD", "pantryItems": [...] }
 
     Returns:
     - Chat: { "response": "agent's reply", "household_id": "..." }
     - Generate: { "startDate": "...", "endDate": "...", "meals": [...] }
+    - Async generate (202): { "jobId": "...", "status": "queued", "progress": {...} }
+    - Job status: { "jobId": "...", "status": "...", "progress": {...}, "result": {...} }
+    - Shopping list: { "startDate": "...", "aisles": {...}, "fromPantry": [...] }
     """
+    from plan_jobs import JOB_EVENT_SOURCE
+
+    # Asynchronous self-invocation that runs a queued generation job
+    if event.get('source') == JOB_EVENT_SOURCE:
+        from plan_jobs import run_job
+        set_action('generate_job')
+        return run_job(event, generate_meal_plan_with_agent, context)
+
     cors_origin = get_cors_origin(event)
 
     try:
@@ -545,6 +592,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Parse request body
         body = json.loads(event.get('body', '{}'))
         action = body.get('action', 'chat')
+        set_action(action)
 
         # Get user's household
         household_id = get_user_household_id(user_id)
@@ -602,6 +650,115 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'body': json.dumps(result)
             }
 
+        # Queue meal generation and return immediately
+        if action == 'generate_async':
+            start_date = body.get('startDate')
+            if not start_date:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': cors_origin,
+                        'Access-Control-Allow-Credentials': 'true',
+                    },
+                    'body': json.dumps({'error': 'startDate is required for meal generation'})
+                }
+
+            from plan_jobs import create_job, dispatch_job, job_response, valid_start_date
+
+            # Reject bad dates before a job is accepted, not as a failure inside it
+            if not valid_start_date(start_date):
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': cors_origin,
+                        'Access-Control-Allow-Credentials': 'true',
+                    },
+                    'body': json.dumps({'error': 'startDate must be a date in YYYY-MM-DD format'})
+                }
+
+            job = create_job(household_id, user_id, start_date)
+            dispatch_job(context.function_name, job, household_id)
+            logger.info(f"Queued plan job {job['jobId']} for household {household_id}, start: {start_date}")
+
+            return {
+                'statusCode': 202,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': cors_origin,
+                    'Access-Control-Allow-Credentials': 'true',
+                },
+                'body': json.dumps(job_response(job))
+            }
+
+        # Poll an async generation job
+        if action == 'job_status':
+            job_id = body.get('jobId')
+            if not job_id:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': cors_origin,
+                        'Access-Control-Allow-Credentials': 'true',
+                    },
+                    'body': json.dumps({'error': 'jobId is required'})
+                }
+
+            from plan_jobs import get_job, job_response
+
+            job = get_job(household_id, job_id)
+            if not job:
+                return {
+                    'statusCode': 404,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': cors_origin,
+                        'Access-Control-Allow-Credentials': 'true',
+                    },
+                    'body': json.dumps({'error': 'Job not found'})
+                }
+
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': cors_origin,
+                    'Access-Control-Allow-Credentials': 'true',
+                },
+                'body': json.dumps(job_response(job), default=str)
+            }
+
+        # Build the grocery list for a saved plan - no model call
+        if action == 'shopping_list':
+            start_date = body.get('startDate')
+            if not start_date:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': cors_origin,
+                        'Access-Control-Allow-Credentials': 'true',
+                    },
+                    'body': json.dumps({'error': 'startDate is required for a shopping list'})
+                }
+
+            from tools.shopping_list import generate_shopping_list
+
+            result = generate_shopping_list(household_id, start_date, pantry_items=body.get('pantryItems'))
+            status_code = {'success': 200, 'not_found': 404}.get(result.get('status'), 500)
+
+            return {
+                'statusCode': status_code,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': cors_origin,
+                    'Access-Control-Allow-Credentials': 'true',
+                },
+                'body': json.dumps(result, default=str)
+            }
+
         # Handle chat request (default)
         message = body.get('message')
 
@@ -618,9 +775,22 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         logger.info(f"Processing message for user {user_id}, household {household_id}: {message[:100]}")
 
+        from model_registry import get_cached_model, log_token_usage
+        from model_router import classify_request, model_id_for, route_metrics
+
         # Get the agent and process message
-        agent = get_agent(household_id)
+        session_id = body.get('sessionId')
+        agent = get_agent(household_id, session_id)
+
+        # Route the turn to the smallest model that can handle it
+        route = classify_request(message, action, agent.messages)
+        model_id = model_id_for(route)
+        agent.model = get_cached_model(model_id)
+        started = time.perf_counter()
+
         response = agent(message)
+        get_agent_pool().record_usage(household_id, session_id)
+        route_metrics.record(route, model_id, (time.perf_counter() - started) * 1000, log_token_usage('Chat', response))
 
         response_text = str(response) if response else "I'm sorry, I couldn't generate a response."
 
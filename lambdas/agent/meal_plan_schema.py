@@ -0,0 +1,95 @@
+"""
+Structured Meal Plan Schema for HOH Meal Agent
+
+The generation agent returns its plan through strands' structured output
+tool, validated against WeeklyMealPlan, instead of free text that has to
+be brace-scanned for JSON. When the model returns a valid but incomplete
+plan, only the missing (date, meal type) slots are re-requested and
+merged in, rather than regenerating the whole week.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from weekly_planner import DAY_NAMES, MEAL_TYPES
+
+# (date, day, mealType)
+Slot = Tuple[str, str, str]
+
+
+class PlannedMeal(BaseModel):
+    """One meal in the weekly plan."""
+
+    date: str = Field(description="Date in YYYY-MM-DD format")
+    day: str = Field(description="Lowercase day name, e.g. monday")
+    mealType: Literal['breakfast', 'lunch', 'dinner', 'snacks']
+    recipeId: str = Field(description="Spoonacular recipe ID, or user-<meal-name>-<timestamp> for family meals")
+    recipeName: str
+    recipeImage: Optional[str] = Field(default=None, description="Image URL, null for candidate recipes")
+    readyInMinutes: Optional[int] = None
+    servings: Optional[int] = None
+    sourceUrl: Optional[str] = None
+    source: Literal['user_preference', 'ai_suggest'] = 'ai_suggest'
+    isUserMeal: bool = False
+
+
+class WeeklyMealPlan(BaseModel):
+    """A week (or part of a week) of meals with a short explanation."""
+
+    meals: List[PlannedMeal] = Field(description="One meal per date and meal type")
+    explanation: str = Field(default='', description="Brief explanation of how the preferences were incorporated")
+
+
+def expected_slots(start_date: str, days: int = 7) -> List[Slot]:
+    """Every (date, day, mealType) slot a full plan must fill, in plan order."""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    slots = []
+    for day_index in range(days):
+        day_date = start + timedelta(days=day_index)
+        for meal_type in MEAL_TYPES:
+            slots.append((day_date.strftime('%Y-%m-%d'), DAY_NAMES[day_date.weekday()], meal_type))
+    return slots
+
+
+def missing_slots(meals: List[dict], start_date: str) -> List[Slot]:
+    """Slots of the week that no meal fills."""
+    filled = {(m.get('date'), m.get('mealType')) for m in meals}
+    return [slot for slot in expected_slots(start_date) if (slot[0], slot[2]) not in filled]
+
+
+def merge_meals(meals: List[dict], repairs: List[dict], start_date: str) -> List[dict]:
+    """Add repair meals for still-empty slots and return the plan in slot order.
+
+    Meals already in the plan win; repairs only fill slots that are empty,
+    and a recipe already used elsewhere in the week is not added twice.
+    """
+    by_slot = {}
+    used = set()
+    for meal in meals:
+        key = (meal.get('date'), meal.get('mealType'))
+        if key not in by_slot:
+            by_slot[key] = meal
+            used.add(str(meal.get('recipeId')))
+
+    for meal in repairs:
+        key = (meal.get('date'), meal.get('mealType'))
+        recipe_id = str(meal.get('recipeId'))
+        if key not in by_slot and recipe_id not in used:
+            by_slot[key] = meal
+            used.add(recipe_id)
+
+    order = {(date, meal_type): i for i, (date, _, meal_type) in enumerate(expected_slots(start_date))}
+    return sorted(by_slot.values(), key=lambda m: order.get((m.get('date'), m.get('mealType')), len(order)))
+
+
+def repair_prompt(slots: List[Slot]) -> str:
+    """Ask the agent to fill only the given slots."""
+    lines = [f"- {date} ({day}) {meal_type}" for date, day, meal_type in slots]
+    return (
+        "The plan is missing these meal slots:\n"
+        + "\n".join(lines)
+        + "\n\nReturn meals for ONLY these slots, following the same rules and using "
+        "recipes not already in the plan. Leave explanation empty."
+    )
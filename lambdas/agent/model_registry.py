@@ -0,0 +1,146 @@
+"""
+Model Registry for HOH Meal Agent
+
+BedrockModel builds its own bedrock-runtime boto3 client (endpoint
+resolution, credential lookup, a fresh connection pool) every time it is
+constructed. This registry creates one tuned, thread-safe bedrock-runtime
+client per container and hands out BedrockModel instances that reuse it,
+so chat agents, plan generation and explanation calls all share warm TLS
+connections.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config as BotocoreConfig
+from strands.models import BedrockModel
+from strands.models.model import CacheConfig
+
+logger = logging.getLogger()
+
+DEFAULT_MODEL_ID = os.getenv('MODEL_ID', 'us.anthropic.claude-haiku-4-5-20251001-v1:0')
+
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv('BEDROCK_MAX_POOL_CONNECTIONS', '50'))
+BEDROCK_MAX_ATTEMPTS = int(os.getenv('BEDROCK_MAX_ATTEMPTS', '4'))
+BEDROCK_RETRY_MODE = os.getenv('BEDROCK_RETRY_MODE', 'adaptive')
+BEDROCK_CONNECT_TIMEOUT = int(os.getenv('BEDROCK_CONNECT_TIMEOUT', '5'))
+BEDROCK_READ_TIMEOUT = int(os.getenv('BEDROCK_READ_TIMEOUT', '120'))
+
+PROMPT_CACHING_ENABLED = os.getenv('PROMPT_CACHING_ENABLED', 'true').lower() == 'true'
+
+_lock = threading.Lock()
+_clients: Dict[str, Any] = {}
+_models: Dict[Tuple[str, Tuple], BedrockModel] = {}
+
+
+class _SharedClientSession:
+    """Minimal stand-in for boto3.Session that hands BedrockModel the shared client."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.region_name = client.meta.region_name
+
+    def client(self, **kwargs: Any) -> Any:
+        return self._client
+
+
+def get_bedrock_client(region_name: Optional[str] = None) -> Any:
+    """Get the container-wide bedrock-runtime client for a region, creating it on first use."""
+    region = region_name or os.getenv('AWS_REGION', 'us-east-1')
+
+    client = _clients.get(region)
+    if client is None:
+        with _lock:
+            client = _clients.get(region)
+            if client is None:
+                client = boto3.client(
+                    'bedrock-runtime',
+                    region_name=region,
+                    config=BotocoreConfig(
+                        user_agent_extra='strands-agents',
+                        max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+                        connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+                        read_timeout=BEDROCK_READ_TIMEOUT,
+                        retries={'max_attempts': BEDROCK_MAX_ATTEMPTS, 'mode': BEDROCK_RETRY_MODE},
+                    ),
+                )
+                _clients[region] = client
+                logger.info(f"Created shared bedrock-runtime client for {region}")
+    return client
+
+
+def get_model(model_id: Optional[str] = None, region_name: Optional[str] = None, **model_config: Any) -> BedrockModel:
+    """Get a BedrockModel for the model ID and config, reusing the shared client.
+
+    Models are cached by (model_id, config), so repeat calls return the same
+    instance; callers must not mutate the returned model's config.
+    """
+    model_id = model_id or DEFAULT_MODEL_ID
+    key = (model_id, tuple(sorted((k, repr(v)) for k, v in model_config.items())))
+
+    model = _models.get(key)
+    if model is None:
+        client = get_bedrock_client(region_name)
+        model = BedrockModel(
+            boto_session=_SharedClientSession(client),
+            model_id=model_id,
+            **model_config,
+        )
+        with _lock:
+            model = _models.setdefault(key, model)
+    return model
+
+
+def get_cached_model(model_id: Optional[str] = None, **model_config: Any) -> BedrockModel:
+    """Get a model with prompt caching for tool specs and conversation history.
+
+    Tool definitions get a cache point after the last tool, and the
+    conversation gets one on the latest assistant message each cycle, so
+    repeated calls in an agent loop read the shared prefix from cache.
+    """
+    if PROMPT_CACHING_ENABLED:
+        model_config.setdefault('cache_tools', 'default')
+        model_config.setdefault('cache_config', CacheConfig(strategy='auto'))
+    return get_model(model_id, **model_config)
+
+
+def cached_system_prompt(static_prompt: str, dynamic_context: str = '') -> Any:
+    """Build a system prompt with a cache point between the static and per-request parts.
+
+    Everything before the cache point (tools, then the static prompt) is
+    identical across households and requests, so it is cached; the
+    household-specific context comes after it.
+    """
+    if not PROMPT_CACHING_ENABLED:
+        return static_prompt + dynamic_context
+
+    blocks: List[Dict[str, Any]] = [
+        {'text': static_prompt},
+        {'cachePoint': {'type': 'default'}},
+    ]
+    if dynamic_context:
+        blocks.append({'text': dynamic_context})
+    return blocks
+
+
+def log_token_usage(label: str, result: Any) -> Dict[str, int]:
+    """Log input/output and cache read/write token counts for an agent result."""
+    try:
+        usage = result.metrics.accumulated_usage
+    except AttributeError:
+        return {}
+
+    counts = {
+        'inputTokens': usage.get('inputTokens', 0),
+        'outputTokens': usage.get('outputTokens', 0),
+        'cacheReadInputTokens': usage.get('cacheReadInputTokens', 0),
+        'cacheWriteInputTokens': usage.get('cacheWriteInputTokens', 0),
+    }
+    logger.info(
+        f"{label} tokens: input={counts['inputTokens']} output={counts['outputTokens']} "
+        f"cacheRead={counts['cacheReadInputTokens']} cacheWrite={counts['cacheWriteInputTokens']}"
+    )
+    return counts
@@ -0,0 +1,144 @@
+"""
+Model Router for HOH Meal Agent
+
+Classifies each request with cheap heuristics and sends it to the smallest
+model tier that can handle it:
+
+    lookup        - short factual questions about recipes or the household  -> small
+    swap          - change a single meal or slot                            -> small
+    week_plan     - full weekly plan generation                             -> small, escalates
+    conversation  - long or memory-heavy conversations                      -> large
+
+A route on the small tier escalates to the large tier when its output fails
+validation. Latency and token usage are recorded per route and tier so the
+cost and latency split can be compared across deployments.
+"""
+
+import os
+import re
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger()
+
+SMALL_MODEL_ID = os.getenv('ROUTER_SMALL_MODEL_ID') or os.getenv('MODEL_ID', 'us.anthropic.claude-haiku-4-5-20251001-v1:0')
+LARGE_MODEL_ID = os.getenv('ROUTER_LARGE_MODEL_ID', 'us.anthropic.claude-sonnet-4-5-20250929-v1:0')
+ROUTER_ENABLED = os.getenv('ROUTER_ENABLED', 'true').lower() == 'true'
+
+# Conversations longer than this (in messages) go to the large tier
+CONVERSATION_MESSAGE_THRESHOLD = int(os.getenv('ROUTER_CONVERSATION_MESSAGES', '12'))
+
+# Latency samples kept per route for percentiles
+LATENCY_SAMPLES = 500
+
+ROUTE_LOOKUP = 'lookup'
+ROUTE_SWAP = 'swap'
+ROUTE_WEEK_PLAN = 'week_plan'
+ROUTE_CONVERSATION = 'conversation'
+
+ROUTE_TIERS = {
+    ROUTE_LOOKUP: 'small',
+    ROUTE_SWAP: 'small',
+    ROUTE_WEEK_PLAN: 'small',
+    ROUTE_CONVERSATION: 'large',
+}
+
+WEEK_PLAN_PATTERN = re.compile(
+    r'\b(meal plan|weekly plan|plan (my|our|the|a) (week|meals)|whole week|next week|7 days|seven days)\b'
+)
+SWAP_PATTERN = re.compile(r'\b(swap|replace|instead of|change|switch|substitute|different)\b')
+MEMORY_PATTERN = re.compile(r'\b(remember|last time|earlier|before|you said|we discussed|previously)\b')
+
+
+def classify_request(message: str = '', action: str = 'chat', history: Optional[List[Any]] = None) -> str:
+    """Pick a route for a request from its action, text and conversation length."""
+    if action in ('generate', 'generate_async'):
+        return ROUTE_WEEK_PLAN
+
+    text = (message or '').lower()
+    if len(history or []) >= CONVERSATION_MESSAGE_THRESHOLD or MEMORY_PATTERN.search(text):
+        return ROUTE_CONVERSATION
+    if WEEK_PLAN_PATTERN.search(text):
+        return ROUTE_WEEK_PLAN
+    if SWAP_PATTERN.search(text):
+        return ROUTE_SWAP
+    return ROUTE_LOOKUP
+
+
+def model_id_for(route: str, escalated: bool = False) -> str:
+    """Model ID for a route, or for the large tier once escalated."""
+    if not ROUTER_ENABLED:
+        return SMALL_MODEL_ID
+    if escalated or ROUTE_TIERS.get(route) == 'large':
+        return LARGE_MODEL_ID
+    return SMALL_MODEL_ID
+
+
+def can_escalate(model_id: str) -> bool:
+    """Whether a call that failed validation can be retried on a larger model."""
+    return ROUTER_ENABLED and model_id != LARGE_MODEL_ID
+
+
+class RouteMetrics:
+    """Per-route, per-model call counts, escalations, latency and token totals."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(
+        self,
+        route: str,
+        model_id: str,
+        latency_ms: float,
+        usage: Optional[Dict[str, int]] = None,
+        escalated: bool = False,
+    ) -> None:
+        """Record one routed model call and log it."""
+        usage = usage or {}
+        key = f"{route}:{model_id}"
+
+        with self._lock:
+            entry = self._routes.setdefault(key, {
+                'calls': 0,
+                'escalations': 0,
+                'latenciesMs': deque(maxlen=LATENCY_SAMPLES),
+                'inputTokens': 0,
+                'outputTokens': 0,
+            })
+            entry['calls'] += 1
+            entry['escalations'] += int(escalated)
+            entry['latenciesMs'].append(latency_ms)
+            entry['inputTokens'] += usage.get('inputTokens', 0)
+            entry['outputTokens'] += usage.get('outputTokens', 0)
+
+        logger.info(
+            f"Route {route} model={model_id} latency_ms={latency_ms:.0f} "
+            f"input={usage.get('inputTokens', 0)} output={usage.get('outputTokens', 0)}"
+            f"{' escalated' if escalated else ''}"
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals and p50 latency per route and model."""
+        with self._lock:
+            result = {}
+            for key, entry in self._routes.items():
+                latencies = sorted(entry['latenciesMs'])
+                result[key] = {
+                    'calls': entry['calls'],
+                    'escalations': entry['escalations'],
+                    'p50LatencyMs': latencies[len(latencies) // 2] if latencies else 0,
+                    'inputTokens': entry['inputTokens'],
+                    'outputTokens': entry['outputTokens'],
+                }
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_metrics = RouteMetrics()
+
@@ -0,0 +1,254 @@
+"""
+Plan Generation Jobs for HOH Meal Agent
+
+Weekly plan generation can take longer than API Gateway's 29-second
+limit. Instead of waiting for it, a generate_async request writes a job
+record and hands generation to a separate asynchronous invocation of the
+same function; clients poll job_status, which is a single GetItem.
+
+Each day's progress moves from pending to planned as the generator fills
+its slots, and to done (or empty) once the plan is saved. Every job has a
+deadline: when it is queued, the time by which it must have started, and
+once running, the time the invocation is cut off. A Lambda timeout never
+reaches our except clause, so job_status reports a queued or running job
+past its deadline as failed instead of leaving it running until the TTL.
+
+Job items live next to the household's plans in the meal plans table:
+    PK: HOUSEHOLD#<householdId>, SK: JOB#<jobId>
+and expire via the table's ttl attribute.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from household_context import get_dynamodb
+
+logger = logging.getLogger()
+
+MEAL_PLANS_TABLE = os.getenv('MEAL_PLANS_TABLE', 'hoh-meal-plans-2026')
+PLAN_JOB_TTL_SECONDS = int(os.getenv('PLAN_JOB_TTL_SECONDS', str(24 * 60 * 60)))
+# How long a queued job may wait for its invocation to start
+PLAN_JOB_START_SECONDS = int(os.getenv('PLAN_JOB_START_SECONDS', '300'))
+# Run time assumed when the invocation's remaining time is unknown (Lambda's maximum)
+PLAN_JOB_RUN_SECONDS = int(os.getenv('PLAN_JOB_RUN_SECONDS', '900'))
+
+# Marker on the self-invocation payload that runs a queued job
+JOB_EVENT_SOURCE = 'hoh.plan-job'
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+DAY_PENDING = 'pending'
+DAY_PLANNED = 'planned'
+DAY_DONE = 'done'
+DAY_EMPTY = 'empty'
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+
+_lambda_client = None
+
+
+def get_lambda_client():
+    """Get the container-wide Lambda client, creating it on first use."""
+    global _lambda_client
+
+    if _lambda_client is None:
+        import boto3
+        _lambda_client = boto3.client('lambda', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+    return _lambda_client
+
+
+def _job_key(household_id: str, job_id: str) -> Dict[str, str]:
+    return {'PK': f'HOUSEHOLD#{household_id}', 'SK': f'JOB#{job_id}'}
+
+
+def valid_start_date(value: Any) -> bool:
+    """True for a real calendar date written exactly as YYYY-MM-DD."""
+    if not isinstance(value, str):
+        return False
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d') == value
+    except ValueError:
+        return False
+
+
+def _plan_dates(start_date: str) -> List[str]:
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    return [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
+
+
+def create_job(household_id: str, user_id: str, start_date: str) -> Dict[str, Any]:
+    """Write a queued job record with per-day progress and return it."""
+    table = get_dynamodb().Table(MEAL_PLANS_TABLE)
+    now = datetime.utcnow()
+
+    job = {
+        **_job_key(household_id, uuid.uuid4().hex),
+        'status': JOB_QUEUED,
+        'startDate': start_date,
+        'requestedBy': user_id,
+        'progress': {date: DAY_PENDING for date in _plan_dates(start_date)},
+        'createdAt': now.isoformat(),
+        'updatedAt': now.isoformat(),
+        'deadline': int(time.time()) + PLAN_JOB_START_SECONDS,
+        'ttl': int(now.timestamp()) + PLAN_JOB_TTL_SECONDS,
+    }
+    job['jobId'] = job['SK'].replace('JOB#', '')
+
+    table.put_item(Item=job)
+    return job
+
+
+def update_job(household_id: str, job_id: str, **fields: Any) -> None:
+    """Set fields on a job record (status, progress, result or error)."""
+    table = get_dynamodb().Table(MEAL_PLANS_TABLE)
+    fields['updatedAt'] = datetime.utcnow().isoformat()
+
+    names = {f'#{name}': name for name in fields}
+    values = {f':{name}': value for name, value in fields.items()}
+    table.update_item(
+        Key=_job_key(household_id, job_id),
+        UpdateExpression='SET ' + ', '.join(f'#{name} = :{name}' for name in fields),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+
+
+def update_progress(household_id: str, job_id: str, days: Dict[str, str]) -> None:
+    """Set the progress of some days without touching the rest of the progress map."""
+    table = get_dynamodb().Table(MEAL_PLANS_TABLE)
+
+    # Dates contain '-', so each one needs a name placeholder
+    names = {'#progress': 'progress', '#updatedAt': 'updatedAt'}
+    values = {':updatedAt': datetime.utcnow().isoformat()}
+    clauses = ['#updatedAt = :updatedAt']
+    for i, (date, state) in enumerate(days.items()):
+        names[f'#d{i}'] = date
+        values[f':d{i}'] = state
+        clauses.append(f'#progress.#d{i} = :d{i}')
+
+    table.update_item(
+        Key=_job_key(household_id, job_id),
+        UpdateExpression='SET ' + ', '.join(clauses),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+
+
+def planned_days(start_date: str, meals: List[Dict[str, Any]]) -> List[str]:
+    """Dates of the week whose breakfast, lunch and dinner are all filled."""
+    filled: Dict[str, set] = {}
+    for meal in meals:
+        filled.setdefault(meal.get('date'), set()).add(meal.get('mealType'))
+    return [date for date in _plan_dates(start_date) if filled.get(date, set()) >= set(MEAL_TYPES)]
+
+
+def get_job(household_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """Read a job record, or None if it does not exist for this household."""
+    table = get_dynamodb().Table(MEAL_PLANS_TABLE)
+    response = table.get_item(Key=_job_key(household_id, job_id))
+    return response.get('Item')
+
+
+def job_response(job: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+    """API view of a job record (no keys or ttl).
+
+    A queued or running job past its deadline was lost to a timeout or a
+    failed invocation and is reported as failed.
+    """
+    view = {k: v for k, v in job.items() if k not in ('PK', 'SK', 'ttl')}
+    if view.get('deadline') is None:
+        return view
+
+    view['deadline'] = int(view['deadline'])
+    now = time.time() if now is None else now
+    if view.get('status') in (JOB_QUEUED, JOB_RUNNING) and now > view['deadline']:
+        view['status'] = JOB_FAILED
+        view['error'] = 'Plan generation did not finish in time'
+    return view
+
+
+def dispatch_job(function_name: str, job: Dict[str, Any], household_id: str) -> None:
+    """Start the job in a separate, asynchronous invocation of this function."""
+    get_lambda_client().invoke(
+        FunctionName=function_name,
+        InvocationType='Event',
+        Payload=json.dumps({
+            'source': JOB_EVENT_SOURCE,
+            'householdId': household_id,
+            'jobId': job['jobId'],
+            'startDate': job['startDate'],
+            'userId': job['requestedBy'],
+        }),
+    )
+
+
+def progress_reporter(household_id: str, job_id: str, start_date: str) -> Callable[[List[Dict[str, Any]]], None]:
+    """Callback for the generator that marks days planned as their slots fill.
+
+    Only newly planned days are written. A failed progress write is logged
+    and never fails the job.
+    """
+    reported = set()
+
+    def report(meals: List[Dict[str, Any]]) -> None:
+        days = [date for date in planned_days(start_date, meals) if date not in reported]
+        if not days:
+            return
+        try:
+            update_progress(household_id, job_id, {date: DAY_PLANNED for date in days})
+            reported.update(days)
+        except Exception as e:
+            logger.warning(f"Could not record progress for plan job {job_id}: {e}")
+
+    return report
+
+
+def run_job(event: Dict[str, Any], generate, lambda_context: Any = None) -> Dict[str, Any]:
+    """Run a dispatched job and record its progress and outcome.
+
+    generate(household_id, start_date, user_id, on_progress=...) is called
+    with a progress_reporter callback. The job's deadline is set from the
+    invocation's remaining time so job_status can report a timeout.
+    """
+    household_id = event['householdId']
+    job_id = event['jobId']
+    start_date = event['startDate']
+
+    if lambda_context is not None:
+        run_seconds = lambda_context.get_remaining_time_in_millis() / 1000
+    else:
+        run_seconds = PLAN_JOB_RUN_SECONDS
+    deadline = int(time.time() + run_seconds)
+    update_job(household_id, job_id, status=JOB_RUNNING, deadline=deadline)
+
+    try:
+        result = generate(
+            household_id, start_date, event['userId'],
+            on_progress=progress_reporter(household_id, job_id, start_date),
+        )
+    except Exception as e:
+        logger.error(f"Plan job {job_id} failed: {e}", exc_info=True)
+        result = {'status': 'error', 'error': str(e)}
+
+    if result.get('status') == 'error':
+        update_job(household_id, job_id, status=JOB_FAILED, error=result.get('error', 'Failed to generate meal plan'))
+        return result
+
+    filled = {meal.get('date') for meal in result.get('meals', [])}
+    update_job(
+        household_id,
+        job_id,
+        status=JOB_COMPLETED,
+        progress={date: DAY_DONE if date in filled else DAY_EMPTY for date in _plan_dates(start_date)},
+        result={'startDate': result['startDate'], 'endDate': result['endDate'], 'planKey': f"PLAN#{start_date}"},
+    )
+    logger.info(f"Plan job {job_id} completed for household {household_id}")
+    return result
@@ -0,0 +1,297 @@
+"""
+Request Metrics for HOH Meal Agent
+
+Each API request emits one CloudWatch Embedded Metric Format (EMF) record
+on stdout with where its time went:
+
+- phases: household context, Spoonacular HTTP calls, candidate pools,
+  planner, model calls, tool executions and the plan save (milliseconds)
+- counts: model calls, agent cycles, tool calls and errors, Spoonacular calls
+- token usage per agent invocation (from strands' EventLoopMetrics)
+- recipe cache, household cache and agent pool hits and misses
+- whether the request ran on a cold container
+
+Model and tool timings come from strands hook events (MetricsHooks), so
+every agent - pooled chat agents, generation and explanation agents - is
+covered without wrapping tools one by one. Phases add up time spent in each
+phase across threads, so concurrent work (e.g. parallel candidate pool
+fetches) can sum to more than the request's wall time.
+
+Lambda runs one request per container at a time, so the request being
+recorded is module state rather than a context variable: tools run on
+strands' worker threads and must still find it. This module only uses the
+standard library so instrumenting the handler costs nothing on cold start.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import functools
+import contextlib
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger()
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'HOH/MealAgent')
+
+_lock = threading.Lock()
+_current: Optional['RequestMetrics'] = None
+_cold_start = True
+
+
+class RequestMetrics:
+    """Durations, counters and token usage collected during one request."""
+
+    def __init__(self, action: str = 'unknown', cold_start: bool = False, request_id: Optional[str] = None):
+        self.action = action
+        self.cold_start = cold_start
+        self.request_id = request_id
+        self.status_code: Optional[int] = None
+        self.started = time.perf_counter()
+
+        self._lock = threading.Lock()
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.counts: Counter = Counter()
+        self.tool_durations: Dict[str, float] = defaultdict(float)
+        self._cache_baseline = cache_counters()
+
+    def add_phase(self, phase: str, duration_ms: float) -> None:
+        with self._lock:
+            self.phases[phase] += duration_ms
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[name] += amount
+
+    def add_tool_call(self, tool_name: str, duration_ms: float, failed: bool = False) -> None:
+        with self._lock:
+            self.phases['tools'] += duration_ms
+            self.tool_durations[tool_name] += duration_ms
+            self.counts['toolCalls'] += 1
+            self.counts['toolErrors'] += int(failed)
+
+    def add_usage(self, usage: Dict[str, int]) -> None:
+        """Add one agent invocation's token usage."""
+        with self._lock:
+            for key in ('inputTokens', 'outputTokens', 'cacheReadInputTokens', 'cacheWriteInputTokens'):
+                self.counts[key] += usage.get(key, 0)
+
+    def to_emf(self, namespace: str = METRICS_NAMESPACE, timestamp_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Build the EMF record: metric values at the top level, described under _aws."""
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        caches = cache_counters()
+
+        with self._lock:
+            values: Dict[str, Any] = {'durationMs': duration_ms}
+            values.update({f"{phase}Ms": ms for phase, ms in sorted(self.phases.items())})
+            counts = {'coldStart': int(self.cold_start), **self.counts}
+            counts.update({
+                name: caches[name] - self._cache_baseline.get(name, 0)
+                for name in caches
+            })
+            counts = {name: value for name, value in counts.items() if value or name == 'coldStart'}
+            tool_durations = {name: round(ms, 2) for name, ms in self.tool_durations.items()}
+
+        metrics = [{'Name': name, 'Unit': 'Milliseconds'} for name in values]
+        metrics += [{'Name': name, 'Unit': 'Count'} for name in counts]
+
+        record = {
+            '_aws': {
+                'Timestamp': timestamp_ms if timestamp_ms is not None else int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': namespace,
+                    'Dimensions': [['action']],
+                    'Metrics': metrics,
+                }],
+            },
+            'action': self.action,
+            'statusCode': self.status_code,
+            'requestId': self.request_id,
+            **{name: round(value, 2) for name, value in values.items()},
+            **counts,
+        }
+        if tool_durations:
+            # Searchable in Logs Insights without a metric per tool name
+            record['toolDurationsMs'] = tool_durations
+        return record
+
+
+def cache_counters() -> Dict[str, int]:
+    """Hit/miss counters of the container caches that are already loaded.
+
+    Modules are looked up, never imported, so metrics do not pull the tool
+    stack into requests that do not need it.
+    """
+    counters: Dict[str, int] = {}
+
+    recipe_cache = getattr(sys.modules.get('tools.recipe_cache'), '_recipe_cache', None)
+    if recipe_cache is not None:
+        stats = recipe_cache.stats()
+        counters['recipeCacheHits'] = stats['hits'] + stats['sharedHits']
+        # Stale entries are re-fetched before use, so they count as misses
+        counters['recipeCacheMisses'] = stats['misses'] + stats['staleHits']
+
+    household_cache = getattr(sys.modules.get('tools.household_cache'), 'household_cache', None)
+    if household_cache is not None:
+        stats = household_cache.stats()
+        counters['householdCacheHits'] = stats['hits']
+        counters['householdCacheMisses'] = stats['misses']
+
+    agent_pool = getattr(sys.modules.get('meal_agent_handler'), '_agent_pool', None)
+    if agent_pool is not None:
+        stats = agent_pool.stats()
+        counters['agentPoolHits'] = stats['hits']
+        counters['agentPoolMisses'] = stats['misses']
+
+    return counters
+
+
+def current() -> Optional[RequestMetrics]:
+    """The request being recorded, if any."""
+    return _current
+
+
+def start_request(action: str = 'unknown', request_id: Optional[str] = None) -> RequestMetrics:
+    """Begin recording a request; the first one in a container is flagged as a cold start."""
+    global _current, _cold_start
+
+    with _lock:
+        metrics = RequestMetrics(action, cold_start=_cold_start, request_id=request_id)
+        _cold_start = False
+        _current = metrics
+    return metrics
+
+
+def finish_request(status_code: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Stop recording and print the request's EMF record (returned for callers and tests)."""
+    global _current
+
+    with _lock:
+        metrics, _current = _current, None
+    if metrics is None:
+        return None
+
+    metrics.status_code = status_code
+    record = metrics.to_emf()
+    if METRICS_ENABLED:
+        # EMF must be a bare JSON line: not through the Lambda log formatter (which
+        # prefixes it) and not glued to streamed agent text without a trailing newline
+        print('\n' + json.dumps(record, default=str), flush=True)
+    return record
+
+
+def set_action(action: str) -> None:
+    """Set the action dimension once the request body has been parsed."""
+    if _current is not None:
+        _current.action = action
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add to a counter of the current request (no-op outside a request)."""
+    if _current is not None:
+        _current.count(name, amount)
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block as a phase of the current request (no-op outside a request)."""
+    metrics = _current
+    if metrics is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(name, (time.perf_counter() - started) * 1000)
+
+
+def instrument_handler(handler: Callable[[Dict[str, Any], Any], Dict[str, Any]]) -> Callable[[Dict[str, Any], Any], Dict[str, Any]]:
+    """Record every invocation of a Lambda handler and emit its metrics when it returns."""
+    @functools.wraps(handler)
+    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        start_request(request_id=getattr(context, 'aws_request_id', None))
+        response = None
+        try:
+            response = handler(event, context)
+            return response
+        finally:
+            status_code = response.get('statusCode') if isinstance(response, dict) else None
+            try:
+                finish_request(status_code)
+            except Exception as e:
+                logger.warning(f"Could not emit request metrics: {e}")
+    return wrapper
+
+
+class MetricsHooks:
+    """strands hook provider that times model calls and tool executions.
+
+    Pass to an Agent with hooks=[metrics_hooks]. One instance serves every
+    agent in the container: start times are keyed by agent and tool use.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._model_started: Dict[int, float] = {}
+        self._tool_started: Dict[str, float] = {}
+
+    def register_hooks(self, registry: Any, **kwargs: Any) -> None:
+        from strands.hooks import (
+            AfterInvocationEvent,
+            AfterModelCallEvent,
+            AfterToolCallEvent,
+            BeforeModelCallEvent,
+            BeforeToolCallEvent,
+        )
+
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(AfterModelCallEvent, self.after_model_call)
+        registry.add_callback(BeforeToolCallEvent, self.before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self.after_tool_call)
+        registry.add_callback(AfterInvocationEvent, self.after_invocation)
+
+    def before_model_call(self, event: Any) -> None:
+        with self._lock:
+            self._model_started[id(event.agent)] = time.perf_counter()
+
+    def after_model_call(self, event: Any) -> None:
+        with self._lock:
+            started = self._model_started.pop(id(event.agent), None)
+        metrics = _current
+        if metrics is None or started is None:
+            return
+        metrics.add_phase('model', (time.perf_counter() - started) * 1000)
+        metrics.count('modelCalls')
+        if event.exception is not None:
+            metrics.count('modelErrors')
+
+    def before_tool_call(self, event: Any) -> None:
+        with self._lock:
+            self._tool_started[event.tool_use['toolUseId']] = time.perf_counter()
+
+    def after_tool_call(self, event: Any) -> None:
+        with self._lock:
+            started = self._tool_started.pop(event.tool_use['toolUseId'], None)
+        metrics = _current
+        if metrics is None or started is None:
+            return
+        failed = event.exception is not None or (event.result or {}).get('status') == 'error'
+        metrics.add_tool_call(event.tool_use['name'], (time.perf_counter() - started) * 1000, failed)
+
+    def after_invocation(self, event: Any) -> None:
+        metrics = _current
+        invocation = event.agent.event_loop_metrics.latest_agent_invocation
+        if metrics is None or invocation is None:
+            return
+        metrics.count('agentCycles', len(invocation.cycles))
+        metrics.add_usage(invocation.usage)
+
+
+metrics_hooks = MetricsHooks()
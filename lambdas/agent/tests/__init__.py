@@ -0,0 +1 @@
+# Tests for HOH Meal Agent
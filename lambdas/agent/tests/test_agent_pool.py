@@ -0,0 +1,92 @@
+"""
+Tests for the multi-household agent pool
+
+Run with: pytest tests/test_agent_pool.py -v
+"""
+
+import pytest
+
+
+class FakeAgent:
+    def __init__(self, household_id):
+        self.household_id = household_id
+        self.messages = []
+
+
+class TestAgentPool:
+    """Tests for LRU eviction and memory accounting"""
+
+    def test_reuses_agent_per_household_and_session(self):
+        """Same household/session gets the same agent; a new session gets its own"""
+        from agent_pool import AgentPool
+
+        pool = AgentPool(FakeAgent)
+
+        first = pool.get('h1')
+        assert pool.get('h1') is first
+        assert pool.get('h1', 'session-2') is not first
+        assert pool.stats()['hits'] == 1
+        assert pool.stats()['misses'] == 2
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Pool never holds more than max_agents"""
+        from agent_pool import AgentPool
+
+        pool = AgentPool(FakeAgent, max_agents=2)
+        h1 = pool.get('h1')
+        pool.get('h2')
+        pool.get('h1')
+        pool.get('h3')
+
+        assert pool.stats()['size'] == 2
+        assert pool.stats()['evictions'] == 1
+        assert pool.get('h1') is h1
+        assert pool.stats()['misses'] == 3
+
+    def test_evicts_by_memory_after_conversation_grows(self):
+        """A conversation growing past the byte budget pushes out older agents"""
+        from agent_pool import AgentPool
+
+        pool = AgentPool(
+            FakeAgent,
+            max_agents=10,
+            max_bytes=1000,
+            estimate_bytes=lambda agent: 100 + 100 * len(agent.messages),
+        )
+        pool.get('h1')
+        big = pool.get('h2')
+        big.messages.extend(['turn'] * 9)
+
+        pool.record_usage('h2')
+
+        assert pool.stats()['size'] == 1
+        assert pool.get('h2') is big
+
+    def test_pooled_agents_share_model_and_registry(self):
+        """Agents built from shared parts reuse the model and tool specs"""
+        from unittest.mock import MagicMock
+        from strands import tool
+        from agent_pool import build_shared_tool_registry, create_pooled_agent
+
+        @tool
+        def ping(name: str) -> dict:
+            """Say hello.
+
+            Args:
+                name: Who to greet
+            """
+            return {'status': 'success', 'name': name}
+
+        registry = build_shared_tool_registry([ping])
+        model = MagicMock()
+
+        a = create_pooled_agent(model, registry, 'prompt a')
+        b = create_pooled_agent(model, registry, 'prompt b')
+
+        assert a.tool_registry is b.tool_registry
+        assert a.tool_names == ['ping']
+        assert registry.get_all_tools_config() is registry.get_all_tools_config()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
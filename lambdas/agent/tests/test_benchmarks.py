@@ -0,0 +1,87 @@
+"""
+Tests for the offline benchmark harness
+
+Run with: pytest tests/test_benchmarks.py -v
+"""
+
+import os
+import pytest
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['USERS_TABLE'] = 'hoh-users-test'
+os.environ['MEAL_PLANS_TABLE'] = 'hoh-meal-plans-test'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+class TestScenarios:
+    """Every scenario runs offline end to end with the expected call pattern"""
+
+    @pytest.mark.parametrize('name,model_calls,tool_calls', [
+        ('generate_planner', 1, {}),
+        ('generate_agent', 2, {'get_recipe_details_bulk': 1}),
+        ('chat', 3, {'get_aggregated_dietary_needs': 1, 'search_recipes': 1}),
+        ('chat_swap_meal', 4, {'get_meal_plan': 1, 'search_recipes': 1, 'update_meal_slot': 1}),
+        ('shopping_list', 0, {}),
+    ])
+    def test_scenario(self, name, model_calls, tool_calls):
+        """Cold and warm iterations succeed and count model, tool and HTTP calls"""
+        from benchmarks.scenarios import run_scenario
+
+        results = run_scenario(name, iterations=2)
+
+        assert [r['statusCode'] for r in results] == [200, 200]
+        for result in results:
+            assert result['modelCalls'] == model_calls
+            assert result['toolCalls'] == tool_calls
+            assert result['dynamodbCalls'] > 0
+        assert results[0]['httpCalls'] > 0
+
+    def test_generated_plan_is_complete(self):
+        """The scripted agent fills every slot from the candidates without a repair pass"""
+        from benchmarks.scenarios import OfflineEnvironment, SCENARIOS, START_DATE, AGENT_HOUSEHOLD, api_event
+        from benchmarks.fakes import ScriptedModel
+        import household_context
+        import meal_agent_handler
+
+        scenario = SCENARIOS['generate_agent']
+        with OfflineEnvironment() as env:
+            env.seed()
+            env.model = ScriptedModel(scenario.turns(), env.recorder)
+            meal_agent_handler.handler(api_event(scenario.user_id, scenario.body), None)
+
+            plan = env.dynamodb.Table(household_context.MEAL_PLANS_TABLE).get_item(
+                Key={'PK': f'HOUSEHOLD#{AGENT_HOUSEHOLD}', 'SK': f'PLAN#{START_DATE}'}
+            )['Item']
+
+        assert len(plan['meals']) == 21
+        assert len({meal['recipeId'] for meal in plan['meals']}) == 21
+
+
+class TestSpoonacularFixtures:
+    """The fixture transport answers like Spoonacular"""
+
+    def test_complex_search_filters(self):
+        """Diet, type and intolerance filters narrow the recorded catalog"""
+        import httpx
+        from tools.compliance import forbidden_mask, is_compliant, recipe_mask
+        from benchmarks.fakes import Recorder, SpoonacularFixtures
+        from benchmarks.scenarios import load_fixture
+
+        recorder = Recorder()
+        fixtures = SpoonacularFixtures(load_fixture('spoonacular_recipes.json')['recipes'], recorder)
+        with httpx.Client(base_url='https://api.spoonacular.com', transport=fixtures.transport()) as client:
+            body = client.get('/recipes/complexSearch', params={
+                'type': 'main course', 'diet': 'vegetarian', 'intolerances': 'dairy', 'number': 50,
+            }).json()
+
+        assert body['results']
+        for recipe in body['results']:
+            assert 'vegetarian' in recipe['diets']
+            assert is_compliant(recipe_mask(recipe['extendedIngredients']), forbidden_mask(['dairy'])) is not False
+        assert recorder.counts['http.recipes/complexSearch'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
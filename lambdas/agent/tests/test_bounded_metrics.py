@@ -0,0 +1,96 @@
+"""
+Tests for bounded event loop metrics
+
+Run with: pytest tests/test_bounded_metrics.py -v
+"""
+
+import os
+import pytest
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+
+
+def run_cycles(metrics, durations):
+    for index, duration in enumerate(durations):
+        start_time, trace = metrics.start_cycle({'event_loop_cycle_id': f'cycle-{index}'})
+        metrics.end_cycle(start_time - duration, trace)
+
+
+class TestBoundedEventLoopMetrics:
+    """Tests for ring-buffer retention and rolling aggregates"""
+
+    def test_ring_buffers_keep_recent_cycles(self):
+        """Only the newest traces are kept; counts and durations still cover every cycle"""
+        from bounded_metrics import BoundedEventLoopMetrics
+
+        metrics = BoundedEventLoopMetrics(max_traces=3)
+        metrics.reset_usage_metrics()
+        run_cycles(metrics, [0.2] * 10)
+
+        summary = metrics.get_summary()
+
+        assert len(metrics.traces) == 3
+        assert len(metrics.cycle_durations) == 3
+        assert [trace['name'] for trace in summary['traces']] == ['Cycle 8', 'Cycle 9', 'Cycle 10']
+        assert summary['total_cycles'] == 10
+        assert summary['total_duration'] == pytest.approx(2.0, abs=0.05)
+
+    def test_each_invocation_starts_a_new_window(self):
+        """Usage and cycles describe the current invocation; lifetime totals keep growing"""
+        from bounded_metrics import BoundedEventLoopMetrics
+
+        metrics = BoundedEventLoopMetrics(max_invocations=2)
+        for _ in range(5):
+            metrics.reset_usage_metrics()
+            run_cycles(metrics, [0.1, 3.0])
+            metrics.update_usage({'inputTokens': 100, 'outputTokens': 10, 'totalTokens': 110})
+
+        lifetime = metrics.lifetime_summary()
+
+        assert metrics.cycle_count == 2
+        assert metrics.accumulated_usage['inputTokens'] == 100
+        assert len(metrics.agent_invocations) == 1
+        assert metrics.latest_agent_invocation.usage['outputTokens'] == 10
+        assert lifetime['invocations'] == 5
+        assert lifetime['cycles'] == 10
+        assert lifetime['inputTokens'] == 500
+        assert lifetime['cycleHistogram']['le0.5s'] == 5
+        assert lifetime['cycleHistogram']['le5s'] == 5
+        assert sum(lifetime['cycleHistogram'].values()) == 10
+
+    def test_without_reset_invocations_are_bounded(self):
+        """With per-invocation reset off, usage accumulates but history stays bounded"""
+        from bounded_metrics import BoundedEventLoopMetrics
+
+        metrics = BoundedEventLoopMetrics(max_traces=4, max_invocations=2, reset_per_invocation=False)
+        for _ in range(5):
+            metrics.reset_usage_metrics()
+            run_cycles(metrics, [0.1, 0.1])
+            metrics.update_usage({'inputTokens': 100, 'outputTokens': 10, 'totalTokens': 110})
+
+        assert metrics.cycle_count == 10
+        assert metrics.accumulated_usage['inputTokens'] == 500
+        assert len(metrics.agent_invocations) == 2
+        assert len(metrics.traces) == 4
+
+    def test_pooled_agent_result_reports_one_invocation(self):
+        """A reused pooled agent reports each request's usage, not the running total"""
+        from strands.tools.registry import ToolRegistry
+        from agent_pool import create_pooled_agent
+        from benchmarks.fakes import Recorder, ScriptedModel
+
+        recorder = Recorder()
+        model = ScriptedModel([], recorder)
+        agent = create_pooled_agent(model, ToolRegistry(), 'prompt', callback_handler=None)
+
+        results = [agent(f'Question {i}') for i in range(3)]
+
+        assert results[-1].metrics.accumulated_usage['outputTokens'] == recorder.tokens['output'] // 3
+        assert results[-1].metrics.cycle_count == 1
+        assert agent.event_loop_metrics.lifetime_summary()['invocations'] == 3
+        assert agent.event_loop_metrics.lifetime_summary()['outputTokens'] == recorder.tokens['output']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
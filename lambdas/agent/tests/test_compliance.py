@@ -0,0 +1,132 @@
+"""
+Tests for allergen and diet compliance masks
+
+Run with: pytest tests/test_compliance.py -v
+"""
+
+import os
+import pytest
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+def ingredients(*names):
+    return [{'name': name} for name in names]
+
+
+class TestClassification:
+    """Tests for ingredient classification"""
+
+    @pytest.mark.parametrize('name,expected', [
+        ('Peanut Butter', ['peanut']),
+        ('coconut milk', []),
+        ('low sodium soy sauce', ['gluten', 'soy']),
+        ('eggplant', []),
+        ('large eggs', ['egg']),
+        ('gluten-free spaghetti', []),
+        ('shredded cheddar cheese', ['dairy']),
+        ('hummus', ['sesame']),
+        ('chicken broth', ['meat']),
+    ])
+    def test_ingredient_names(self, name, expected):
+        """Compound names are classified by phrase, not just by word"""
+        from tools.compliance import ingredient_mask, contains
+
+        assert contains(ingredient_mask(name)) == expected
+
+    def test_forbidden_mask_from_aggregated_needs(self):
+        """Allergies and restrictions combine into one forbidden mask"""
+        from tools.compliance import forbidden_mask, is_compliant, recipe_mask
+
+        forbidden = forbidden_mask(['Peanuts', 'Shellfish'], ['Vegetarian', 'Gluten-Free'])
+        pad_thai = recipe_mask(ingredients('rice noodles', 'tofu', 'peanuts', 'lime'))
+        risotto = recipe_mask(ingredients('arborio rice', 'mushrooms', 'parmesan'))
+
+        assert is_compliant(pad_thai, forbidden) is False
+        assert is_compliant(risotto, forbidden) is True
+        assert is_compliant(0, forbidden) is None
+
+
+class TestComplianceFiltering:
+    """Tests for mask-based candidate filtering"""
+
+    def test_corpus_masks_only_reject(self):
+        """Intolerances need Spoonacular verification; a mask can only reject a recipe"""
+        from tools.compliance import recipe_mask
+        from tools.recipe_corpus import RecipeCorpus
+
+        corpus = RecipeCorpus()
+        for recipe_id, title, names, free_of in [
+            (1, 'Shrimp Tacos', ('shrimp', 'corn tortillas'), ['shellfish']),
+            (2, 'Bean Tacos', ('black beans', 'corn tortillas'), []),
+            (3, 'Fish Tacos', (), ['shellfish']),
+            (4, 'Veggie Tacos', ('zucchini', 'corn tortillas'), ['shellfish']),
+        ]:
+            corpus.add({'id': recipe_id, 'title': title, 'ingredients': ingredients(*names),
+                        'compliance': recipe_mask(ingredients(*names)) if names else None}, free_of)
+
+        docs = corpus.search('tacos', intolerances='shellfish')
+
+        assert sorted(r['id'] for r in corpus.records(docs)) == [3, 4]
+
+    def test_corpus_rejects_unlisted_allergen_carriers(self):
+        """Mixed nuts, pizza dough and gruyere are never returned for those intolerances"""
+        from tools.compliance import recipe_mask
+        from tools.recipe_corpus import RecipeCorpus
+
+        names = ingredients('mixed nuts', 'pizza dough', 'gruyere', 'tomato sauce')
+        intolerances = ['tree nut', 'gluten', 'dairy', 'peanut']
+        corpus = RecipeCorpus()
+        corpus.add({'id': 1, 'title': 'Nutty Pizza', 'ingredients': names,
+                    'compliance': recipe_mask(names)}, intolerances)
+
+        assert corpus.search('pizza', intolerances=','.join(intolerances)) == []
+
+    def test_local_recipes_require_verification(self):
+        """The rate-limited fallback only returns recipes verified for each intolerance"""
+        from tools.compliance import recipe_mask
+        from tools.recipe_cache import get_recipe_cache
+        from tools.recipe_corpus import get_recipe_corpus
+        from tools.spoonacular_tools import _local_recipes
+
+        cache, corpus = get_recipe_cache(), get_recipe_corpus()
+        for recipe_id, title, names, free_of in [
+            (9101, 'Pesto Pasta', ('basil pesto', 'rice noodles'), ['tree nut']),
+            (9102, 'Lemon Pasta', ('rice noodles', 'lemon'), []),
+            (9103, 'Garlic Pasta', ('rice noodles', 'garlic'), ['tree nut']),
+        ]:
+            recipe = {'id': recipe_id, 'title': title, 'ingredients': ingredients(*names),
+                      'compliance': recipe_mask(ingredients(*names))}
+            cache.put(f'recipe:{recipe_id}', recipe)
+            corpus.add(recipe, free_of)
+
+        matches = _local_recipes(words=['pasta'], diets=['tree nut'])
+
+        assert [r['id'] for r in matches] == [9103]
+
+    def test_planner_rejects_known_violations(self):
+        """build_weekly_plan skips candidates whose mask hits the household's allergies"""
+        from tools.compliance import recipe_mask
+        from weekly_planner import build_weekly_plan
+
+        context = {
+            'preferences': {'mealSuggestionMode': 'ai_suggest', 'cookingTime': 'elaborate'},
+            'aggregatedNeeds': {'allAllergies': ['dairy'], 'allRestrictions': [], 'allDislikes': []},
+            'members': [],
+        }
+        unsafe = {'id': 1, 'title': 'Alfredo Bowl', 'compliance': recipe_mask(ingredients('heavy cream'))}
+        pools = {
+            meal_type: [unsafe] + [{'id': f'{meal_type}-{i}', 'title': f'{meal_type} {i}'} for i in range(7)]
+            for meal_type in ('breakfast', 'lunch', 'dinner')
+        }
+
+        meals = build_weekly_plan(context, [], '2026-01-05', pools, seed=1)
+
+        assert meals and all(meal['recipeId'] != '1' for meal in meals)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,376 @@
+"""
+Tests for the DynamoDB tools and the household context cache
+
+Run with: pytest tests/test_dynamo_tools.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['USERS_TABLE'] = 'hoh-users-test'
+os.environ['MEAL_PLANS_TABLE'] = 'hoh-meal-plans-test'
+
+HOUSEHOLD_ITEMS = {
+    'Items': [
+        {'SK': 'MEMBER#1', 'name': 'John', 'age': 35, 'allergies': ['peanuts']},
+        {'SK': 'MEMBER#2', 'name': 'Junior', 'age': 5, 'sameAsAdults': False, 'dislikes': ['broccoli']},
+        {'SK': 'PREFERENCES', 'cookingTime': 'quick', 'typicalBreakfast': ['eggs']},
+    ]
+}
+
+
+class TestHouseholdCachedTools:
+    """Tests for the cached chat-path DynamoDB tools"""
+
+    def setup_method(self):
+        from tools.household_cache import household_cache
+        household_cache.clear()
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_chat_tools_share_one_query(self, mock_dynamodb):
+        """Members, preferences and aggregated needs are served from one cached query"""
+        from tools.dynamo_tools import (
+            get_family_members,
+            get_family_preferences,
+            get_aggregated_dietary_needs,
+        )
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.query.return_value = HOUSEHOLD_ITEMS
+
+        members = get_family_members('test-household')
+        preferences = get_family_preferences('test-household')
+        needs = get_aggregated_dietary_needs('test-household')
+
+        assert members['memberCount'] == 2
+        assert preferences['cookingTime'] == 'quick'
+        assert needs['allAllergies'] == ['peanuts']
+        assert needs['membersWithDifferentMeals'][0]['name'] == 'Junior'
+        mock_table.query.assert_called_once()
+        mock_table.get_item.assert_not_called()
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_save_meal_plan_invalidates(self, mock_dynamodb):
+        """Writes drop the cached household so the next read reloads"""
+        from tools.dynamo_tools import get_family_members, save_meal_plan
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.query.return_value = HOUSEHOLD_ITEMS
+
+        get_family_members('test-household')
+        save_meal_plan('test-household', '2026-01-05', [])
+        get_family_members('test-household')
+
+        assert mock_table.query.call_count == 2
+
+
+class TestHouseholdCache:
+    """Tests for TTL and version stamps"""
+
+    def test_expires_after_ttl(self):
+        """Entries older than the TTL are reloaded"""
+        from tools.household_cache import HouseholdCache
+
+        now = [0.0]
+        cache = HouseholdCache(ttl_seconds=10, clock=lambda: now[0])
+        loads = []
+
+        cache.get('h1', lambda: loads.append(1) or 'a')
+        now[0] = 5
+        cache.get('h1', lambda: loads.append(1) or 'b')
+        now[0] = 20
+        assert cache.get('h1', lambda: loads.append(1) or 'c') == 'c'
+        assert len(loads) == 2
+
+    def test_load_racing_a_write_is_not_stored(self):
+        """A load that overlaps an invalidation is returned but not cached"""
+        from tools.household_cache import HouseholdCache
+
+        cache = HouseholdCache(ttl_seconds=60)
+
+        def racing_loader():
+            cache.invalidate('h1')
+            return 'old'
+
+        assert cache.get('h1', racing_loader) == 'old'
+        assert cache.get('h1', lambda: 'new') == 'new'
+        assert cache.get('h1', lambda: 'newer') == 'new'
+
+    def test_bounded_by_max_entries(self):
+        """Least recently used households are evicted and their version stamps dropped"""
+        from tools.household_cache import HouseholdCache
+
+        cache = HouseholdCache(ttl_seconds=60, max_entries=2)
+        for household_id in ('h1', 'h2', 'h3'):
+            cache.get(household_id, lambda: household_id)
+            cache.invalidate(household_id)
+            cache.get(household_id, lambda: household_id)
+        cache.get('h2', lambda: 'reloaded')
+
+        assert cache.stats()['size'] == 2
+        assert cache.stats()['evictions'] == 1
+        assert cache.get('h1', lambda: 'reloaded') == 'reloaded'
+        assert set(cache._versions) <= set(cache._entries)
+
+    def test_expired_entries_are_dropped(self):
+        """An expired entry does not linger after it is next looked up"""
+        from tools.household_cache import HouseholdCache
+
+        now = [0.0]
+        cache = HouseholdCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.get('h1', lambda: 'a')
+        now[0] = 20
+
+        with pytest.raises(RuntimeError):
+            cache.get('h1', lambda: (_ for _ in ()).throw(RuntimeError('down')))
+
+        assert cache.stats()['size'] == 0
+        assert not cache._loading and not cache._versions
+
+
+def conditional_failure(item=None):
+    from botocore.exceptions import ClientError
+    from boto3.dynamodb.types import TypeSerializer
+
+    response = {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}
+    if item is not None:
+        serializer = TypeSerializer()
+        response['Item'] = {name: serializer.serialize(value) for name, value in item.items()}
+    return ClientError(response, 'UpdateItem')
+
+
+class TestUpdateMealSlot:
+    """Tests for single-slot plan updates"""
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_updates_fixed_position_in_one_write(self, mock_dynamodb):
+        """A planner-ordered slot is written directly with a slot condition"""
+        from tools.dynamo_tools import update_meal_slot
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.update_item.return_value = {'Attributes': {'version': 4}}
+
+        result = update_meal_slot(
+            'test-household', '2026-01-05', '2026-01-06', 'dinner',
+            {'recipeId': '123', 'recipeName': 'Veggie Chili'}, expected_version=3,
+        )
+
+        assert result['status'] == 'success'
+        assert result['version'] == 4
+        assert result['meal']['day'] == 'tuesday'
+        kwargs = mock_table.update_item.call_args.kwargs
+        assert kwargs['Key']['SK'] == 'PLAN#2026-01-05'
+        assert kwargs['UpdateExpression'].startswith('SET meals[5] = :meal')
+        assert 'version = :version' in kwargs['ConditionExpression']
+        mock_table.get_item.assert_not_called()
+        mock_table.put_item.assert_not_called()
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_relocates_slot_from_returned_item(self, mock_dynamodb):
+        """A failed position check retries at the index found in the returned plan"""
+        from tools.dynamo_tools import update_meal_slot
+
+        meals = [{'date': '2026-01-05', 'mealType': t} for t in ('breakfast', 'lunch', 'snacks', 'dinner')]
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.update_item.side_effect = [
+            conditional_failure({'meals': meals, 'version': 1}),
+            {'Attributes': {'version': 2}},
+        ]
+
+        result = update_meal_slot('test-household', '2026-01-05', '2026-01-05', 'dinner', {'recipeId': '9'})
+
+        assert result['version'] == 2
+        assert mock_table.update_item.call_args.kwargs['UpdateExpression'].startswith('SET meals[3] = :meal')
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_stale_version_conflicts(self, mock_dynamodb):
+        """A plan changed since it was read is not overwritten"""
+        from tools.dynamo_tools import update_meal_slot
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.update_item.side_effect = conditional_failure({'meals': [], 'version': 7})
+
+        result = update_meal_slot(
+            'test-household', '2026-01-05', '2026-01-05', 'lunch', {'recipeId': '9'}, expected_version=6,
+        )
+
+        assert result['status'] == 'conflict'
+        assert result['version'] == 7
+        assert mock_table.update_item.call_count == 1
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_save_meal_plan_keeps_created_at(self, mock_dynamodb):
+        """Re-saving a week updates in place instead of replacing createdAt"""
+        from tools.dynamo_tools import save_meal_plan
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+
+        save_meal_plan('test-household', '2026-01-05', [])
+
+        expression = mock_table.update_item.call_args.kwargs['UpdateExpression']
+        assert 'createdAt = if_not_exists(createdAt, :now)' in expression
+        mock_table.put_item.assert_not_called()
+
+
+class TestPlanRoundTrip:
+    """Tests that every plan tool uses the same key and layout"""
+
+    def test_save_update_and_read_back(self):
+        """A re-saved week takes a slot update and reads back fresh, in slot order"""
+        from benchmarks.fakes import FakeDynamoDB, Recorder
+        from tools.dynamo_tools import get_meal_plan, load_plan, save_meal_plan, update_meal_slot
+
+        fake = FakeDynamoDB(Recorder())
+        fake.load('hoh-meal-plans-test', [{
+            'PK': 'HOUSEHOLD#test-household', 'SK': 'PLAN#2026-01-05',
+            'meals': [{'date': '2026-01-05', 'mealType': 'dinner', 'recipeName': 'Old'}],
+        }])
+        dates = [f'2026-01-{day:02d}' for day in range(5, 12)]
+        # Saved out of order, with a member-specific meal in the middle
+        meals = [
+            {'date': date, 'mealType': meal_type, 'recipeId': f'{date}-{meal_type}', 'recipeName': meal_type}
+            for date in reversed(dates) for meal_type in ('dinner', 'lunch', 'breakfast')
+        ]
+        meals.insert(4, {'date': '2026-01-06', 'mealType': 'dinner', 'forMemberId': 'm2', 'recipeName': 'Kid'})
+
+        with patch('tools.dynamo_tools.dynamodb', fake):
+            assert save_meal_plan('test-household', '2026-01-05', meals)['status'] == 'success'
+            updated = update_meal_slot(
+                'test-household', '2026-01-05', '2026-01-06', 'dinner',
+                {'recipeId': '123', 'recipeName': 'Veggie Chili'}, expected_version=1,
+            )
+            plan = get_meal_plan('test-household', '2026-01-05')
+            item = load_plan('test-household', '2026-01-05')
+
+        assert updated['status'] == 'success'
+        assert plan['version'] == 2
+        assert [(m['date'], m['mealType']) for m in plan['meals'][:3]] == [
+            ('2026-01-05', 'breakfast'), ('2026-01-05', 'lunch'), ('2026-01-05', 'dinner'),
+        ]
+        tuesday_dinners = [m for m in plan['meals'] if (m['date'], m['mealType']) == ('2026-01-06', 'dinner')]
+        assert [m['recipeName'] for m in tuesday_dinners] == ['Veggie Chili', 'Kid']
+        assert plan['meals'][-1]['forMemberId'] == 'm2'
+        assert item['endDate'] == '2026-01-11'
+        assert [key for key in fake.Table('hoh-meal-plans-test').items] == [
+            ('HOUSEHOLD#test-household', 'PLAN#2026-01-05'),
+        ]
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_save_rejects_per_day_layout(self, mock_dynamodb):
+        """Meals must be one object per slot, the layout every reader expects"""
+        from tools.dynamo_tools import save_meal_plan
+
+        result = save_meal_plan('test-household', '2026-01-05', [
+            {'day': 'monday', 'date': '2026-01-05', 'breakfast': {'id': 1}, 'dinner': {'id': 2}},
+        ])
+
+        assert result['status'] == 'error'
+        mock_dynamodb.Table.return_value.update_item.assert_not_called()
+
+
+class TestLegacyPlans:
+    """Tests for plans saved under the old WEEK# key"""
+
+    LEGACY = {
+        'PK': 'HOUSEHOLD#test-household', 'SK': 'WEEK#2026-01-05', 'version': 3,
+        'meals': [{
+            'day': 'monday', 'date': '2026-01-05',
+            'breakfast': {'id': 1, 'title': 'Oats'},
+            'dinner': {'id': 2, 'title': 'Tacos', 'readyInMinutes': 20},
+            'personalizedMeals': {'m2': {'dinner': {'id': 3, 'title': 'Plain Pasta'}}},
+        }],
+    }
+
+    def test_reads_fall_back_to_week_key(self):
+        """A week saved only under WEEK# still reads back, in the slot layout"""
+        from benchmarks.fakes import FakeDynamoDB, Recorder
+        from tools.dynamo_tools import get_meal_plan
+
+        fake = FakeDynamoDB(Recorder())
+        fake.load('hoh-meal-plans-test', [self.LEGACY])
+
+        with patch('tools.dynamo_tools.dynamodb', fake):
+            plan = get_meal_plan('test-household', '2026-01-05')
+
+        assert plan['status'] == 'success'
+        assert plan['version'] == 3
+        assert [(m['mealType'], m['recipeId'], m['recipeName']) for m in plan['meals']] == [
+            ('breakfast', '1', 'Oats'), ('dinner', '2', 'Tacos'), ('dinner', '3', 'Plain Pasta'),
+        ]
+        assert plan['meals'][-1]['forMemberId'] == 'm2'
+        assert plan['meals'][0]['day'] == 'monday'
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_slot_update_copies_legacy_plan_forward(self, mock_dynamodb):
+        """Updating a WEEK#-only week copies it to PLAN# once, keeping its version"""
+        from tools.dynamo_tools import update_meal_slot
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.update_item.side_effect = [
+            conditional_failure(),
+            conditional_failure({'meals': [{'date': '2026-01-05', 'mealType': 'breakfast'},
+                                           {'date': '2026-01-05', 'mealType': 'dinner'}], 'version': 3}),
+            {'Attributes': {'version': 4}},
+        ]
+        mock_table.get_item.return_value = {'Item': dict(self.LEGACY)}
+
+        result = update_meal_slot(
+            'test-household', '2026-01-05', '2026-01-05', 'dinner', {'recipeId': '9'}, expected_version=3,
+        )
+
+        assert result['status'] == 'success'
+        assert result['version'] == 4
+        copied = mock_table.put_item.call_args.kwargs
+        assert copied['Item']['SK'] == 'PLAN#2026-01-05'
+        assert copied['Item']['version'] == 3
+        assert copied['ConditionExpression'] == 'attribute_not_exists(PK)'
+        assert mock_table.update_item.call_args.kwargs['UpdateExpression'].startswith('SET meals[1] = :meal')
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_missing_everywhere_is_not_found(self, mock_dynamodb):
+        """No PLAN# or WEEK# item is still not_found"""
+        from tools.dynamo_tools import update_meal_slot
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_table.update_item.side_effect = conditional_failure()
+        mock_table.get_item.return_value = {}
+
+        result = update_meal_slot('test-household', '2026-01-05', '2026-01-05', 'dinner', {'recipeId': '9'})
+
+        assert result['status'] == 'not_found'
+        mock_table.put_item.assert_not_called()
+
+
+class TestGeneratedPlanVersion:
+    """Tests that full saves keep a version for conditional slot updates"""
+
+    def test_regenerated_plan_bumps_version(self):
+        """Every generated save sets a version, so an update against the old one conflicts"""
+        from benchmarks.fakes import FakeDynamoDB, Recorder
+        import meal_agent_handler
+
+        fake = FakeDynamoDB(Recorder())
+        meals = [{'date': '2026-01-05', 'mealType': 'breakfast', 'recipeId': '1', 'recipeName': 'Oats'}]
+
+        with patch('household_context.get_dynamodb', return_value=fake):
+            meal_agent_handler.save_generated_plan('hh-1', '2026-01-05', 'user-1', meals, 'ai_suggest', '')
+            first = fake.Table('hoh-meal-plans-test').items[('HOUSEHOLD#hh-1', 'PLAN#2026-01-05')]['version']
+            meal_agent_handler.save_generated_plan('hh-1', '2026-01-05', 'user-1', meals, 'ai_suggest', '')
+            second = fake.Table('hoh-meal-plans-test').items[('HOUSEHOLD#hh-1', 'PLAN#2026-01-05')]['version']
+
+        assert (first, second) == (1, 2)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
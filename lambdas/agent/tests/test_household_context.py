@@ -0,0 +1,72 @@
+"""
+Tests for the household context loader
+
+Run with: pytest tests/test_household_context.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['USERS_TABLE'] = 'hoh-users-test'
+os.environ['MEAL_PLANS_TABLE'] = 'hoh-meal-plans-test'
+
+
+class TestLoadHouseholdContext:
+    """Tests for load_household_context"""
+
+    @patch('household_context.get_dynamodb')
+    def test_single_partition_query(self, mock_dynamodb):
+        """Members and preferences come from one query, recent recipes from another"""
+        from household_context import load_household_context
+
+        users_table = MagicMock()
+        plans_table = MagicMock()
+        mock_dynamodb.return_value.Table.side_effect = lambda name: (
+            users_table if name == 'hoh-users-test' else plans_table
+        )
+        users_table.query.return_value = {
+            'Items': [
+                {'SK': 'MEMBER#1', 'name': 'Ana', 'allergies': ['peanuts'], 'dietaryRestrictions': ['vegetarian']},
+                {'SK': 'MEMBER#2', 'name': 'Ben', 'allergies': ['shellfish'], 'dislikes': ['olives']},
+                {'SK': 'PREFERENCES', 'cookingTime': 'quick', 'typicalDinner': ['tacos']},
+            ]
+        }
+        plans_table.query.return_value = {
+            'Items': [
+                {'SK': 'PLAN#2026-01-05', 'meals': [
+                    {'recipeId': '123', 'recipeName': 'Chicken Curry'},
+                    {'recipeId': 'user-tacos', 'recipeName': 'Tacos'},
+                ]},
+            ]
+        }
+
+        context = load_household_context('test-household')
+
+        users_table.query.assert_called_once()
+        assert [m['name'] for m in context['members']] == ['Ana', 'Ben']
+        assert context['preferences']['cookingTime'] == 'quick'
+        assert context['preferences']['mealSuggestionMode'] == 'ai_and_user'
+        assert sorted(context['aggregatedNeeds']['allAllergies']) == ['peanuts', 'shellfish']
+        assert sorted(context['recentRecipes']) == ['123', 'chicken curry', 'tacos']
+        _, kwargs = plans_table.query.call_args
+        assert kwargs['ExpressionAttributeValues'][':sk'] == 'PLAN#'
+
+    @patch('household_context.get_dynamodb')
+    def test_failures_degrade_to_empty_context(self, mock_dynamodb):
+        """A DynamoDB error yields defaults instead of raising"""
+        from household_context import load_household_context
+
+        mock_dynamodb.return_value.Table.return_value.query.side_effect = Exception('throttled')
+
+        context = load_household_context('test-household')
+
+        assert context['members'] == []
+        assert context['recentRecipes'] == []
+        assert context['preferences']['cookingTime'] == 'medium'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,50 @@
+"""
+Tests for the cold-start import budget
+
+Run with: pytest tests/test_import_budget.py -v
+"""
+
+import os
+import pytest
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+
+
+class TestParseImporttime:
+    """Tests for reading -X importtime output"""
+
+    def test_parses_nesting(self):
+        """Self and cumulative times and import depth come from each line"""
+        from import_budget import parse_importtime
+
+        records = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _json\n"
+            "import time:       800 |        920 |   json.decoder\n"
+            "import time:       400 |       1320 | json\n"
+        )
+
+        assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+            ('_json', 120, 120, 2),
+            ('json.decoder', 800, 920, 1),
+            ('json', 400, 1320, 0),
+        ]
+
+
+class TestLazyModuleGraph:
+    """Early-exit paths must not load the agent stack (timings are left to the CLI)"""
+
+    @pytest.mark.parametrize('name', ['cold_start', 'early_exit', 'household_lookup', 'planner'])
+    def test_no_forbidden_modules(self, name):
+        """Each scenario runs cleanly without importing its forbidden packages"""
+        from import_budget import run_scenario
+
+        result = run_scenario(name)
+
+        assert result.error is None
+        assert result.loaded_forbidden == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,76 @@
+"""
+Tests for the structured meal plan schema and partial-plan repair
+
+Run with: pytest tests/test_meal_plan_schema.py -v
+"""
+
+import pytest
+
+
+def make_meal(date, meal_type, recipe_id):
+    return {
+        'date': date,
+        'day': 'monday',
+        'mealType': meal_type,
+        'recipeId': str(recipe_id),
+        'recipeName': f'Recipe {recipe_id}',
+    }
+
+
+class TestWeeklyMealPlan:
+    """Tests for plan validation"""
+
+    def test_validates_and_defaults_optional_fields(self):
+        """Candidate meals may omit image, servings and source URL"""
+        from meal_plan_schema import WeeklyMealPlan
+
+        plan = WeeklyMealPlan.model_validate({'meals': [make_meal('2026-01-05', 'dinner', 7)]})
+        meal = plan.meals[0].model_dump()
+
+        assert meal['recipeImage'] is None
+        assert meal['isUserMeal'] is False
+        assert plan.explanation == ''
+
+    def test_rejects_unknown_meal_type(self):
+        """Meal types outside the plan's slots fail validation"""
+        from pydantic import ValidationError
+        from meal_plan_schema import WeeklyMealPlan
+
+        with pytest.raises(ValidationError):
+            WeeklyMealPlan.model_validate({'meals': [make_meal('2026-01-05', 'brunch', 7)]})
+
+
+class TestPlanRepair:
+    """Tests for finding and filling missing slots"""
+
+    def test_missing_slots_lists_unfilled_slots(self):
+        """Only the empty (date, meal type) slots are reported"""
+        from meal_plan_schema import expected_slots, missing_slots
+
+        slots = expected_slots('2026-01-05')
+        meals = [make_meal(date, meal_type, i) for i, (date, _, meal_type) in enumerate(slots[:-2])]
+
+        assert len(slots) == 21
+        assert missing_slots(meals, '2026-01-05') == [
+            ('2026-01-11', 'sunday', 'lunch'),
+            ('2026-01-11', 'sunday', 'dinner'),
+        ]
+
+    def test_merge_fills_only_empty_slots_without_repeats(self):
+        """Repairs never overwrite a planned meal or reuse a recipe"""
+        from meal_plan_schema import merge_meals
+
+        meals = [make_meal('2026-01-05', 'dinner', 1)]
+        repairs = [
+            make_meal('2026-01-05', 'dinner', 2),
+            make_meal('2026-01-05', 'lunch', 1),
+            make_meal('2026-01-05', 'breakfast', 3),
+        ]
+
+        merged = merge_meals(meals, repairs, '2026-01-05')
+
+        assert [(m['mealType'], m['recipeId']) for m in merged] == [('breakfast', '3'), ('dinner', '1')]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
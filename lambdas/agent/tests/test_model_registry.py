@@ -0,0 +1,77 @@
+"""
+Tests for the shared Bedrock model registry
+
+Run with: pytest tests/test_model_registry.py -v
+"""
+
+import os
+import pytest
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+
+
+class TestModelRegistry:
+    """Tests for model and client reuse"""
+
+    def test_same_config_returns_same_model(self):
+        """Repeat lookups skip model construction"""
+        from model_registry import get_model
+
+        assert get_model('test-model') is get_model('test-model')
+
+    def test_models_share_one_tuned_client(self):
+        """Different model configs reuse the same bedrock-runtime client"""
+        from model_registry import get_model, get_bedrock_client, BEDROCK_MAX_POOL_CONNECTIONS
+
+        chat = get_model('test-model')
+        explain = get_model('test-model', max_tokens=200)
+
+        assert chat is not explain
+        assert chat.client is explain.client is get_bedrock_client()
+        assert explain.get_config()['max_tokens'] == 200
+        assert chat.client.meta.config.max_pool_connections == BEDROCK_MAX_POOL_CONNECTIONS
+
+
+class TestPromptCaching:
+    """Tests for prompt cache points and cache usage logging"""
+
+    def test_cached_model_marks_tools_cacheable(self):
+        """Cached models add a tool cache point and auto message caching"""
+        from model_registry import get_cached_model
+
+        config = get_cached_model('test-model').get_config()
+
+        assert config['cache_tools'] == 'default'
+        assert config['cache_config'].strategy == 'auto'
+
+    def test_cache_point_splits_static_and_household_prompt(self):
+        """The household context comes after the cache point"""
+        from model_registry import cached_system_prompt
+
+        blocks = cached_system_prompt('static prompt', 'Household: h1')
+
+        assert blocks == [
+            {'text': 'static prompt'},
+            {'cachePoint': {'type': 'default'}},
+            {'text': 'Household: h1'},
+        ]
+
+    def test_log_token_usage_reports_cache_counts(self):
+        """Cache read/write tokens are read from the result's accumulated usage"""
+        from unittest.mock import MagicMock
+        from model_registry import log_token_usage
+
+        result = MagicMock()
+        result.metrics.accumulated_usage = {
+            'inputTokens': 120, 'outputTokens': 40, 'cacheReadInputTokens': 900,
+        }
+
+        counts = log_token_usage('Chat', result)
+
+        assert counts['cacheReadInputTokens'] == 900
+        assert counts['cacheWriteInputTokens'] == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,116 @@
+"""
+Tests for complexity-based model routing
+
+Run with: pytest tests/test_model_router.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+
+
+class TestClassifyRequest:
+    """Tests for request classification"""
+
+    @pytest.mark.parametrize('message,expected', [
+        ('What can I make with chicken?', 'lookup'),
+        ('Swap Tuesday dinner for something vegetarian', 'swap'),
+        ('Can you make a meal plan for next week?', 'week_plan'),
+        ('Remember what Ana said about spicy food last time?', 'conversation'),
+    ])
+    def test_chat_messages(self, message, expected):
+        """Chat messages are routed by intent"""
+        from model_router import classify_request
+
+        assert classify_request(message) == expected
+
+    def test_long_conversation_goes_large(self):
+        """Long histories use the large tier regardless of the message"""
+        from model_router import classify_request, model_id_for, LARGE_MODEL_ID, CONVERSATION_MESSAGE_THRESHOLD
+
+        route = classify_request('What is for dinner?', history=[{}] * CONVERSATION_MESSAGE_THRESHOLD)
+
+        assert route == 'conversation'
+        assert model_id_for(route) == LARGE_MODEL_ID
+
+    def test_generation_starts_small_and_escalates(self):
+        """Plan generation uses the small tier until escalated"""
+        from model_router import classify_request, model_id_for, can_escalate, SMALL_MODEL_ID, LARGE_MODEL_ID
+
+        route = classify_request(action='generate')
+
+        assert model_id_for(route) == SMALL_MODEL_ID
+        assert model_id_for(route, escalated=True) == LARGE_MODEL_ID
+        assert can_escalate(SMALL_MODEL_ID)
+        assert not can_escalate(LARGE_MODEL_ID)
+
+
+class TestRouteMetrics:
+    """Tests for per-route metrics"""
+
+    def test_snapshot_reports_p50_and_tokens(self):
+        """Latency p50 and token totals are tracked per route and model"""
+        from model_router import RouteMetrics
+
+        metrics = RouteMetrics()
+        for latency in (300, 100, 200):
+            metrics.record('lookup', 'small', latency, {'inputTokens': 10, 'outputTokens': 5})
+        metrics.record('week_plan', 'large', 9000, escalated=True)
+
+        snapshot = metrics.snapshot()
+
+        assert snapshot['lookup:small'] == {
+            'calls': 3, 'escalations': 0, 'p50LatencyMs': 200, 'inputTokens': 30, 'outputTokens': 15,
+        }
+        assert snapshot['week_plan:large']['escalations'] == 1
+
+
+class TestGenerationEscalation:
+    """Tests for escalation in the agent generation path"""
+
+    def test_invalid_plan_escalates_to_large_model(self):
+        """A structured output failure on the small model retries on the large model"""
+        from strands.types.exceptions import StructuredOutputException
+        from meal_plan_schema import WeeklyMealPlan, expected_slots
+        from model_router import SMALL_MODEL_ID, LARGE_MODEL_ID
+        import meal_agent_handler
+
+        context = {
+            'householdId': 'hh-1',
+            'members': [],
+            'preferences': {'additionalPreferences': 'Taco Tuesday', 'mealSuggestionMode': 'ai_suggest'},
+            'aggregatedNeeds': {'allRestrictions': [], 'allAllergies': [], 'allDislikes': []},
+            'recentRecipes': [],
+        }
+        plan = WeeklyMealPlan(meals=[
+            {'date': date, 'day': day, 'mealType': meal_type, 'recipeId': str(i), 'recipeName': f'R{i}'}
+            for i, (date, day, meal_type) in enumerate(expected_slots('2026-01-05'))
+        ])
+        models = []
+
+        def make_agent(model, **kwargs):
+            models.append(model)
+            agent = MagicMock()
+            if len(models) == 1:
+                agent.side_effect = StructuredOutputException('bad plan')
+            else:
+                agent.return_value.structured_output = plan
+            return agent
+
+        with patch('meal_agent_handler.get_household_context', return_value=context), \
+             patch('weekly_planner.fetch_candidate_pools', return_value={}), \
+             patch('model_registry.get_cached_model', side_effect=lambda model_id: model_id), \
+             patch('strands.Agent', side_effect=make_agent), \
+             patch('meal_agent_handler.save_generated_plan', return_value={'status': 'success'}) as mock_save:
+            result = meal_agent_handler.generate_meal_plan_with_agent('hh-1', '2026-01-05', 'user-1')
+
+        assert result['status'] == 'success'
+        assert models == [SMALL_MODEL_ID, LARGE_MODEL_ID]
+        assert len(mock_save.call_args.args[3]) == 21
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
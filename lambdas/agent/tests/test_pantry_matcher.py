@@ -0,0 +1,130 @@
+"""
+Tests for the bitset pantry matcher
+
+Run with: pytest tests/test_pantry_matcher.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+def make_recipe(recipe_id, title, *ingredients):
+    return {'id': recipe_id, 'title': title, 'ingredients': [{'name': name} for name in ingredients]}
+
+
+def make_matcher():
+    from tools.recipe_corpus import RecipeCorpus
+    from tools.pantry_matcher import PantryMatcher
+
+    corpus = RecipeCorpus()
+    corpus.add(make_recipe(1, 'Chicken Fried Rice', 'chicken', 'rice', 'eggs', 'soy sauce', 'salt'))
+    corpus.add(make_recipe(2, 'Chicken Broccoli Bake', 'chicken', 'broccoli', 'cheddar cheese', 'butter'))
+    corpus.add(make_recipe(3, 'Plain Rice', 'rice', 'water', 'salt'))
+    corpus.add(make_recipe(4, 'Beef Stew', 'beef', 'potatoes', 'carrots'))
+    return corpus, PantryMatcher(corpus)
+
+
+class TestPantryMatcher:
+    """Tests for ranking and staple masking"""
+
+    def test_ranking_maximize_used(self):
+        """ranking=1 puts the recipe using the most pantry items first"""
+        _, matcher = make_matcher()
+
+        recipes = matcher.match(['chicken', 'rice', 'broccoli'], ranking=1)
+
+        assert [r['id'] for r in recipes] == [2, 1, 3]
+        assert recipes[0]['usedIngredients'] == ['broccoli', 'chicken']
+        assert recipes[0]['missedIngredients'] == ['cheddar cheese']
+
+    def test_ranking_minimize_missed(self):
+        """ranking=2 puts the recipe needing the fewest extra items first"""
+        _, matcher = make_matcher()
+
+        recipes = matcher.match(['chicken', 'rice', 'broccoli'], ranking=2)
+
+        assert [(r['id'], r['missedIngredientCount']) for r in recipes] == [(3, 0), (2, 1), (1, 2)]
+
+    def test_ignore_pantry_masks_staples(self):
+        """Staples only count toward missed ingredients when ignore_pantry is off"""
+        _, matcher = make_matcher()
+
+        ignored = matcher.match(['rice'], ignore_pantry=True)
+        counted = matcher.match(['rice'], ignore_pantry=False)
+
+        assert {r['id']: r['missedIngredients'] for r in ignored}[3] == []
+        assert {r['id']: r['missedIngredients'] for r in counted}[3] == ['salt', 'water']
+
+    def test_rebuilds_after_corpus_changes(self):
+        """Recipes added after the first match are found"""
+        corpus, matcher = make_matcher()
+        assert matcher.match(['tofu']) == []
+
+        corpus.add(make_recipe(5, 'Mapo Tofu', 'tofu', 'chili bean paste'))
+
+        assert [r['id'] for r in matcher.match(['tofu'])] == [5]
+
+    def test_qualifiers_and_aliases_match(self):
+        """Size and prep words and listed aliases fold to the same pantry item"""
+        from tools.recipe_corpus import RecipeCorpus
+        from tools.pantry_matcher import PantryMatcher
+
+        corpus = RecipeCorpus()
+        corpus.add(make_recipe(1, 'Chicken Salad', 'chicken breasts', 'scallions'))
+        matcher = PantryMatcher(corpus)
+
+        recipes = matcher.match(['boneless chicken breast', 'spring onions'])
+
+        assert recipes[0]['usedIngredients'] == ['chicken breast', 'scallion']
+        assert recipes[0]['missedIngredients'] == []
+
+    def test_related_items_do_not_match(self):
+        """A pantry item covers neither longer nor shorter names that share its words"""
+        from tools.recipe_corpus import RecipeCorpus
+        from tools.pantry_matcher import PantryMatcher
+
+        corpus = RecipeCorpus()
+        corpus.add(make_recipe(1, 'Chicken Soup', 'chicken broth', 'carrots'))
+        corpus.add(make_recipe(2, 'Garlic Bread', 'garlic', 'bread'))
+        matcher = PantryMatcher(corpus)
+
+        assert matcher.match(['chicken']) == []
+        assert matcher.match(['garlic powder']) == []
+
+
+class TestLocalIngredientSearch:
+    """Tests for search_recipes_by_ingredients answering from the corpus"""
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_api_results_feed_local_matches(self, mock_get, mock_key):
+        """Ingredients from an API answer let the next pantry search run locally"""
+        from tools.spoonacular_tools import search_recipes_by_ingredients
+
+        mock_get.return_value = [
+            {
+                'id': 200 + i,
+                'title': f'Lentil Soup {i}',
+                'usedIngredients': [{'name': 'lentils'}],
+                'missedIngredients': [{'name': 'coconut milk'}] * i,
+            }
+            for i in range(3)
+        ]
+
+        first = search_recipes_by_ingredients('lentils,onion', number=2)
+        second = search_recipes_by_ingredients('lentils', number=2, ranking=2)
+
+        assert mock_get.call_count == 1
+        assert 'source' not in first
+        assert second['source'] == 'local'
+        assert [r['id'] for r in second['recipes']] == [200, 201]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
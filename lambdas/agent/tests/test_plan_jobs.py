@@ -0,0 +1,227 @@
+"""
+Tests for asynchronous plan generation jobs
+
+Run with: pytest tests/test_plan_jobs.py -v
+"""
+
+import os
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['USERS_TABLE'] = 'hoh-users-test'
+os.environ['MEAL_PLANS_TABLE'] = 'hoh-meal-plans-test'
+
+
+class TestPlanJobs:
+    """Tests for job records and job runs"""
+
+    def test_create_job_writes_queued_record(self):
+        """A new job is queued with one pending entry per day"""
+        from plan_jobs import create_job
+
+        mock_table = MagicMock()
+        with patch('plan_jobs.get_dynamodb') as mock_dynamodb:
+            mock_dynamodb.return_value.Table.return_value = mock_table
+            job = create_job('hh-1', 'user-1', '2026-01-05')
+
+        item = mock_table.put_item.call_args.kwargs['Item']
+        assert item['PK'] == 'HOUSEHOLD#hh-1'
+        assert item['SK'] == f"JOB#{job['jobId']}"
+        assert item['status'] == 'queued'
+        assert list(item['progress']) == [f'2026-01-{d:02d}' for d in range(5, 12)]
+        assert item['deadline'] < item['ttl']
+
+    def test_run_job_records_completion(self):
+        """A successful run marks the job completed with per-day progress"""
+        from plan_jobs import run_job
+
+        generate = MagicMock(return_value={
+            'status': 'success',
+            'startDate': '2026-01-05',
+            'endDate': '2026-01-11',
+            'meals': [{'date': '2026-01-05'}],
+        })
+        event = {'householdId': 'hh-1', 'jobId': 'j1', 'startDate': '2026-01-05', 'userId': 'user-1'}
+
+        lambda_context = MagicMock()
+        lambda_context.get_remaining_time_in_millis.return_value = 60_000
+
+        with patch('plan_jobs.update_job') as mock_update, patch('plan_jobs.time.time', return_value=1000.0):
+            run_job(event, generate, lambda_context)
+
+        assert generate.call_args.args == ('hh-1', '2026-01-05', 'user-1')
+        assert mock_update.call_args_list[0].kwargs == {'status': 'running', 'deadline': 1060}
+        final = mock_update.call_args_list[-1].kwargs
+        assert final['status'] == 'completed'
+        assert final['progress']['2026-01-05'] == 'done'
+        assert final['progress']['2026-01-06'] == 'empty'
+
+    def test_run_job_records_failure(self):
+        """Generation errors mark the job failed"""
+        from plan_jobs import run_job
+
+        generate = MagicMock(side_effect=RuntimeError('boom'))
+        event = {'householdId': 'hh-1', 'jobId': 'j1', 'startDate': '2026-01-05', 'userId': 'user-1'}
+
+        with patch('plan_jobs.update_job') as mock_update:
+            result = run_job(event, generate)
+
+        assert result['status'] == 'error'
+        assert mock_update.call_args_list[-1].kwargs == {'status': 'failed', 'error': 'boom'}
+
+    def test_progress_updates_as_days_fill(self):
+        """Each day is marked planned once, when its last slot is filled"""
+        from plan_jobs import run_job
+
+        def day(date):
+            return [{'date': date, 'mealType': t} for t in ('breakfast', 'lunch', 'dinner')]
+
+        def generate(household_id, start_date, user_id, on_progress):
+            on_progress(day('2026-01-05') + day('2026-01-06')[:2])
+            on_progress(day('2026-01-05') + day('2026-01-06'))
+            on_progress(day('2026-01-05') + day('2026-01-06'))
+            return {'status': 'error', 'error': 'stop'}
+
+        event = {'householdId': 'hh-1', 'jobId': 'j1', 'startDate': '2026-01-05', 'userId': 'user-1'}
+
+        with patch('plan_jobs.update_job'), patch('plan_jobs.update_progress') as mock_progress:
+            run_job(event, generate)
+
+        assert [c.args[2] for c in mock_progress.call_args_list] == [
+            {'2026-01-05': 'planned'},
+            {'2026-01-06': 'planned'},
+        ]
+
+    def test_progress_write_failure_does_not_fail_job(self):
+        """A failed progress write is logged and generation carries on"""
+        from plan_jobs import run_job
+
+        def generate(household_id, start_date, user_id, on_progress):
+            on_progress([{'date': '2026-01-05', 'mealType': t} for t in ('breakfast', 'lunch', 'dinner')])
+            return {'status': 'success', 'startDate': '2026-01-05', 'endDate': '2026-01-11', 'meals': []}
+
+        event = {'householdId': 'hh-1', 'jobId': 'j1', 'startDate': '2026-01-05', 'userId': 'user-1'}
+
+        with patch('plan_jobs.update_job') as mock_update, \
+             patch('plan_jobs.update_progress', side_effect=RuntimeError('throttled')):
+            result = run_job(event, generate)
+
+        assert result['status'] == 'success'
+        assert mock_update.call_args_list[-1].kwargs['status'] == 'completed'
+
+    def test_update_progress_sets_only_given_days(self):
+        """Progress writes address single dates inside the progress map"""
+        from plan_jobs import update_progress
+
+        mock_table = MagicMock()
+        with patch('plan_jobs.get_dynamodb') as mock_dynamodb:
+            mock_dynamodb.return_value.Table.return_value = mock_table
+            update_progress('hh-1', 'j1', {'2026-01-05': 'planned'})
+
+        kwargs = mock_table.update_item.call_args.kwargs
+        assert '#progress.#d0 = :d0' in kwargs['UpdateExpression']
+        assert kwargs['ExpressionAttributeNames']['#d0'] == '2026-01-05'
+        assert kwargs['ExpressionAttributeValues'][':d0'] == 'planned'
+
+
+class TestJobDeadline:
+    """Tests for reporting jobs lost to a timeout"""
+
+    def test_running_job_past_deadline_reports_failed(self):
+        """A running job whose invocation was cut off is reported as failed"""
+        from decimal import Decimal
+        from plan_jobs import job_response
+
+        job = {'PK': 'HOUSEHOLD#hh-1', 'SK': 'JOB#j1', 'jobId': 'j1', 'status': 'running', 'deadline': Decimal(1000)}
+
+        view = job_response(job, now=1001)
+
+        assert view['status'] == 'failed'
+        assert view['error']
+        assert view['deadline'] == 1000
+        assert 'PK' not in view
+
+    def test_job_within_deadline_is_unchanged(self):
+        """Queued and running jobs inside their deadline keep their status"""
+        from plan_jobs import job_response
+
+        for status in ('queued', 'running'):
+            view = job_response({'jobId': 'j1', 'status': status, 'deadline': 1000}, now=999)
+            assert view['status'] == status
+            assert 'error' not in view
+
+    def test_finished_job_ignores_deadline(self):
+        """A completed job stays completed after its deadline"""
+        from plan_jobs import job_response
+
+        view = job_response({'jobId': 'j1', 'status': 'completed', 'deadline': 1000}, now=5000)
+
+        assert view['status'] == 'completed'
+
+
+class TestAsyncHandler:
+    """Tests for the generate_async and job_status actions"""
+
+    def make_event(self, body):
+        return {
+            'requestContext': {'authorizer': {'claims': {'sub': 'user-1'}}},
+            'headers': {},
+            'body': json.dumps(body),
+        }
+
+    def test_generate_async_returns_job_without_generating(self):
+        """generate_async queues a job and dispatches it asynchronously"""
+        import meal_agent_handler
+
+        job = {'jobId': 'j1', 'status': 'queued', 'startDate': '2026-01-05', 'requestedBy': 'user-1'}
+        lambda_context = MagicMock(function_name='meal-agent')
+
+        with patch('meal_agent_handler.get_user_household_id', return_value='hh-1'), \
+             patch('plan_jobs.create_job', return_value=job), \
+             patch('plan_jobs.dispatch_job') as mock_dispatch, \
+             patch('meal_agent_handler.generate_meal_plan_with_agent') as mock_generate:
+            response = meal_agent_handler.handler(
+                self.make_event({'action': 'generate_async', 'startDate': '2026-01-05'}), lambda_context
+            )
+
+        assert response['statusCode'] == 202
+        assert json.loads(response['body'])['jobId'] == 'j1'
+        mock_dispatch.assert_called_once_with('meal-agent', job, 'hh-1')
+        mock_generate.assert_not_called()
+
+    def test_generate_async_rejects_malformed_start_date(self):
+        """A bad startDate is a 400 and no job is created"""
+        import meal_agent_handler
+
+        with patch('meal_agent_handler.get_user_household_id', return_value='hh-1'), \
+             patch('plan_jobs.create_job') as mock_create, \
+             patch('plan_jobs.dispatch_job') as mock_dispatch:
+            responses = [
+                meal_agent_handler.handler(
+                    self.make_event({'action': 'generate_async', 'startDate': start_date}), MagicMock()
+                )
+                for start_date in ('next monday', '2026-02-30', '2026-1-5', 20260105)
+            ]
+
+        assert [r['statusCode'] for r in responses] == [400] * 4
+        mock_create.assert_not_called()
+        mock_dispatch.assert_not_called()
+
+    def test_job_status_unknown_job(self):
+        """Polling a job from another household returns 404"""
+        import meal_agent_handler
+
+        with patch('meal_agent_handler.get_user_household_id', return_value='hh-1'), \
+             patch('plan_jobs.get_job', return_value=None):
+            response = meal_agent_handler.handler(
+                self.make_event({'action': 'job_status', 'jobId': 'nope'}), MagicMock()
+            )
+
+        assert response['statusCode'] == 404
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,237 @@
+"""
+Tests for the Spoonacular rate limiter
+
+Run with: pytest tests/test_rate_limiter.py -v
+"""
+
+import os
+import time
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_response(status_code=200, data=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = data if data is not None else {'results': []}
+    return response
+
+
+def make_limiter(clock, **kwargs):
+    from tools.rate_limiter import SpoonacularLimiter
+    return SpoonacularLimiter(clock=clock, sleep=clock.sleep, bucket_clock=clock, **kwargs)
+
+
+class TestSpoonacularLimiter:
+    """Tests for quota tracking, throttling and degradation"""
+
+    def test_429_backs_off_and_serves_last_response(self):
+        """A 429 pauses requests; the same request degrades to its last good response"""
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        params = {'apiKey': 'k', 'query': 'tacos'}
+
+        first = limiter.request('/recipes/complexSearch', params, lambda: make_response(data={'results': [1]}))
+        limited = limiter.request(
+            '/recipes/complexSearch', params, lambda: make_response(429, headers={'Retry-After': '30'})
+        )
+        fetch = MagicMock()
+        during_backoff = limiter.request('/recipes/complexSearch', params, fetch)
+
+        assert first == limited == during_backoff == {'results': [1]}
+        fetch.assert_not_called()
+        assert limiter.stats()['degraded'] == 2
+
+    def test_refused_without_cached_response(self):
+        """Nothing cached for the request raises SpoonacularRateLimited"""
+        from tools.rate_limiter import SpoonacularRateLimited
+
+        limiter = make_limiter(FakeClock())
+
+        with pytest.raises(SpoonacularRateLimited):
+            limiter.request('/recipes/random', {'number': 5}, lambda: make_response(402))
+
+    def test_low_quota_blocks_until_utc_midnight(self):
+        """A quota header below the reserve pauses requests for the rest of the UTC day"""
+        from tools.rate_limiter import SpoonacularRateLimited
+
+        clock = FakeClock(1_700_000_000.0)  # 22:13:20 UTC
+        limiter = make_limiter(clock, quota_reserve=10)
+
+        limiter.request('/recipes/random', {'number': 1}, lambda: make_response(headers={'X-API-Quota-Left': '4'}))
+
+        assert limiter.stats()['quotaLeft'] == 4
+        assert limiter.blocked_for() == pytest.approx(6400)
+        with pytest.raises(SpoonacularRateLimited):
+            limiter.request('/recipes/random', {'number': 2}, MagicMock())
+
+    def test_token_bucket_throttles_bursts(self):
+        """Requests past the burst wait for tokens, then degrade when the wait is too long"""
+        from tools.rate_limiter import SpoonacularRateLimited
+
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=1, burst=2, max_wait=0.5)
+
+        limiter.request('/a', {}, make_response)
+        limiter.request('/b', {}, make_response)
+        with pytest.raises(SpoonacularRateLimited):
+            limiter.request('/c', {}, make_response)
+
+        assert limiter.stats()['throttled'] == 1
+
+    def test_identical_concurrent_requests_are_coalesced(self):
+        """Only one request goes out for identical in-flight calls"""
+        limiter = make_limiter(FakeClock())
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(timeout=2)
+            return make_response(data={'results': ['shared']})
+
+        results = []
+
+        def call():
+            results.append(limiter.request('/recipes/complexSearch', {'query': 'tacos'}, fetch))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        while not calls:
+            time.sleep(0.001)
+        followers = [threading.Thread(target=call) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+
+        assert results == [{'results': ['shared']}] * 4
+        assert len(calls) == 1
+        assert limiter.stats()['coalesced'] == 3
+
+
+    def test_bucket_ignores_wall_clock_steps(self):
+        """A wall-clock jump neither refills nor stalls the token bucket"""
+        from tools.rate_limiter import SpoonacularLimiter, SpoonacularRateLimited
+
+        wall = FakeClock()
+        mono = FakeClock(now=100.0)
+        limiter = SpoonacularLimiter(rate=1, burst=1, max_wait=0, clock=wall, sleep=mono.sleep, bucket_clock=mono)
+        params = {'apiKey': 'k', 'query': 'tacos'}
+
+        assert limiter.request('/recipes/complexSearch', params, lambda: make_response())
+        wall.now += 3600
+        with pytest.raises(SpoonacularRateLimited):
+            limiter.request('/recipes/complexSearch', dict(params, query='soup'), lambda: make_response())
+        wall.now -= 7200
+        mono.now += 1
+        assert limiter.request('/recipes/complexSearch', dict(params, query='stew'), lambda: make_response())
+
+
+    def test_random_recipes_are_not_shared_or_replayed(self):
+        """Concurrent random calls each go out, and a refused one is not answered from an old result"""
+        from tools.rate_limiter import SpoonacularRateLimited
+
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        params = {'apiKey': 'k', 'number': 5}
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(1)
+            return make_response(data={'recipes': [len(calls)]})
+
+        threads = [threading.Thread(target=limiter.request, args=('/recipes/random', params, fetch)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 3
+        assert limiter.stats()['coalesced'] == 0
+
+        with pytest.raises(SpoonacularRateLimited):
+            limiter.request('/recipes/random', params, lambda: make_response(429, headers={'Retry-After': '30'}))
+
+
+class TestDegradedTools:
+    """Tests for tool results while rate limited"""
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_search_falls_back_to_cached_recipes(self, mock_get, mock_key):
+        """search_recipes answers from the recipe cache instead of failing"""
+        from tools.rate_limiter import SpoonacularRateLimited
+        from tools.recipe_cache import get_recipe_cache
+        from tools.spoonacular_tools import search_recipes
+
+        cache = get_recipe_cache()
+        cache.clear()
+        cache.put('1', {'id': 1, 'title': 'Chicken Tacos', 'readyInMinutes': 20, 'dietary': {}})
+        cache.put('2', {'id': 2, 'title': 'Veggie Tacos', 'readyInMinutes': 20, 'dietary': {'vegetarian': True}})
+        mock_get.side_effect = SpoonacularRateLimited('Spoonacular rate limit reached')
+
+        result = search_recipes(query='tacos', diet='vegetarian')
+        unknown_allergen = search_recipes(query='tacos', intolerances='peanut')
+
+        assert result['status'] == 'success'
+        assert result['degraded'] is True
+        assert [r['id'] for r in result['recipes']] == [2]
+        assert unknown_allergen['status'] == 'error'
+        assert unknown_allergen['retryable'] is False
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_fallback_applies_meal_type_tags_and_exclusions(self, mock_get, mock_key):
+        """Degraded answers keep the meal type, tag and excluded-ingredient filters"""
+        from tools.rate_limiter import SpoonacularRateLimited
+        from tools.recipe_cache import get_recipe_cache
+        from tools.spoonacular_tools import search_recipes, get_random_recipes
+
+        def recipe(recipe_id, title, dish_types, ingredients, cuisines=()):
+            return {
+                'id': recipe_id, 'title': title, 'readyInMinutes': 20, 'dietary': {},
+                'dishTypes': list(dish_types), 'cuisines': list(cuisines),
+                'ingredients': [{'name': name} for name in ingredients],
+            }
+
+        cache = get_recipe_cache()
+        cache.clear()
+        cache.put('1', recipe(1, 'Breakfast Egg Bowl', ['breakfast'], ['eggs', 'rice']))
+        cache.put('2', recipe(2, 'Mushroom Rice Bowl', ['main course', 'dinner'], ['mushrooms', 'rice']))
+        cache.put('3', recipe(3, 'Chicken Rice Bowl', ['main course', 'dinner'], ['chicken', 'rice'], ['asian']))
+        mock_get.side_effect = SpoonacularRateLimited('Spoonacular rate limit reached')
+
+        dinner = search_recipes(query='bowl', meal_type='main course', exclude_ingredients='mushroom')
+        random_dinner = get_random_recipes(number=5, tags='dinner,asian')
+
+        assert [r['id'] for r in dinner['recipes']] == [3]
+        assert [r['id'] for r in random_dinner['recipes']] == [3]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
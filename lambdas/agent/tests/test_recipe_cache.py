@@ -0,0 +1,138 @@
+"""
+Tests for the recipe details cache
+
+Run with: pytest tests/test_recipe_cache.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import Mock
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRecipeCache:
+    """Tests for the two-tier recipe cache"""
+
+    def test_repeat_lookup_hits_memory(self):
+        """Second lookup is served without calling the loader"""
+        from tools.recipe_cache import RecipeCache
+
+        cache = RecipeCache(ttl_seconds=60, stale_seconds=60)
+        loader = Mock(return_value={'id': 1, 'title': 'Pasta'})
+
+        assert cache.get('1', loader)['title'] == 'Pasta'
+        assert cache.get('1', loader)['title'] == 'Pasta'
+
+        loader.assert_called_once()
+        stats = cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+
+    def test_lru_evicts_least_recently_used(self):
+        """Cache never grows past max_entries"""
+        from tools.recipe_cache import RecipeCache
+
+        cache = RecipeCache(max_entries=2)
+        cache.put('1', {'id': 1})
+        cache.put('2', {'id': 2})
+        cache.peek('1')
+        cache.put('3', {'id': 3})
+
+        assert cache.peek('2') is None
+        assert cache.peek('1') == {'id': 1}
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['size'] == 2
+
+    def test_expired_entry_is_refetched(self):
+        """Entries past TTL plus stale window are treated as misses"""
+        from tools.recipe_cache import RecipeCache
+
+        clock = FakeClock()
+        cache = RecipeCache(ttl_seconds=10, stale_seconds=10, clock=clock)
+        loader = Mock(side_effect=[{'v': 1}, {'v': 2}])
+
+        cache.get('1', loader)
+        clock.now += 25
+
+        assert cache.get('1', loader) == {'v': 2}
+        assert loader.call_count == 2
+
+    def test_stale_entry_refreshed_before_returning(self):
+        """Stale entries are re-fetched in the same call, with no background work"""
+        from tools.recipe_cache import RecipeCache
+
+        clock = FakeClock()
+        cache = RecipeCache(ttl_seconds=10, stale_seconds=100, clock=clock)
+        cache.put('1', {'v': 'old'})
+        clock.now += 20
+
+        assert cache.get('1', lambda: {'v': 'new'}) == {'v': 'new'}
+        assert cache.peek('1') == {'v': 'new'}
+        assert cache.stats()['staleHits'] == 1
+        assert cache.stats()['refreshes'] == 1
+
+    def test_stale_entry_served_when_refresh_fails(self):
+        """A failed refresh falls back to the stale value"""
+        from tools.recipe_cache import RecipeCache
+
+        clock = FakeClock()
+        cache = RecipeCache(ttl_seconds=10, stale_seconds=100, clock=clock)
+        cache.put('1', {'v': 'old'})
+        clock.now += 20
+
+        assert cache.get('1', Mock(side_effect=RuntimeError('down'))) == {'v': 'old'}
+        assert cache.stats()['staleServed'] == 1
+        assert cache.stats()['refreshes'] == 0
+
+    def test_file_tier_shared_across_instances(self, tmp_path):
+        """A new process-level cache picks up entries from the file tier"""
+        from tools.recipe_cache import RecipeCache, FileRecipeTier
+
+        RecipeCache(shared_tier=FileRecipeTier(str(tmp_path))).put('42', {'id': 42})
+
+        cache = RecipeCache(shared_tier=FileRecipeTier(str(tmp_path)))
+        loader = Mock()
+
+        assert cache.get('42', loader) == {'id': 42}
+        loader.assert_not_called()
+        assert cache.stats()['sharedHits'] == 1
+
+    def test_file_tier_rejects_path_keys(self, tmp_path):
+        """Keys that are not numeric IDs never become file paths"""
+        from tools.recipe_cache import FileRecipeTier
+
+        tier = FileRecipeTier(str(tmp_path / 'cache'))
+
+        for key in ('../x', '1/2', '', '12.json'):
+            with pytest.raises(ValueError):
+                tier.put(key, {'id': 1}, 0)
+            with pytest.raises(ValueError):
+                tier.get(key)
+        assert list(tmp_path.iterdir()) == [tmp_path / 'cache']
+
+    def test_loader_errors_are_not_cached(self):
+        """Failed fetches propagate and leave nothing behind"""
+        from tools.recipe_cache import RecipeCache
+
+        cache = RecipeCache()
+
+        with pytest.raises(ValueError):
+            cache.get('1', Mock(side_effect=ValueError('boom')))
+
+        assert cache.peek('1') is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,115 @@
+"""
+Tests for the local recipe corpus
+
+Run with: pytest tests/test_recipe_corpus.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+def make_recipe(recipe_id, title, cuisine='mexican', diets=(), ready=30, health=50):
+    return {
+        'id': recipe_id,
+        'title': title,
+        'readyInMinutes': ready,
+        'healthScore': health,
+        'cuisines': [cuisine],
+        'dishTypes': ['main course', 'dinner'],
+        'diets': list(diets),
+    }
+
+
+class TestRecipeCorpus:
+    """Tests for indexing, search and the on-disk format"""
+
+    def test_facet_filters_intersect(self):
+        """Cuisine, diet, time and query filters all apply"""
+        from tools.recipe_corpus import RecipeCorpus
+
+        corpus = RecipeCorpus()
+        corpus.add(make_recipe(1, 'Chicken Tacos'))
+        corpus.add(make_recipe(2, 'Black Bean Tacos', diets=['vegan']))
+        corpus.add(make_recipe(3, 'Bean Lasagna', cuisine='italian', diets=['lacto ovo vegetarian']))
+        corpus.add(make_recipe(4, 'Slow Bean Chili', diets=['vegan'], ready=240))
+
+        assert corpus.search('tacos') == [0, 1]
+        assert corpus.search(diet='vegetarian', max_ready_time=60) == [1, 2]
+        assert corpus.search(cuisine='mexican', diet='vegan', meal_type='main course') == [1, 3]
+        assert corpus.search('beans', exclude_ingredients='lasagna') == []
+        assert corpus.search('bean', exclude_ingredients='lasagna') == [1, 3]
+
+    def test_intolerances_require_verification(self):
+        """Only recipes verified free of an intolerance match it"""
+        from tools.recipe_corpus import RecipeCorpus
+
+        corpus = RecipeCorpus()
+        corpus.add(make_recipe(1, 'Chicken Tacos'))
+        corpus.add(make_recipe(2, 'Fish Tacos'), free_of=['peanut'])
+        corpus.add(make_recipe(3, 'Vegan Tacos', diets=['vegan']))
+
+        assert corpus.search('tacos', intolerances='peanut') == [1]
+        assert corpus.search('tacos', intolerances='dairy') == [2]
+
+    def test_details_update_keeps_earlier_facts(self):
+        """Adding details for a known recipe merges ingredients without losing verified filters"""
+        from tools.recipe_corpus import RecipeCorpus
+
+        corpus = RecipeCorpus()
+        corpus.add(make_recipe(1, 'Chicken Tacos'), free_of=['peanut'])
+        corpus.add({'id': 1, 'title': 'Chicken Tacos', 'ingredients': [{'name': 'corn tortillas'}], 'dietary': {}})
+
+        docs = corpus.search('tortillas', intolerances='peanut')
+        assert len(corpus) == 1
+        assert corpus.records(docs) == [{**make_recipe(1, 'Chicken Tacos'), 'diets': []}]
+
+    def test_round_trip_through_mapped_file(self, tmp_path):
+        """A saved corpus reloads with the same search results"""
+        from tools.recipe_corpus import RecipeCorpus
+
+        path = str(tmp_path / 'corpus.bin')
+        corpus = RecipeCorpus(path=path, save_every=1000)
+        for i in range(1, 50):
+            corpus.add(make_recipe(i, f'Recipe {i}', diets=['vegan'] if i % 2 else [], ready=i))
+        corpus.add(make_recipe(3, 'Recipe 3', diets=['vegan']), free_of=['soy'])
+        corpus.save()
+
+        loaded = RecipeCorpus(path=path)
+
+        assert len(loaded) == 49
+        assert loaded.records(loaded.search(diet='vegan', max_ready_time=5)) == \
+            corpus.records(corpus.search(diet='vegan', max_ready_time=5))
+        assert loaded.records(loaded.search(intolerances='soy'))[0]['id'] == 3
+
+
+class TestLocalSearchRecipes:
+    """Tests for search_recipes answering from the corpus"""
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_repeat_filters_served_locally(self, mock_get, mock_key):
+        """A second search with the same filters skips the API once enough recipes are known"""
+        from tools.spoonacular_tools import search_recipes
+
+        mock_get.return_value = {
+            'results': [make_recipe(100 + i, f'Korean Bowl {i}', cuisine='korean') for i in range(5)],
+            'totalResults': 5,
+        }
+
+        first = search_recipes(query='bowl', cuisine='korean', number=3)
+        second = search_recipes(query='bowl', cuisine='korean', number=3)
+
+        assert mock_get.call_count == 1
+        assert 'source' not in first
+        assert second['source'] == 'local'
+        assert [r['id'] for r in second['recipes']] == [100, 101, 102]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,144 @@
+"""
+Tests for per-request EMF metrics
+
+Run with: pytest tests/test_request_metrics.py -v
+"""
+
+import os
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+
+
+def emf_lines(output):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"_aws"')]
+
+
+class TestRequestMetrics:
+    """Tests for recording a request and building its EMF record"""
+
+    def test_emf_record_describes_every_metric(self):
+        """Every phase and counter is a top-level value declared under _aws"""
+        import request_metrics
+
+        with patch.object(request_metrics, '_cold_start', True):
+            request_metrics.start_request('generate', request_id='req-1')
+            with request_metrics.phase('householdContext'):
+                pass
+            request_metrics.count('spoonacularCalls', 3)
+            record = request_metrics.finish_request(200)
+
+        definition = record['_aws']['CloudWatchMetrics'][0]
+        units = {metric['Name']: metric['Unit'] for metric in definition['Metrics']}
+        assert definition['Dimensions'] == [['action']]
+        assert record['action'] == 'generate'
+        assert record['statusCode'] == 200
+        assert units['householdContextMs'] == 'Milliseconds'
+        assert units['durationMs'] == 'Milliseconds'
+        assert record['spoonacularCalls'] == 3
+        assert record['coldStart'] == 1
+        assert all(name in record for name in units)
+
+    def test_only_first_request_is_cold(self):
+        """The cold start flag is consumed by the first request in the container"""
+        import request_metrics
+
+        with patch.object(request_metrics, '_cold_start', True):
+            request_metrics.start_request('chat')
+            first = request_metrics.finish_request(200)
+            request_metrics.start_request('chat')
+            second = request_metrics.finish_request(200)
+
+        assert (first['coldStart'], second['coldStart']) == (1, 0)
+
+    def test_noop_outside_request(self):
+        """Instrumented code runs normally when no request is being recorded"""
+        import request_metrics
+
+        with request_metrics.phase('spoonacular'):
+            request_metrics.count('spoonacularCalls')
+
+        assert request_metrics.current() is None
+        assert request_metrics.finish_request(200) is None
+
+    def test_cache_hits_are_per_request(self):
+        """Cache counters report the change during the request, not container totals"""
+        import request_metrics
+        from tools.household_cache import household_cache
+
+        household_cache.get('hh-metrics', lambda: {'members': []})
+        request_metrics.start_request('chat')
+        household_cache.get('hh-metrics', lambda: {'members': []})
+        record = request_metrics.finish_request(200)
+
+        assert record['householdCacheHits'] == 1
+        assert 'householdCacheMisses' not in record
+
+
+class TestMetricsHooks:
+    """Tests for timing model calls and tool executions from strands hook events"""
+
+    def test_model_and_tool_events(self):
+        """Model calls, tool calls, failures and invocation token usage are recorded"""
+        import request_metrics
+
+        hooks = request_metrics.MetricsHooks()
+        invocation = SimpleNamespace(cycles=[1, 2], usage={'inputTokens': 120, 'outputTokens': 30})
+        agent = SimpleNamespace(event_loop_metrics=SimpleNamespace(latest_agent_invocation=invocation))
+        tool_use = {'toolUseId': 't1', 'name': 'search_recipes', 'input': {}}
+
+        request_metrics.start_request('chat')
+        hooks.before_model_call(SimpleNamespace(agent=agent))
+        hooks.after_model_call(SimpleNamespace(agent=agent, exception=None))
+        hooks.before_tool_call(SimpleNamespace(agent=agent, tool_use=tool_use))
+        hooks.after_tool_call(SimpleNamespace(
+            agent=agent, tool_use=tool_use, exception=None, result={'toolUseId': 't1', 'status': 'error'},
+        ))
+        hooks.after_invocation(SimpleNamespace(agent=agent))
+        record = request_metrics.finish_request(200)
+
+        assert record['modelCalls'] == 1
+        assert record['toolCalls'] == 1
+        assert record['toolErrors'] == 1
+        assert record['agentCycles'] == 2
+        assert (record['inputTokens'], record['outputTokens']) == (120, 30)
+        assert list(record['toolDurationsMs']) == ['search_recipes']
+        assert 'modelMs' in record and 'toolsMs' in record
+
+    def test_registers_with_agent(self):
+        """The shared hook provider can be passed to a strands Agent"""
+        from strands import Agent
+        from strands.hooks import AfterToolCallEvent
+        from request_metrics import metrics_hooks
+
+        agent = Agent(model='us.anthropic.claude-haiku-4-5-20251001-v1:0', hooks=[metrics_hooks], callback_handler=None)
+
+        assert agent.hooks.has_callbacks()
+        assert any(
+            callback == metrics_hooks.after_tool_call
+            for callback in agent.hooks._registered_callbacks[AfterToolCallEvent]
+        )
+
+
+class TestInstrumentedHandler:
+    """Tests for the handler emitting one record per request"""
+
+    def test_emits_record_with_status(self, capsys):
+        """Early returns are recorded too, on their own stdout line"""
+        from meal_agent_handler import handler
+
+        response = handler({'body': '{}', 'requestContext': {}}, SimpleNamespace(aws_request_id='req-401'))
+
+        records = emf_lines(capsys.readouterr().out)
+        assert response['statusCode'] == 401
+        assert len(records) == 1
+        assert records[0]['statusCode'] == 401
+        assert records[0]['requestId'] == 'req-401'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,150 @@
+"""
+Tests for the shopping list builder
+
+Run with: pytest tests/test_shopping_list.py -v
+"""
+
+import os
+import pytest
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['MEAL_PLANS_TABLE'] = 'hoh-meal-plans-test'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+def ingredient(name, amount, unit='', aisle=''):
+    return {'name': name, 'amount': amount, 'unit': unit, 'original': f'{amount} {unit} {name}', 'aisle': aisle}
+
+
+TACOS = {
+    'id': 1,
+    'title': 'Chicken Tacos',
+    'servings': 2,
+    'ingredients': [
+        ingredient('chicken breasts', 1, 'lb', 'Meat'),
+        ingredient('onion', 1, '', 'Produce'),
+        ingredient('sour cream', 0.5, 'cup'),
+        ingredient('salt', 1, 'tsp', 'Spices and Seasonings'),
+    ],
+}
+CHILI = {
+    'id': 2,
+    'title': 'Turkey Chili',
+    'servings': 4,
+    'ingredients': [
+        ingredient('onions', 2, 'medium', 'Produce'),
+        ingredient('sour cream', 4, 'Tbsps'),
+        ingredient('kidney beans', 15, 'oz', 'Canned and Jarred'),
+    ],
+}
+
+
+class TestAggregateIngredients:
+    """Tests for scaling, unit normalization and pantry subtraction"""
+
+    def test_sums_across_units_and_scales_to_household(self):
+        """Cups and tablespoons of the same ingredient add up after scaling"""
+        from tools.shopping_list import aggregate_ingredients
+
+        items, from_pantry = aggregate_ingredients([TACOS, CHILI], household_size=4)
+        by_name = {(item['ingredient'], item['unit']): item for item in items}
+
+        # 0.5 cup x2 + 4 tbsp x1 = 1.25 cups
+        assert by_name[('sour cream', 'cup')]['quantity'] == 1.25
+        assert by_name[('sour cream', 'cup')]['category'] == 'Milk, Eggs, Other Dairy'
+        assert by_name[('chicken breast', 'lb')]['quantity'] == 2
+        assert by_name[('onion', '')]['quantity'] == 2
+        assert by_name[('onion', 'medium')]['quantity'] == 2
+        assert by_name[('sour cream', 'cup')]['recipes'] == ['Chicken Tacos', 'Turkey Chili']
+        assert from_pantry == ['salt']
+
+    def test_pantry_items_are_left_off(self):
+        """Pantry items match by canonical name; staples stay when requested"""
+        from tools.shopping_list import aggregate_ingredients
+
+        pantry = ['Large Onions', 'boneless chicken breasts']
+        items, from_pantry = aggregate_ingredients([TACOS], 2, pantry=pantry, include_staples=True)
+
+        assert [item['ingredient'] for item in items] == ['sour cream', 'salt']
+        assert from_pantry == ['chicken breast', 'onion']
+
+    def test_pantry_does_not_remove_related_items(self):
+        """A pantry word inside another ingredient's name does not take it off the list"""
+        from tools.shopping_list import aggregate_ingredients
+
+        recipe = {'title': 'Stir Fry', 'servings': 2, 'ingredients': [
+            ingredient('chicken broth', 1, 'cup'),
+            ingredient('red bell pepper', 1),
+            ingredient('rice vinegar', 1, 'tbsp'),
+            ingredient('garlic', 2, 'cloves'),
+            ingredient('scallions', 3),
+        ]}
+        pantry = ['chicken', 'pepper', 'rice', 'garlic powder', 'spring onions']
+
+        items, from_pantry = aggregate_ingredients([recipe], 2, pantry=pantry, include_staples=True)
+
+        assert sorted(item['ingredient'] for item in items) == [
+            'chicken broth', 'garlic', 'red bell pepper', 'rice vinegar',
+        ]
+        assert from_pantry == ['scallion']
+
+    def test_items_grouped_by_aisle(self):
+        """Known aisles come first, alphabetically, with Other last"""
+        from tools.shopping_list import aggregate_ingredients, group_by_aisle
+
+        items, _ = aggregate_ingredients([CHILI, {'title': 'X', 'servings': 1, 'ingredients': [
+            ingredient('mystery spice blend', 1, 'pinch'),
+        ]}], 4)
+
+        assert list(group_by_aisle(items)) == ['Canned and Jarred', 'Milk, Eggs, Other Dairy', 'Produce', 'Other']
+
+
+class TestGenerateShoppingList:
+    """Tests for the generate_shopping_list tool"""
+
+    @patch('tools.shopping_list.get_recipe_details_bulk')
+    @patch('tools.shopping_list._get_household')
+    @patch('tools.shopping_list.load_plan')
+    @patch('tools.shopping_list.dynamodb')
+    def test_builds_and_persists_list(self, mock_dynamodb, mock_load_plan, mock_household, mock_bulk):
+        """Plan recipes are loaded once and the list is saved as LIST#<startDate>"""
+        from tools.shopping_list import generate_shopping_list
+
+        mock_table = MagicMock()
+        mock_dynamodb.Table.return_value = mock_table
+        mock_load_plan.return_value = {'meals': [
+            {'recipeId': '1', 'recipeName': 'Chicken Tacos'},
+            {'recipeId': '1', 'recipeName': 'Chicken Tacos'},
+            {'recipeId': 'user-oatmeal-2026-01-05', 'recipeName': 'Oatmeal', 'isUserMeal': True},
+        ]}
+        mock_household.return_value = {'members': [{}, {}], 'preferences': {}}
+        mock_bulk.return_value = {'status': 'success', 'recipes': [TACOS]}
+
+        result = generate_shopping_list('hh-1', '2026-01-05')
+
+        assert result['status'] == 'success'
+        assert result['skippedMeals'] == ['Oatmeal']
+        assert result['aisles']['Meat'][0]['quantity'] == 2
+        mock_bulk.assert_called_once_with(['1'])
+        saved = mock_table.put_item.call_args.kwargs['Item']
+        assert saved['SK'] == 'LIST#2026-01-05'
+        assert saved['items'][0]['quantity'] == Decimal('2')
+
+    @patch('tools.dynamo_tools.dynamodb')
+    def test_missing_plan(self, mock_dynamodb):
+        """No PLAN# item returns not_found"""
+        from tools.shopping_list import generate_shopping_list
+
+        mock_dynamodb.Table.return_value.get_item.return_value = {}
+
+        result = generate_shopping_list('hh-1', '2026-01-05')
+
+        assert result['status'] == 'not_found'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,132 @@
+"""
+Tests for the Spoonacular tools and their shared HTTP client
+
+Run with: pytest tests/test_spoonacular_tools.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+
+
+class TestSharedClient:
+    """Tests for the pooled HTTP client"""
+
+    def test_client_is_reused(self):
+        """Every call gets the same pooled client"""
+        from tools.http_client import get_client, close_clients
+
+        try:
+            assert get_client() is get_client()
+        finally:
+            close_clients()
+
+    def test_endpoint_timeouts(self):
+        """Endpoints get their own read timeout and fall back to the default"""
+        from tools.http_client import timeout_for, DEFAULT_TIMEOUT
+
+        assert timeout_for('/recipes/random').read == 10.0
+        assert timeout_for('/recipes/716429/information').read == DEFAULT_TIMEOUT
+
+
+class TestSpoonacularTools:
+    """Tests for Spoonacular API tools"""
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_search_recipes_success(self, mock_get, _mock_key):
+        """Test recipe search returns correct format"""
+        from tools.spoonacular_tools import search_recipes
+
+        mock_get.return_value = {
+            'results': [
+                {
+                    'id': 123,
+                    'title': 'Vegetarian Pasta',
+                    'readyInMinutes': 30,
+                    'servings': 4,
+                    'image': 'https://example.com/pasta.jpg',
+                }
+            ],
+            'totalResults': 100
+        }
+
+        result = search_recipes(query='pasta', diet='vegetarian', max_ready_time=30)
+
+        assert result['status'] == 'success'
+        assert result['recipes'][0]['title'] == 'Vegetarian Pasta'
+        path, params = mock_get.call_args[0]
+        assert path == '/recipes/complexSearch'
+        assert params['maxReadyTime'] == 30
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_get_recipe_details_uses_cache(self, mock_get, _mock_key):
+        """Repeat detail lookups only hit Spoonacular once"""
+        from tools.spoonacular_tools import get_recipe_details
+        from tools.recipe_cache import get_recipe_cache
+
+        get_recipe_cache().clear()
+        mock_get.return_value = {
+            'id': 99,
+            'title': 'Chicken Curry',
+            'extendedIngredients': [
+                {'name': 'chicken', 'amount': 1, 'unit': 'lb', 'original': '1 lb chicken'}
+            ],
+        }
+
+        first = get_recipe_details(recipe_id=99)
+        second = get_recipe_details(recipe_id=99)
+
+        assert first['status'] == 'success'
+        assert second['recipe']['ingredients'][0]['name'] == 'chicken'
+        mock_get.assert_called_once()
+
+    @patch('tools.spoonacular_tools._get_api_key', return_value='test-api-key')
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_get_recipe_details_bulk_skips_cached(self, mock_get, _mock_key):
+        """Bulk lookup only requests IDs missing from the cache, in chunks"""
+        from tools.spoonacular_tools import get_recipe_details_bulk
+        from tools.recipe_cache import get_recipe_cache
+
+        cache = get_recipe_cache()
+        cache.clear()
+        cache.put('1', {'id': 1, 'title': 'Cached Soup'})
+        mock_get.return_value = [
+            {'id': 2, 'title': 'Tacos'},
+            {'id': 3, 'title': 'Salad'},
+        ]
+
+        result = get_recipe_details_bulk(recipe_ids=[1, 2, 3, 2, 4])
+
+        assert result['status'] == 'success'
+        assert [r['title'] for r in result['recipes']] == ['Cached Soup', 'Tacos', 'Salad']
+        assert result['notFound'] == ['4']
+        path, params = mock_get.call_args[0]
+        assert path == '/recipes/informationBulk'
+        assert params['ids'] == '2,3,4'
+
+    @patch('tools.spoonacular_tools.spoonacular_get')
+    def test_non_numeric_ids_never_reach_cache_or_api(self, mock_get):
+        """IDs that are not all digits are rejected before any lookup"""
+        from tools.spoonacular_tools import get_recipe_details, get_recipe_details_bulk
+        from tools.recipe_cache import get_recipe_cache
+
+        get_recipe_cache().clear()
+
+        single = get_recipe_details(recipe_id='../../tmp/x')
+        bulk = get_recipe_details_bulk(recipe_ids=['../../tmp/x', 'user-oatmeal'])
+
+        assert single['status'] == 'error'
+        assert bulk['status'] == 'success'
+        assert bulk['notFound'] == ['../../tmp/x', 'user-oatmeal']
+        mock_get.assert_not_called()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
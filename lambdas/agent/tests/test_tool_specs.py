@@ -0,0 +1,103 @@
+"""
+Tests for precompiled tool specs
+
+Run with: pytest tests/test_tool_specs.py -v
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+# Set test environment variables before imports
+os.environ['AWS_REGION'] = 'us-east-1'
+os.environ['RECIPE_CACHE_DIR'] = ''
+os.environ['RECIPE_CORPUS_PATH'] = ''
+os.environ['TOOL_SPEC_MANIFEST'] = ''
+
+
+def build_manifest():
+    from tools.tool_specs import build_manifest, collect_tools
+
+    return build_manifest(collect_tools())
+
+
+class TestManifest:
+    """Tests for freezing and loading tool specs"""
+
+    def test_manifest_covers_every_tool(self):
+        """Every exported tool is frozen with the spec strands generates"""
+        import tools
+
+        manifest = build_manifest()
+
+        assert sorted(manifest) == sorted(tools.__all__)
+        assert manifest['search_recipes']['spec']['inputSchema']['json']['required'] == ['query']
+
+    def test_manifest_tool_matches_strands_spec(self):
+        """A tool registered from the manifest exposes the same name and spec"""
+        from tools.spoonacular_tools import search_recipes
+        from tools.tool_specs import manifest_tool
+
+        spec = build_manifest()['search_recipes']['spec']
+        fast = manifest_tool(search_recipes._tool_func, spec)
+
+        assert fast.tool_name == 'search_recipes'
+        assert fast.tool_spec == spec
+        assert fast.__doc__ == search_recipes.__doc__
+
+    def test_stale_fingerprint_falls_back(self):
+        """Tools edited since the manifest was built get their spec from strands"""
+        from tools.dynamo_tools import get_meal_plan
+        from tools.tool_specs import ManifestToolMetadata, tool
+
+        manifest = build_manifest()
+        current = {'get_meal_plan': manifest['get_meal_plan']}
+        stale = {'get_meal_plan': dict(manifest['get_meal_plan'], fingerprint='0' * 16)}
+
+        with patch('tools.tool_specs._manifest', current):
+            assert isinstance(tool(get_meal_plan._tool_func)._metadata, ManifestToolMetadata)
+        with patch('tools.tool_specs._manifest', stale):
+            assert not isinstance(tool(get_meal_plan._tool_func)._metadata, ManifestToolMetadata)
+
+
+class TestValidateInput:
+    """The lightweight validator agrees with strands' Pydantic validation"""
+
+    @pytest.mark.parametrize('tool_name,tool_input', [
+        ('search_recipes', {'query': 'pasta'}),
+        ('search_recipes', {'query': 'pasta', 'number': '5', 'max_ready_time': 30.0, 'unknown': 1}),
+        ('search_recipes_by_ingredients', {'ingredients': 'rice', 'ignore_pantry': 'false'}),
+        ('get_recipe_details_bulk', {'recipe_ids': [1, 2]}),
+        ('update_meal_slot', {'household_id': 'hh', 'start_date': '2026-01-05', 'date': '2026-01-06',
+                              'meal_type': 'dinner', 'meal': {'recipeId': '1'}, 'expected_version': None}),
+    ])
+    def test_accepts_like_pydantic(self, tool_name, tool_input):
+        """Defaults are filled in, lax values coerced and unknown keys dropped"""
+        import tools
+        from tools.tool_specs import ManifestToolMetadata
+
+        strands_tool = getattr(tools, tool_name)
+        metadata = ManifestToolMetadata(strands_tool._tool_func, build_manifest()[tool_name]['spec'])
+
+        assert metadata.validate_input(tool_input) == strands_tool._metadata.validate_input(tool_input)
+
+    @pytest.mark.parametrize('tool_input', [
+        {'number': 5},
+        {'query': 'pasta', 'number': 'five'},
+        {'query': ['pasta']},
+    ])
+    def test_rejects_like_pydantic(self, tool_input):
+        """Missing required and mistyped parameters fail with a ValueError"""
+        from tools.spoonacular_tools import search_recipes
+        from tools.tool_specs import ManifestToolMetadata
+
+        metadata = ManifestToolMetadata(search_recipes._tool_func, build_manifest()['search_recipes']['spec'])
+
+        with pytest.raises(ValueError, match='Validation failed'):
+            search_recipes._metadata.validate_input(tool_input)
+        with pytest.raises(ValueError, match='Validation failed'):
+            metadata.validate_input(tool_input)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
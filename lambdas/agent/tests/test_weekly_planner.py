@@ -0,0 +1,202 @@
+"""
+Tests for the deterministic weekly planner
+
+Run with: pytest tests/test_weekly_planner.py -v
+"""
+
+import pytest
+
+
+def make_context(**preferences):
+    return {
+        'householdId': 'test-household',
+        'members': [{'name': 'Sam', 'likes': ['tacos'], 'dislikes': []}],
+        'preferences': {
+            'mealSuggestionMode': 'ai_suggest',
+            'cookingTime': 'medium',
+            **preferences,
+        },
+        'aggregatedNeeds': {
+            'allRestrictions': [],
+            'allAllergies': ['peanuts'],
+            'allDislikes': ['mushroom'],
+        },
+    }
+
+
+def make_pools(count=12):
+    proteins = ['Chicken', 'Beef', 'Salmon', 'Tofu', 'Pork', 'Turkey']
+    cuisines = ['italian', 'mexican', 'indian', 'asian']
+    pools = {}
+    for offset, meal_type in enumerate(['breakfast', 'lunch', 'dinner']):
+        pools[meal_type] = [
+            {
+                'id': offset * 1000 + i,
+                'title': f'{proteins[i % len(proteins)]} {meal_type} {i}',
+                'readyInMinutes': 30,
+                'cuisines': [cuisines[i % len(cuisines)]],
+            }
+            for i in range(count)
+        ]
+    return pools
+
+
+class TestBuildWeeklyPlan:
+    """Tests for slot assignment"""
+
+    def test_fills_every_slot_without_repeats(self):
+        """21 meals, one per day and meal type, no recipe used twice"""
+        from weekly_planner import build_weekly_plan
+
+        meals = build_weekly_plan(make_context(), [], '2026-01-05', make_pools(), seed=1)
+
+        assert len(meals) == 21
+        assert len({(m['date'], m['mealType']) for m in meals}) == 21
+        assert len({m['recipeId'] for m in meals}) == 21
+        assert meals[0]['day'] == 'monday'
+
+    def test_hard_constraints_exclude_candidates(self):
+        """Recent recipes, allergens and slow recipes are never picked"""
+        from weekly_planner import build_weekly_plan
+
+        pools = make_pools()
+        pools['dinner'].append({'id': 9001, 'title': 'Peanut Noodles', 'readyInMinutes': 20})
+        pools['dinner'].append({'id': 9002, 'title': 'Slow Roast', 'readyInMinutes': 240})
+        recent = ['2000', 'beef dinner 1']
+
+        meals = build_weekly_plan(make_context(), recent, '2026-01-05', pools, seed=1)
+        picked = {m['recipeId'] for m in meals}
+        names = {m['recipeName'].lower() for m in meals}
+
+        assert '9001' not in picked
+        assert '9002' not in picked
+        assert '2000' not in picked
+        assert 'beef dinner 1' not in names
+
+    def test_rotates_proteins_day_to_day(self):
+        """The same protein is not served for dinner two days running"""
+        from weekly_planner import build_weekly_plan, _protein_of
+
+        meals = build_weekly_plan(make_context(), [], '2026-01-05', make_pools(), seed=3)
+        dinners = [m for m in meals if m['mealType'] == 'dinner']
+        proteins = [_protein_of({'title': m['recipeName']}) for m in dinners]
+
+        assert all(a != b for a, b in zip(proteins, proteins[1:]))
+
+    def test_user_preference_mode_uses_typical_meals(self):
+        """user_preference mode only plans the family's own meals"""
+        from weekly_planner import build_weekly_plan
+
+        context = make_context(
+            mealSuggestionMode='user_preference',
+            typicalBreakfast=['Oatmeal', 'Eggs'],
+            typicalLunch=['Sandwich'],
+            typicalDinner=['Pasta', 'Curry', 'Stir fry'],
+        )
+
+        meals = build_weekly_plan(context, [], '2026-01-05', {}, seed=1)
+
+        assert len(meals) == 21
+        assert all(m['isUserMeal'] for m in meals)
+        assert [m['recipeName'] for m in meals if m['mealType'] == 'breakfast'][:3] == ['Oatmeal', 'Eggs', 'Oatmeal']
+
+    def test_returns_none_when_pool_exhausted(self):
+        """Too few candidates hands generation back to the agent"""
+        from weekly_planner import build_weekly_plan
+
+        assert build_weekly_plan(make_context(), [], '2026-01-05', make_pools(count=3), seed=1) is None
+
+
+class TestDietEnforcement:
+    """Tests for diets and needs the planner cannot enforce"""
+
+    def test_every_diet_is_required(self):
+        """A candidate must carry every mapped diet, not just the first"""
+        from weekly_planner import build_weekly_plan
+
+        context = make_context()
+        context['aggregatedNeeds']['allRestrictions'] = ['Vegetarian', 'Gluten-Free']
+        pools = make_pools()
+        for meal_type, pool in pools.items():
+            for recipe in pool:
+                recipe['diets'] = ['lacto ovo vegetarian', 'gluten free']
+        pools['dinner'][0]['diets'] = ['lacto ovo vegetarian']
+        pools['dinner'][1]['diets'] = ['gluten free']
+
+        meals = build_weekly_plan(context, [], '2026-01-05', pools, seed=1)
+        picked = {m['recipeId'] for m in meals}
+
+        assert len(meals) == 21
+        assert not picked & {str(pools['dinner'][0]['id']), str(pools['dinner'][1]['id'])}
+
+    @pytest.mark.parametrize('restrictions,allergies,member', [
+        (['Halal'], [], {}),
+        ([], ['kiwi'], {}),
+        ([], [], {'sameAsAdults': False}),
+    ])
+    def test_unenforceable_households_go_to_the_agent(self, restrictions, allergies, member):
+        """Unmappable restrictions, unclassified allergies and separate eaters block the planner"""
+        from weekly_planner import build_weekly_plan, planner_blockers
+
+        context = make_context()
+        context['aggregatedNeeds'].update(allRestrictions=restrictions, allAllergies=allergies)
+        context['members'].append({'name': 'Junior', **member})
+
+        assert planner_blockers(context)
+        assert build_weekly_plan(context, [], '2026-01-05', make_pools(), seed=1) is None
+
+    def test_pools_search_all_diets(self, monkeypatch):
+        """Candidate searches pass every mapped diet to Spoonacular"""
+        import tools.spoonacular_tools as spoonacular_tools
+        from weekly_planner import fetch_candidate_pools
+
+        calls = []
+
+        def fake_search(**kwargs):
+            calls.append(kwargs)
+            return {'status': 'success', 'recipes': []}
+
+        monkeypatch.setattr(spoonacular_tools, 'search_recipes', fake_search)
+        context = make_context()
+        context['aggregatedNeeds']['allRestrictions'] = ['Vegan', 'Halal', 'Gluten-Free']
+
+        fetch_candidate_pools(context)
+
+        assert {call['diet'] for call in calls} == {'vegan,gluten free'}
+
+
+class TestCandidatePrompt:
+    """Tests for the prefetched candidate hand-off to the agent"""
+
+    def test_compact_candidates_skips_recent_and_duplicates(self):
+        """Prompt lines drop recently used and duplicate recipes"""
+        from weekly_planner import compact_candidates
+
+        pools = make_pools(count=3)
+        pools['dinner'].append(dict(pools['dinner'][0]))
+
+        text = compact_candidates(pools, recent_recipes=['2001'])
+
+        assert '- 2000 | Chicken dinner 0 | 30 min | italian' in text
+        assert '2001' not in text
+        assert text.count('- 2000 |') == 1
+
+    def test_hydrate_meals_fills_pool_fields(self):
+        """Meals picked from the pools get image and URL filled in"""
+        from weekly_planner import hydrate_meals
+
+        pools = {'dinner': [{'id': 7, 'title': 'Tacos', 'image': 'img.jpg', 'sourceUrl': 'src', 'servings': 4}]}
+        meals = [
+            {'recipeId': '7', 'recipeName': 'Tacos', 'recipeImage': None},
+            {'recipeId': 'user-pasta', 'recipeName': 'Pasta'},
+        ]
+
+        hydrated = hydrate_meals(meals, pools)
+
+        assert hydrated[0]['recipeImage'] == 'img.jpg'
+        assert hydrated[0]['servings'] == 4
+        assert 'recipeImage' not in hydrated[1]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,28 +1,33 @@
 # HOH Meal Agent Tools
-from .dynamo_tools import (
-    get_family_members,
-    get_family_preferences,
-    get_meal_plan,
-    save_meal_plan,
-    get_aggregated_dietary_needs,
-)
-from .spoonacular_tools import (
-    search_recipes,
-    search_recipes_by_ingredients,
-    get_recipe_details,
-    generate_meal_plan_from_api,
-    get_random_recipes,
-)
+#
+# Tools are resolved on first access (PEP 562) so importing a light helper
+# such as tools.compliance or tools.recipe_corpus does not pull in strands,
+# httpx and boto3 with every tool module.
+import importlib
 
-__all__ = [
-    "get_family_members",
-    "get_family_preferences",
-    "get_meal_plan",
-    "save_meal_plan",
-    "get_aggregated_dietary_needs",
-    "search_recipes",
-    "search_recipes_by_ingredients",
-    "get_recipe_details",
-    "generate_meal_plan_from_api",
-    "get_random_recipes",
-]
+_TOOL_MODULES = {
+    "get_family_members": ".dynamo_tools",
+    "get_family_preferences": ".dynamo_tools",
+    "get_meal_plan": ".dynamo_tools",
+    "save_meal_plan": ".dynamo_tools",
+    "update_meal_slot": ".dynamo_tools",
+    "get_aggregated_dietary_needs": ".dynamo_tools",
+    "search_recipes": ".spoonacular_tools",
+    "search_recipes_by_ingredients": ".spoonacular_tools",
+    "get_recipe_details": ".spoonacular_tools",
+    "get_recipe_details_bulk": ".spoonacular_tools",
+    "generate_meal_plan_from_api": ".spoonacular_tools",
+    "get_random_recipes": ".spoonacular_tools",
+    "generate_shopping_list": ".shopping_list",
+}
+
+__all__ = list(_TOOL_MODULES)
+
+
+def __getattr__(name):
+    module = _TOOL_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,219 @@
+"""
+Allergen and Diet Compliance for HOH Meal Agent
+
+Allergies are non-negotiable, but checking them used to mean passing
+free-text intolerances to Spoonacular and having the model read ingredient
+lists from get_recipe_details. Instead every recipe with a full ingredient
+list gets a precomputed bitmask of what it contains:
+
+    KNOWN      the mask was computed from a full ingredient list
+    GLUTEN, DAIRY, EGG, PEANUT, TREE_NUT, SOY, FISH, SHELLFISH, SESAME
+    MEAT       any meat or meat-derived ingredient (gelatin, lard, stock)
+    ANIMAL     other animal products vegans avoid (honey)
+
+Ingredient names are classified word by word with WORD_CLASSES, then
+PHRASE_OVERRIDES fix up compound names ("peanut butter" is not dairy,
+"soy sauce" contains wheat). A household's allergies and restrictions
+become a forbidden mask, and a candidate is rejected when
+
+    mask & KNOWN and mask & forbidden
+
+The word table is a heuristic and cannot prove a recipe is free of an
+allergen, so masks are only ever used to reject. A recipe matches an
+intolerance only when Spoonacular verified it (see recipe_corpus).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from .recipe_corpus import normalize_ingredient
+
+KNOWN = 1 << 0
+GLUTEN = 1 << 1
+DAIRY = 1 << 2
+EGG = 1 << 3
+PEANUT = 1 << 4
+TREE_NUT = 1 << 5
+SOY = 1 << 6
+FISH = 1 << 7
+SHELLFISH = 1 << 8
+SESAME = 1 << 9
+MEAT = 1 << 10
+ANIMAL = 1 << 11
+
+CONTAINS_NAMES = {
+    GLUTEN: 'gluten',
+    DAIRY: 'dairy',
+    EGG: 'egg',
+    PEANUT: 'peanut',
+    TREE_NUT: 'tree nut',
+    SOY: 'soy',
+    FISH: 'fish',
+    SHELLFISH: 'shellfish',
+    SESAME: 'sesame',
+    MEAT: 'meat',
+    ANIMAL: 'animal product',
+}
+
+# Singularized ingredient words (see normalize_ingredient) -> what they contain
+WORD_CLASSES = {
+    **dict.fromkeys([
+        'wheat', 'flour', 'bread', 'breadcrumb', 'panko', 'pasta', 'spaghetti', 'penne', 'macaroni',
+        'linguine', 'fettuccine', 'lasagna', 'noodle', 'couscous', 'bulgur', 'barley', 'rye', 'semolina',
+        'seitan', 'tortilla', 'pita', 'bun', 'roll', 'cracker', 'crouton', 'farro', 'spelt', 'orzo',
+        'dough', 'pastry', 'croissant', 'bagel', 'naan', 'beer', 'ale', 'oat', 'oatmeal',
+        'brioche', 'biscuit', 'pancake', 'waffle', 'dumpling', 'wonton', 'gnocchi', 'ramen', 'udon',
+    ], GLUTEN),
+    **dict.fromkeys([
+        'milk', 'cheese', 'cheddar', 'mozzarella', 'parmesan', 'ricotta', 'feta', 'brie', 'gouda',
+        'cream', 'butter', 'buttermilk', 'ghee', 'yogurt', 'yoghurt', 'whey', 'casein', 'custard',
+        'mascarpone', 'paneer', 'kefir', 'gruyere', 'parmigiano', 'pecorino', 'romano', 'provolone',
+        'swiss', 'camembert', 'halloumi', 'burrata', 'emmental', 'fontina', 'asiago',
+        'alfredo', 'bechamel', 'queso', 'creme', 'fraiche',
+    ], DAIRY),
+    **dict.fromkeys(['egg', 'mayonnaise', 'mayo', 'meringue', 'aioli'], EGG),
+    **dict.fromkeys(['peanut', 'satay'], PEANUT),
+    # Unspecified nuts ("mixed nuts") may be either
+    **dict.fromkeys(['nut'], PEANUT | TREE_NUT),
+    **dict.fromkeys([
+        'almond', 'walnut', 'pecan', 'cashew', 'pistachio', 'hazelnut', 'macadamia', 'praline',
+        'marzipan', 'nutella', 'frangipane', 'nougat',
+    ], TREE_NUT),
+    **dict.fromkeys(['soy', 'soya', 'tofu', 'edamame', 'tempeh', 'miso', 'tamari'], SOY),
+    **dict.fromkeys(['pesto'], DAIRY | TREE_NUT),
+    **dict.fromkeys(['hoisin'], SOY | GLUTEN),
+    **dict.fromkeys([
+        'fish', 'salmon', 'tuna', 'cod', 'tilapia', 'halibut', 'trout', 'anchovy',
+        'sardine', 'mackerel', 'haddock', 'snapper', 'bass',
+    ], FISH),
+    **dict.fromkeys([
+        'shrimp', 'prawn', 'crab', 'lobster', 'scallop', 'clam', 'mussel', 'oyster', 'crawfish',
+    ], SHELLFISH),
+    **dict.fromkeys(['sesame', 'tahini', 'hummus'], SESAME),
+    **dict.fromkeys([
+        'chicken', 'beef', 'steak', 'pork', 'bacon', 'ham', 'sausage', 'turkey', 'lamb', 'veal',
+        'prosciutto', 'pancetta', 'chorizo', 'salami', 'pepperoni', 'gelatin', 'lard', 'duck',
+        'venison', 'mince', 'meatball',
+    ], MEAT),
+    **dict.fromkeys(['honey'], ANIMAL),
+}
+
+# (phrase, bits to clear, bits to set), applied in order when the phrase occurs in the name
+PHRASE_OVERRIDES = [
+    ('gluten free', GLUTEN, 0),
+    ('dairy free', DAIRY, 0),
+    ('egg free', EGG, 0),
+    ('rice flour', GLUTEN, 0),
+    ('rice noodle', GLUTEN, 0),
+    ('corn tortilla', GLUTEN, 0),
+    ('almond flour', GLUTEN, 0),
+    ('coconut flour', GLUTEN, 0),
+    ('chickpea flour', GLUTEN, 0),
+    ('swiss chard', DAIRY, 0),
+    ('coconut milk', DAIRY, 0),
+    ('coconut cream', DAIRY, 0),
+    ('almond milk', DAIRY, 0),
+    ('oat milk', DAIRY, 0),
+    ('rice milk', DAIRY, 0),
+    ('soy milk', DAIRY, 0),
+    ('cream of tartar', DAIRY, 0),
+    ('cocoa butter', DAIRY, 0),
+    ('peanut butter', DAIRY, 0),
+    ('almond butter', DAIRY, 0),
+    ('cashew butter', DAIRY, 0),
+    ('soy sauce', 0, GLUTEN),
+    ('fish sauce', 0, FISH),
+    ('worcestershire sauce', 0, FISH),
+    ('oyster sauce', 0, SHELLFISH),
+    ('chicken broth', 0, MEAT),
+    ('beef broth', 0, MEAT),
+    ('vegan', DAIRY | EGG | MEAT | FISH | SHELLFISH | ANIMAL, 0),
+]
+
+# Allergy / intolerance names -> bits they forbid
+ALLERGEN_BITS = {
+    'gluten': GLUTEN,
+    'wheat': GLUTEN,
+    'dairy': DAIRY,
+    'milk': DAIRY,
+    'lactose': DAIRY,
+    'egg': EGG,
+    'eggs': EGG,
+    'peanut': PEANUT,
+    'peanuts': PEANUT,
+    'tree nut': TREE_NUT,
+    'tree nuts': TREE_NUT,
+    'nut': PEANUT | TREE_NUT,
+    'nuts': PEANUT | TREE_NUT,
+    'soy': SOY,
+    'fish': FISH,
+    'shellfish': SHELLFISH,
+    'seafood': FISH | SHELLFISH,
+    'sesame': SESAME,
+}
+
+# Dietary restrictions -> bits they forbid
+DIET_BITS = {
+    'vegetarian': MEAT | FISH | SHELLFISH,
+    'lacto ovo vegetarian': MEAT | FISH | SHELLFISH,
+    'lacto vegetarian': MEAT | FISH | SHELLFISH | EGG,
+    'ovo vegetarian': MEAT | FISH | SHELLFISH | DAIRY,
+    'pescetarian': MEAT,
+    'pescatarian': MEAT,
+    'vegan': MEAT | FISH | SHELLFISH | DAIRY | EGG | ANIMAL,
+    'gluten free': GLUTEN,
+    'dairy free': DAIRY,
+}
+
+
+def _key(name: str) -> str:
+    return ' '.join((name or '').lower().replace('-', ' ').split())
+
+
+def ingredient_mask(name: str) -> int:
+    """Contains-bits for one ingredient name (without KNOWN)."""
+    normalized = normalize_ingredient(name)
+    mask = 0
+    for word in normalized.split():
+        mask |= WORD_CLASSES.get(word, 0)
+
+    padded = f' {normalized} '
+    for phrase, clear, add in PHRASE_OVERRIDES:
+        if f' {phrase} ' in padded:
+            mask = (mask & ~clear) | add
+    return mask
+
+
+def recipe_mask(ingredients: Iterable[Dict[str, Any]]) -> int:
+    """Compliance mask for a recipe's full ingredient list (0 when the list is empty)."""
+    mask = 0
+    known = False
+    for ingredient in ingredients:
+        known = True
+        mask |= ingredient_mask(ingredient.get('name', ''))
+    return mask | KNOWN if known else 0
+
+
+def forbidden_mask(allergies: Iterable[str] = (), restrictions: Iterable[str] = ()) -> int:
+    """Bits a household must not get, from get_aggregated_dietary_needs output.
+
+    Allergies without a classification (e.g. "kiwi") add nothing here; the
+    title keyword check and Spoonacular's intolerance filter still apply.
+    """
+    mask = 0
+    for allergy in allergies:
+        mask |= ALLERGEN_BITS.get(_key(allergy), 0)
+    for restriction in restrictions:
+        mask |= DIET_BITS.get(_key(restriction), 0)
+    return mask
+
+
+def is_compliant(mask: Optional[int], forbidden: int) -> Optional[bool]:
+    """True/False when the mask is known, None when the recipe was never classified."""
+    if not mask or not mask & KNOWN:
+        return None
+    return not mask & forbidden
+
+
+def contains(mask: int) -> List[str]:
+    """Readable names of what a compliance mask contains."""
+    return [name for bit, name in CONTAINS_NAMES.items() if mask & bit]
@@ -6,16 +6,70 @@ to retrieve family information, preferences, and meal plans.
 """
 
 import os
-import boto3
-from strands import tool
+import threading
+from .tool_specs import tool
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+from .household_cache import household_cache
+
+
+class _LazyDynamoDB:
+    """DynamoDB resource created on first use, keeping boto3 off the import path."""
+
+    def __init__(self):
+        self._resource = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._resource is None:
+            with self._lock:
+                if self._resource is None:
+                    import boto3
+                    self._resource = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+        return getattr(self._resource, name)
+
+
+dynamodb = _LazyDynamoDB()
 USERS_TABLE = os.getenv('USERS_TABLE', 'hoh-users-2026')
 MEAL_PLANS_TABLE = os.getenv('MEAL_PLANS_TABLE', 'hoh-meal-plans-2026')
 
+# Slot order of generated plans: day by day, these meal types per day
+PLAN_MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+PLAN_TTL_SECONDS = 90 * 24 * 60 * 60
+
+
+def _load_household(household_id: str) -> dict:
+    """Read members and preferences with one query on the HOUSEHOLD#<id> partition."""
+    from household_context import member_from_item, query_household_items
+
+    members = []
+    preferences = {}
+    for item in query_household_items(household_id, dynamodb.Table(USERS_TABLE)):
+        sk = item.get('SK', '')
+        if sk.startswith('MEMBER#'):
+            members.append(member_from_item(item))
+        elif sk == 'PREFERENCES':
+            # The raw item: tools also read fields outside HouseholdPreferences (e.g. pantryItems)
+            preferences = item
+
+    return {
+        'members': members,
+        'preferences': preferences,
+    }
+
+
+def _get_household(household_id: str) -> dict:
+    """Get cached household members and preferences, loading them on a miss."""
+    return household_cache.get(household_id, lambda: _load_household(household_id))
+
+
+def invalidate_household(household_id: str) -> None:
+    """Invalidate cached household data after a write to the household or its plans."""
+    household_cache.invalidate(household_id)
+
 
 @tool
 def get_family_members(household_id: str) -> dict:
@@ -39,30 +93,7 @@ def get_family_members(household_id: str) -> dict:
         - mealPreferences: Specific breakfast/lunch/dinner preferences if different from adults
     """
     try:
-        table = dynamodb.Table(USERS_TABLE)
-
-        response = table.query(
-            KeyConditionExpression='PK = :pk AND begins_with(SK, :sk)',
-            ExpressionAttributeValues={
-                ':pk': f'HOUSEHOLD#{household_id}',
-                ':sk': 'MEMBER#'
-            }
-        )
-
-        members = []
-        for item in response.get('Items', []):
-            member = {
-                'id': item['SK'].replace('MEMBER#', ''),
-                'name': item.get('name', 'Unknown'),
-                'age': item.get('age'),
-                'dietaryRestrictions': item.get('dietaryRestrictions', []),
-                'allergies': item.get('allergies', []),
-                'likes': item.get('likes', []),
-                'dislikes': item.get('dislikes', []),
-                'sameAsAdults': item.get('sameAsAdults', True),
-                'mealPreferences': item.get('mealPreferences'),
-            }
-            members.append(member)
+        members = _get_household(household_id)['members']
 
         return {
             'status': 'success',
@@ -102,16 +133,7 @@ def get_family_preferences(household_id: str) -> dict:
         - additionalPreferences: Free-text preferences (e.g., "budget-friendly", "one-pot meals")
     """
     try:
-        table = dynamodb.Table(USERS_TABLE)
-
-        response = table.get_item(
-            Key={
-                'PK': f'HOUSEHOLD#{household_id}',
-                'SK': 'PREFERENCES'
-            }
-        )
-
-        item = response.get('Item', {})
+        item = _get_household(household_id)['preferences']
 
         preferences = {
             'status': 'success',
@@ -134,6 +156,116 @@ def get_family_preferences(household_id: str) -> dict:
         }
 
 
+def plan_key(household_id: str, start_date: str) -> dict:
+    """Key of a week's plan item - the same PLAN#<startDate> item generation, the API and the tools use."""
+    return {'PK': f'HOUSEHOLD#{household_id}', 'SK': f'PLAN#{start_date}'}
+
+
+def legacy_plan_key(household_id: str, start_date: str) -> dict:
+    """Key save_meal_plan used to write (WEEK#<startDate>); read until those plans are migrated."""
+    return {'PK': f'HOUSEHOLD#{household_id}', 'SK': f'WEEK#{start_date}'}
+
+
+def _slot_meal(date: str, meal_type: str, recipe: dict, member_id: Optional[str] = None) -> dict:
+    meal = {
+        'date': date,
+        'mealType': meal_type,
+        'recipeId': str(recipe.get('recipeId', recipe.get('id', ''))),
+        'recipeName': recipe.get('recipeName', recipe.get('title', '')),
+        'recipeImage': recipe.get('recipeImage', recipe.get('image')),
+        'readyInMinutes': recipe.get('readyInMinutes'),
+        'sourceUrl': recipe.get('sourceUrl'),
+    }
+    if member_id:
+        meal['forMemberId'] = member_id
+    return meal
+
+
+def legacy_meals(start_date: str, meals: list) -> list:
+    """Convert a WEEK# plan's per-day meals ({date, breakfast: {...}, ...}) to one meal per slot.
+
+    Meals already in the slot layout are kept as they are.
+    """
+    slots = []
+    for day in meals:
+        if day.get('mealType'):
+            slots.append(day)
+            continue
+        date = day.get('date', '')
+        for meal_type in PLAN_MEAL_TYPES + ['snacks']:
+            if isinstance(day.get(meal_type), dict):
+                slots.append(_slot_meal(date, meal_type, day[meal_type]))
+        for member_id, member_meals in (day.get('personalizedMeals') or {}).items():
+            for meal_type, recipe in (member_meals or {}).items():
+                if isinstance(recipe, dict):
+                    slots.append(_slot_meal(date, meal_type, recipe, member_id))
+
+    for meal in slots:
+        if meal.get('date') and not meal.get('day'):
+            try:
+                meal['day'] = DAY_NAMES[datetime.strptime(meal['date'], '%Y-%m-%d').weekday()]
+            except ValueError:
+                pass
+    return order_meals(start_date, slots)
+
+
+def load_plan(household_id: str, start_date: str) -> Optional[dict]:
+    """Read a week's plan item, or None if there is none.
+
+    Falls back to a WEEK# plan saved before plans moved to PLAN#, with its
+    meals converted to the slot layout (see legacy_meals).
+    """
+    table = dynamodb.Table(MEAL_PLANS_TABLE)
+    item = table.get_item(Key=plan_key(household_id, start_date)).get('Item')
+    if item:
+        return item
+
+    item = table.get_item(Key=legacy_plan_key(household_id, start_date)).get('Item')
+    if item:
+        item['meals'] = legacy_meals(start_date, item.get('meals', []))
+    return item
+
+
+def _copy_legacy_plan(table, household_id: str, start_date: str) -> bool:
+    """Copy a WEEK# plan to PLAN# in the slot layout so it can be updated. False when there is none."""
+    from botocore.exceptions import ClientError
+
+    legacy = table.get_item(Key=legacy_plan_key(household_id, start_date)).get('Item')
+    if not legacy:
+        return False
+
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    item = {
+        **legacy,
+        **plan_key(household_id, start_date),
+        'householdId': household_id,
+        'startDate': start_date,
+        'endDate': (start + timedelta(days=6)).strftime('%Y-%m-%d'),
+        'meals': legacy_meals(start_date, legacy.get('meals', [])),
+        'ttl': int(datetime.utcnow().timestamp()) + PLAN_TTL_SECONDS,
+    }
+    try:
+        # Never overwrite a PLAN# item written in the meantime
+        table.put_item(Item=item, ConditionExpression='attribute_not_exists(PK)')
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+    return True
+
+
+def order_meals(start_date: str, meals: list) -> list:
+    """Plan meals in slot order: household breakfast/lunch/dinner by day, then everything else.
+
+    This is the order the planner saves in, so update_meal_slot finds each
+    slot at a fixed position (see _slot_index).
+    """
+    def position(meal: dict) -> int:
+        index = None if meal.get('forMemberId') else _slot_index(start_date, meal.get('date', ''), meal.get('mealType'))
+        return index if index is not None else 7 * len(PLAN_MEAL_TYPES)
+
+    return sorted(meals, key=position)
+
+
 @tool
 def get_meal_plan(household_id: str, start_date: str) -> dict:
     """Get the existing meal plan for a household starting from a specific date.
@@ -147,23 +279,16 @@ def get_meal_plan(household_id: str, start_date: str) -> dict:
 
     Returns:
         A dictionary containing:
-        - meals: List of meal objects for the week, each containing:
-          - day: Day of the week (monday, tuesday, etc.)
+        - meals: List of meal objects, one per slot, each containing:
           - date: The date in YYYY-MM-DD format
-          - breakfast, lunch, dinner: Meal details with id, title, image, readyInMinutes
-          - personalizedMeals: Different meals for family members with specific needs
+          - day: Day of the week (monday, tuesday, etc.)
+          - mealType: 'breakfast', 'lunch', 'dinner' or 'snacks'
+          - recipeId, recipeName, recipeImage, readyInMinutes, servings, sourceUrl
+          - forMemberId (optional): Set on meals for one member with specific needs
+        - version: Pass as expected_version to update_meal_slot
     """
     try:
-        table = dynamodb.Table(MEAL_PLANS_TABLE)
-
-        response = table.get_item(
-            Key={
-                'PK': f'HOUSEHOLD#{household_id}',
-                'SK': f'WEEK#{start_date}'
-            }
-        )
-
-        item = response.get('Item')
+        item = load_plan(household_id, start_date)
 
         if not item:
             return {
@@ -176,6 +301,7 @@ def get_meal_plan(household_id: str, start_date: str) -> dict:
             'householdId': household_id,
             'startDate': start_date,
             'meals': item.get('meals', []),
+            'version': int(item.get('version', 0)),
             'createdAt': item.get('createdAt'),
             'updatedAt': item.get('updatedAt')
         }
@@ -201,13 +327,13 @@ def save_meal_plan(
     Args:
         household_id: The unique identifier for the household
         start_date: The start date of the week in YYYY-MM-DD format (should be a Monday)
-        meals: List of meal objects for the week. Each meal object should contain:
-            - day: Day of the week (monday, tuesday, etc.)
+        meals: List of meal objects, one per slot (the layout get_meal_plan returns).
+            Each meal object should contain:
             - date: The date in YYYY-MM-DD format
-            - breakfast: Object with id, title, image, readyInMinutes, sourceUrl
-            - lunch: Object with id, title, image, readyInMinutes, sourceUrl
-            - dinner: Object with id, title, image, readyInMinutes, sourceUrl
-            - personalizedMeals (optional): Dict mapping member IDs to their specific meals
+            - mealType: 'breakfast', 'lunch', 'dinner' or 'snacks'
+            - recipeId, recipeName, plus recipeImage, readyInMinutes, servings
+              and sourceUrl when known
+            - forMemberId (optional): Member ID for a meal only they eat
 
     Returns:
         A dictionary with status and the saved meal plan details
@@ -215,26 +341,208 @@ def save_meal_plan(
     try:
         table = dynamodb.Table(MEAL_PLANS_TABLE)
 
+        invalid = [meal for meal in meals if not meal.get('date') or not meal.get('mealType')]
+        if invalid:
+            return {
+                'status': 'error',
+                'error': 'Every meal needs a date and a mealType (one object per slot)',
+            }
+
         now = datetime.utcnow().isoformat()
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        meals = [
+            {**meal, 'day': DAY_NAMES[datetime.strptime(meal['date'], '%Y-%m-%d').weekday()]}
+            for meal in order_meals(start_date, meals)
+        ]
+
+        # Update rather than put so a re-save keeps createdAt and bumps the version
+        table.update_item(
+            Key=plan_key(household_id, start_date),
+            UpdateExpression=(
+                'SET householdId = :householdId, startDate = :startDate, endDate = :endDate, meals = :meals, '
+                'createdAt = if_not_exists(createdAt, :now), updatedAt = :now, '
+                '#ttl = if_not_exists(#ttl, :ttl) ADD version :one'
+            ),
+            ExpressionAttributeNames={'#ttl': 'ttl'},
+            ExpressionAttributeValues={
+                ':householdId': household_id,
+                ':startDate': start_date,
+                ':endDate': (start + timedelta(days=6)).strftime('%Y-%m-%d'),
+                ':meals': meals,
+                ':now': now,
+                ':ttl': int(datetime.utcnow().timestamp()) + PLAN_TTL_SECONDS,
+                ':one': 1,
+            },
+        )
+        invalidate_household(household_id)
 
-        item = {
-            'PK': f'HOUSEHOLD#{household_id}',
-            'SK': f'WEEK#{start_date}',
+        return {
+            'status': 'success',
+            'message': f'Meal plan saved for week starting {start_date}',
             'householdId': household_id,
             'startDate': start_date,
-            'meals': meals,
-            'createdAt': now,
+            'mealCount': len(meals)
+        }
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+def _slot_index(start_date: str, date: str, meal_type: str) -> Optional[int]:
+    """Position of a slot in a complete plan's meals list (see order_meals), or None if outside the layout."""
+    try:
+        day_offset = (datetime.strptime(date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days
+    except ValueError:
+        return None
+    if not 0 <= day_offset < 7 or meal_type not in PLAN_MEAL_TYPES:
+        return None
+    return day_offset * len(PLAN_MEAL_TYPES) + PLAN_MEAL_TYPES.index(meal_type)
+
+
+def _find_slot(meals: list, date: str, meal_type: str) -> Optional[int]:
+    """Index of the household-wide meal for a slot (member-specific meals are skipped)."""
+    for index, meal in enumerate(meals):
+        if meal.get('date') == date and meal.get('mealType') == meal_type and not meal.get('forMemberId'):
+            return index
+    return None
+
+
+@tool
+def update_meal_slot(
+    household_id: str,
+    start_date: str,
+    date: str,
+    meal_type: str,
+    meal: dict,
+    expected_version: Optional[int] = None
+) -> dict:
+    """Replace the meal in one slot of a saved meal plan.
+
+    Use this tool to swap a single meal (e.g., "change Tuesday's dinner")
+    instead of re-saving the whole week with save_meal_plan. Only the one
+    slot is written.
+
+    Args:
+        household_id: The unique identifier for the household
+        start_date: The start date of the plan's week in YYYY-MM-DD format
+        date: The date of the meal to replace in YYYY-MM-DD format
+        meal_type: 'breakfast', 'lunch', 'dinner' or 'snacks'
+        meal: The new meal with recipeId and recipeName, plus recipeImage,
+            readyInMinutes, servings and sourceUrl when known
+        expected_version: Plan version you last read; the update is refused
+            if the plan changed since (omit to always apply)
+
+    Returns:
+        A dictionary with status, the saved meal and the plan's new version
+    """
+    from boto3.dynamodb.types import TypeDeserializer
+    from botocore.exceptions import ClientError
+
+    try:
+        table = dynamodb.Table(MEAL_PLANS_TABLE)
+        deserializer = TypeDeserializer()
+
+        now = datetime.utcnow().isoformat()
+        day = DAY_NAMES[datetime.strptime(date, '%Y-%m-%d').weekday()]
+        new_meal = {
+            'source': 'ai_suggest',
+            'isUserMeal': False,
+            **meal,
+            'date': date,
+            'day': day,
+            'mealType': meal_type,
             'updatedAt': now,
         }
 
-        table.put_item(Item=item)
+        values = {':meal': new_meal, ':date': date, ':mealType': meal_type, ':now': now, ':one': 1}
+        version_check = ''
+        if expected_version is not None:
+            if expected_version:
+                version_check = ' AND version = :version'
+                values[':version'] = expected_version
+            else:
+                version_check = ' AND attribute_not_exists(version)'
+
+        slot_missing = {
+            'status': 'not_found',
+            'message': f'No {meal_type} on {date} in the plan for week starting {start_date}'
+        }
+
+        plan_missing = {
+            'status': 'not_found',
+            'message': f'No meal plan found for week starting {start_date}'
+        }
+        key = plan_key(household_id, start_date)
+
+        # Breakfast/lunch/dinner sit at a fixed position (see order_meals); the condition proves it
+        index = _slot_index(start_date, date, meal_type)
+        copied = False
+        if index is None:
+            plan = table.get_item(Key=key, ProjectionExpression='meals').get('Item')
+            if not plan:
+                if not _copy_legacy_plan(table, household_id, start_date):
+                    return plan_missing
+                copied = True
+                plan = table.get_item(Key=key, ProjectionExpression='meals').get('Item') or {}
+            index = _find_slot(plan.get('meals', []), date, meal_type)
+            if index is None:
+                return slot_missing
+
+        for _ in range(3):
+            try:
+                response = table.update_item(
+                    Key=key,
+                    UpdateExpression=f'SET meals[{index}] = :meal, updatedAt = :now ADD version :one',
+                    ConditionExpression=(
+                        f'meals[{index}].#date = :date AND meals[{index}].mealType = :mealType'
+                        f' AND attribute_not_exists(meals[{index}].forMemberId){version_check}'
+                    ),
+                    ExpressionAttributeNames={'#date': 'date'},
+                    ExpressionAttributeValues=values,
+                    ReturnValues='UPDATED_NEW',
+                    ReturnValuesOnConditionCheckFailure='ALL_OLD',
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                old = e.response.get('Item')
+                if not old:
+                    # A plan saved under the old WEEK# key is copied forward once, then updated
+                    if copied or not _copy_legacy_plan(table, household_id, start_date):
+                        return plan_missing
+                    copied = True
+                    continue
+
+                plan = {name: deserializer.deserialize(value) for name, value in old.items()}
+                version = int(plan.get('version', 0))
+                if expected_version is not None and version != expected_version:
+                    return {
+                        'status': 'conflict',
+                        'error': 'The meal plan changed since it was read - fetch it again and retry',
+                        'version': version,
+                    }
+                # The slot is elsewhere in this plan; the returned item says where
+                index = _find_slot(plan.get('meals', []), date, meal_type)
+                if index is None:
+                    return slot_missing
+                continue
+
+            invalidate_household(household_id)
+            return {
+                'status': 'success',
+                'message': f'{meal_type.title()} on {date} updated',
+                'householdId': household_id,
+                'startDate': start_date,
+                'meal': new_meal,
+                'version': int(response['Attributes']['version']),
+            }
 
         return {
-            'status': 'success',
-            'message': f'Meal plan saved for week starting {start_date}',
-            'householdId': household_id,
-            'startDate': start_date,
-            'mealCount': len(meals)
+            'status': 'conflict',
+            'error': 'The meal plan is being changed concurrently - fetch it again and retry',
         }
 
     except Exception as e:
@@ -263,13 +571,8 @@ def get_aggregated_dietary_needs(household_id: str) -> dict:
         - membersWithDifferentMeals: List of members who need separate meals
     """
     try:
-        # Get family members first
-        members_result = get_family_members(household_id)
-
-        if members_result.get('status') == 'error':
-            return members_result
-
-        members = members_result.get('members', [])
+        # Computed from the cached member list - no second query
+        members = _get_household(household_id)['members']
 
         all_restrictions = set()
         all_allergies = set()
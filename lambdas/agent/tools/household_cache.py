@@ -0,0 +1,119 @@
+"""
+Household Context Cache for HOH Meal Agent
+
+The chat agent reads the same household items (members, preferences) on
+almost every turn. This cache keeps them in-container per household for a
+short TTL. Every household has a version stamp that write paths bump via
+invalidate(); a load that started before an invalidation is returned to
+its caller but never stored, so a write is never masked by an older read.
+
+A warm container serves many households, so entries are kept in LRU order
+up to a fixed count and expired entries are dropped when next seen. A
+version stamp is only kept while its household has an entry or a load in
+flight - nothing else can race a write.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+HOUSEHOLD_CACHE_TTL_SECONDS = float(os.getenv('HOUSEHOLD_CACHE_TTL_SECONDS', '30'))
+HOUSEHOLD_CACHE_MAX_ENTRIES = int(os.getenv('HOUSEHOLD_CACHE_MAX_ENTRIES', '256'))
+
+
+class HouseholdCache:
+    """Short-TTL, version-stamped LRU cache of household data keyed by household ID."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = HOUSEHOLD_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        max_entries: int = HOUSEHOLD_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # household_id -> (version, loadedAt, data), least recently used first
+        self._entries: 'OrderedDict[str, Tuple[int, float, Any]]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        # household_id -> loads in flight
+        self._loading: Dict[str, int] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def version(self, household_id: str) -> int:
+        """Current version stamp for a household."""
+        with self._lock:
+            return self._versions.get(household_id, 0)
+
+    def _forget(self, household_id: str) -> None:
+        """Drop a version stamp nothing depends on any more (caller holds the lock)."""
+        if household_id not in self._entries and household_id not in self._loading:
+            self._versions.pop(household_id, None)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within max_entries (caller holds the lock)."""
+        while len(self._entries) > self.max_entries:
+            oldest, _ = self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+            self._forget(oldest)
+
+    def get(self, household_id: str, loader: Callable[[], Any]) -> Any:
+        """Return cached data for the household, calling loader when missing, stale or invalidated."""
+        with self._lock:
+            version = self._versions.get(household_id, 0)
+            entry = self._entries.get(household_id)
+            if entry is not None:
+                entry_version, loaded_at, data = entry
+                if entry_version == version and self.clock() - loaded_at < self.ttl_seconds:
+                    self._entries.move_to_end(household_id)
+                    self._stats['hits'] += 1
+                    return data
+                del self._entries[household_id]
+
+            self._stats['misses'] += 1
+            self._loading[household_id] = self._loading.get(household_id, 0) + 1
+
+        loaded = False
+        try:
+            data = loader()
+            loaded = True
+        finally:
+            with self._lock:
+                remaining = self._loading.pop(household_id) - 1
+                if remaining:
+                    self._loading[household_id] = remaining
+                # Only store if no write happened while we were loading
+                if loaded and self._versions.get(household_id, 0) == version:
+                    self._entries[household_id] = (version, self.clock(), data)
+                    self._entries.move_to_end(household_id)
+                    self._evict()
+                self._forget(household_id)
+
+        return data
+
+    def invalidate(self, household_id: str) -> None:
+        """Drop cached data and bump the version after a write."""
+        with self._lock:
+            self._versions[household_id] = self._versions.get(household_id, 0) + 1
+            self._entries.pop(household_id, None)
+            self._forget(household_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the number of cached households."""
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop every cached household."""
+        with self._lock:
+            for household_id in self._loading:
+                self._versions[household_id] = self._versions.get(household_id, 0) + 1
+            self._entries.clear()
+            for household_id in list(self._versions):
+                self._forget(household_id)
+
+
+household_cache = HouseholdCache()
@@ -0,0 +1,112 @@
+"""
+Shared HTTP Client for Spoonacular Tools
+
+Keeps one pooled, keep-alive httpx client per container so TCP and TLS
+setup to api.spoonacular.com is paid once per cold start instead of once
+per tool call. The module-level client survives Lambda warm starts.
+
+HTTP/2 is used when the optional `h2` package is installed. Pool limits
+are configurable through environment variables and every endpoint gets
+its own timeout. Every request passes through the shared rate limiter
+and is timed as the request's "spoonacular" phase (see request_metrics).
+"""
+
+import os
+import threading
+import httpx
+from typing import Any, Dict, Optional
+
+import request_metrics
+
+from .rate_limiter import get_limiter
+
+SPOONACULAR_BASE_URL = 'https://api.spoonacular.com'
+
+HTTP_MAX_CONNECTIONS = int(os.getenv('SPOONACULAR_MAX_CONNECTIONS', '20'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('SPOONACULAR_MAX_KEEPALIVE_CONNECTIONS', '10'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('SPOONACULAR_KEEPALIVE_EXPIRY', '60'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('SPOONACULAR_CONNECT_TIMEOUT', '5'))
+
+# Read timeouts per endpoint path prefix (seconds)
+ENDPOINT_TIMEOUTS = {
+    '/recipes/complexSearch': 15.0,
+    '/recipes/findByIngredients': 10.0,
+    '/recipes/informationBulk': 20.0,
+    '/recipes/random': 10.0,
+    '/mealplanner/generate': 20.0,
+}
+DEFAULT_TIMEOUT = float(os.getenv('SPOONACULAR_DEFAULT_TIMEOUT', '30'))
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def timeout_for(path: str) -> httpx.Timeout:
+    """Get the timeout for a Spoonacular endpoint path."""
+    read_timeout = DEFAULT_TIMEOUT
+    for prefix, seconds in ENDPOINT_TIMEOUTS.items():
+        if path.startswith(prefix):
+            read_timeout = seconds
+            break
+    return httpx.Timeout(read_timeout, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def get_client() -> httpx.Client:
+    """Get the shared sync client, creating it on first use.
+
+    httpx.Client is thread-safe, so tools running concurrently in the agent's
+    tool executor threads share the same connection pool.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    base_url=SPOONACULAR_BASE_URL,
+                    http2=_http2_available(),
+                    limits=_limits(),
+                    timeout=DEFAULT_TIMEOUT,
+                )
+    return _client
+
+
+def spoonacular_get(path: str, params: Dict[str, Any]) -> Any:
+    """GET a Spoonacular endpoint on the shared client and return the parsed JSON.
+
+    Requests go through the container's rate limiter (see rate_limiter).
+    Raises SpoonacularRateLimited when over quota with no cached response,
+    and httpx.HTTPStatusError for other non-2xx responses.
+    """
+    def fetch() -> httpx.Response:
+        request_metrics.count('spoonacularCalls')
+        return get_client().get(path, params=params, timeout=timeout_for(path))
+
+    with request_metrics.phase('spoonacular'):
+        return get_limiter().request(path, params, fetch)
+
+
+def close_clients() -> None:
+    """Close the shared client."""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,159 @@
+"""
+Pantry Matcher for HOH Meal Agent
+
+search_recipes_by_ingredients ("what can I make with chicken, rice and
+broccoli?") used to call Spoonacular's findByIngredients every time. The
+matcher answers it from the local recipe corpus instead.
+
+Every distinct normalized ingredient name in the corpus gets a bit
+position, and each recipe's ingredient set becomes a row of uint64 words.
+A pantry becomes a bit mask over the same vocabulary, so for all recipes
+at once:
+
+    used   = popcount(recipe & pantry & ~staples)
+    missed = popcount(recipe & ~pantry & ~staples)
+
+Recipes using at least one pantry ingredient are ranked like Spoonacular:
+ranking=1 maximizes used ingredients, ranking=2 minimizes missing ones.
+With ignore_pantry the staples mask hides salt, water, oil and the like
+from both counts. Pantry items match ingredients exactly on their
+canonical pantry_name, the same rule the shopping list uses.
+
+The bit matrix is rebuilt lazily whenever the corpus version changes.
+"""
+
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .recipe_corpus import PANTRY_STAPLES, RecipeCorpus, get_recipe_corpus, pantry_name
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+
+class PantryMatcher:
+    """Rank corpus recipes by how well they use a list of pantry ingredients."""
+
+    def __init__(self, corpus: RecipeCorpus):
+        self.corpus = corpus
+        self._lock = threading.Lock()
+        self._version = -1
+        self._vocab: List[str] = []
+        self._vocab_names: List[str] = []
+        self._bits = np.zeros((0, 0), dtype=np.uint64)
+        self._staples = np.zeros(0, dtype=np.uint64)
+
+    def _mask(self, positions: Iterable[int]) -> np.ndarray:
+        mask = np.zeros(self._bits.shape[1], dtype=np.uint64)
+        for position in positions:
+            mask[position // WORD_BITS] |= np.uint64(1 << (position % WORD_BITS))
+        return mask
+
+    def _refresh(self) -> None:
+        """Rebuild the recipe bit matrix if the corpus changed since the last build."""
+        version = self.corpus.version
+        if version == self._version:
+            return
+
+        postings = {item: docs for item, docs in self.corpus.item_postings().items() if docs}
+        vocab = sorted(postings)
+        bits = np.zeros((self.corpus.doc_count(), -(-len(vocab) // WORD_BITS)), dtype=np.uint64)
+        for position, item in enumerate(vocab):
+            docs = np.fromiter(postings[item], dtype=np.int64, count=len(postings[item]))
+            bits[docs, position // WORD_BITS] |= np.uint64(1 << (position % WORD_BITS))
+
+        self._vocab = vocab
+        self._vocab_names = [pantry_name(item) for item in vocab]
+        self._bits = bits
+        self._staples = self._mask(i for i, item in enumerate(vocab) if item in PANTRY_STAPLES)
+        self._version = version
+        logger.info(f"Pantry matcher rebuilt: {len(vocab)} ingredients x {bits.shape[0]} recipes")
+
+    def pantry_mask(self, pantry: Iterable[str]) -> np.ndarray:
+        """Bits for every vocabulary item with the same pantry_name as a pantry ingredient.
+
+        "boneless chicken breasts" matches "chicken breast", but "chicken"
+        does not match "chicken broth" and "garlic powder" does not match "garlic".
+        """
+        wanted = {pantry_name(name) for name in pantry} - {''}
+        return self._mask(i for i, name in enumerate(self._vocab_names) if name in wanted)
+
+    def _names(self, row: np.ndarray, mask: np.ndarray) -> List[str]:
+        hits = np.unpackbits((row & mask).view(np.uint8), bitorder='little')
+        return [self._vocab[i] for i in np.flatnonzero(hits[:len(self._vocab)])]
+
+    def match(
+        self,
+        pantry: Iterable[str],
+        number: int = 10,
+        ranking: int = 1,
+        ignore_pantry: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Best recipes for a pantry, in findByIngredients format.
+
+        Args:
+            pantry: Ingredient names the household has
+            number: Maximum recipes to return
+            ranking: 1 = maximize used ingredients, 2 = minimize missing ingredients
+            ignore_pantry: Leave pantry staples out of used/missed counts
+
+        Returns:
+            Recipes with usedIngredientCount, missedIngredientCount and the
+            used/missed ingredient names, best first
+        """
+        with self._lock:
+            self._refresh()
+            if not self._vocab:
+                return []
+
+            have = self.pantry_mask(pantry)
+            skip = self._staples if ignore_pantry else np.zeros_like(have)
+            used_mask = have & ~skip
+            missed_mask = ~(have | skip)
+
+            used = np.bitwise_count(self._bits & used_mask).sum(axis=1, dtype=np.int64)
+            missed = np.bitwise_count(self._bits & missed_mask).sum(axis=1, dtype=np.int64)
+
+            candidates = np.flatnonzero(used > 0)
+            if ranking == 2:
+                order = np.lexsort((-used[candidates], missed[candidates]))
+            else:
+                order = np.lexsort((missed[candidates], -used[candidates]))
+            docs = candidates[order[:number]].tolist()
+
+            names = [
+                (self._names(self._bits[doc], used_mask), self._names(self._bits[doc], missed_mask))
+                for doc in docs
+            ]
+
+        recipes = []
+        for record, (used_names, missed_names) in zip(self.corpus.records(docs), names):
+            recipes.append({
+                'id': record['id'],
+                'title': record['title'],
+                'image': record.get('image', ''),
+                'usedIngredientCount': len(used_names),
+                'missedIngredientCount': len(missed_names),
+                'usedIngredients': used_names,
+                'missedIngredients': missed_names,
+            })
+        return recipes
+
+
+_pantry_matcher: Optional[PantryMatcher] = None
+_pantry_matcher_lock = threading.Lock()
+
+
+def get_pantry_matcher() -> PantryMatcher:
+    """Get the process-wide pantry matcher over the recipe corpus."""
+    global _pantry_matcher
+
+    if _pantry_matcher is None:
+        with _pantry_matcher_lock:
+            if _pantry_matcher is None:
+                _pantry_matcher = PantryMatcher(get_recipe_corpus())
+    return _pantry_matcher
@@ -0,0 +1,311 @@
+"""
+Spoonacular Rate Limiter for HOH Meal Agent
+
+Spoonacular enforces a daily point budget (reported on every response in
+the X-API-Quota-* headers) and a per-second request rate, answering 402
+when the day's points are gone and 429 when requests come too fast. Under
+a burst of concurrent plan generations every agent used to hit those
+limits independently and retry blindly.
+
+Every Spoonacular GET goes through one SpoonacularLimiter per container:
+
+1. Identical in-flight requests are coalesced (single-flight) - one call
+   goes out and every waiter gets its result.
+2. Requests are refused up front once the daily budget is below a reserve,
+   or during a Retry-After back-off after a 429.
+3. A token bucket spaces requests to the configured rate.
+4. Refused or rate-limited requests degrade to the last successful
+   response for the same request if there is one; otherwise
+   SpoonacularRateLimited is raised so tools can fall back to local data.
+
+Endpoints in UNSHARED_PATHS (/recipes/random) skip steps 1 and 4: each
+caller wants a different answer, so sharing or replaying one would only
+repeat the same recipes.
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger()
+
+SPOONACULAR_RATE_PER_SECOND = float(os.getenv('SPOONACULAR_RATE_PER_SECOND', '5'))
+SPOONACULAR_BURST = int(os.getenv('SPOONACULAR_BURST', '10'))
+# Longest a request waits for a token before degrading (seconds)
+SPOONACULAR_MAX_WAIT = float(os.getenv('SPOONACULAR_MAX_WAIT', '2'))
+# Points kept in reserve; below this the day's budget counts as spent
+SPOONACULAR_QUOTA_RESERVE = float(os.getenv('SPOONACULAR_QUOTA_RESERVE', '10'))
+# Last successful responses kept for degraded answers
+SPOONACULAR_STALE_ENTRIES = int(os.getenv('SPOONACULAR_STALE_ENTRIES', '200'))
+DEFAULT_RETRY_AFTER = 5.0
+
+# Endpoints whose responses are never coalesced or replayed
+UNSHARED_PATHS = frozenset({'/recipes/random'})
+
+RequestKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class SpoonacularRateLimited(Exception):
+    """Spoonacular refused the request (or would have) and no cached response exists."""
+
+    def __init__(self, reason: str, retry_after: Optional[float] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def request_key(path: str, params: Dict[str, Any]) -> RequestKey:
+    """Cache/coalescing key for a request, ignoring the API key."""
+    return path, tuple(sorted((k, str(v)) for k, v in params.items() if k != 'apiKey'))
+
+
+def _seconds_until_utc_midnight(now: float) -> float:
+    current = datetime.fromtimestamp(now, tz=timezone.utc)
+    midnight = (current + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - current).total_seconds()
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait: float) -> bool:
+        """Take one token, waiting up to max_wait seconds. Returns False on timeout."""
+        deadline = self.clock() + max_wait
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if self.clock() + wait > deadline:
+                return False
+            self.sleep(wait)
+
+
+class _Refused(SpoonacularRateLimited):
+    """Internal: the limiter declined to send a request."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, _Call] = {}
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per key at a time. Returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+class SpoonacularLimiter:
+    """Quota tracking, token bucket, single-flight and stale fallback for Spoonacular GETs."""
+
+    def __init__(
+        self,
+        rate: float = SPOONACULAR_RATE_PER_SECOND,
+        burst: int = SPOONACULAR_BURST,
+        max_wait: float = SPOONACULAR_MAX_WAIT,
+        quota_reserve: float = SPOONACULAR_QUOTA_RESERVE,
+        stale_entries: int = SPOONACULAR_STALE_ENTRIES,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        bucket_clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_wait = max_wait
+        self.quota_reserve = quota_reserve
+        self.stale_entries = stale_entries
+        # Wall time only for back-off deadlines and the UTC-midnight quota reset;
+        # the token bucket keeps a monotonic clock so a clock step cannot stall or flood it
+        self.clock = clock
+
+        self.bucket = TokenBucket(rate, burst, clock=bucket_clock, sleep=sleep)
+        self.flights = SingleFlight()
+
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._quota_left: Optional[float] = None
+        self._stale: 'OrderedDict[RequestKey, Any]' = OrderedDict()
+        self._stats = {
+            'requests': 0,
+            'coalesced': 0,
+            'throttled': 0,
+            'degraded': 0,
+            'refused': 0,
+        }
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _block(self, seconds: float, reason: str) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+        logger.warning(f"Spoonacular requests paused for {seconds:.0f}s: {reason}")
+
+    def _observe_quota(self, headers: Any) -> None:
+        """Track the day's remaining points from the X-API-Quota-* headers."""
+        left = headers.get('X-API-Quota-Left')
+        if left is None:
+            return
+        try:
+            left = float(left)
+        except ValueError:
+            return
+
+        with self._lock:
+            self._quota_left = left
+        if left <= self.quota_reserve:
+            self._block(_seconds_until_utc_midnight(self.clock()), f'daily quota low ({left:.0f} points left)')
+
+    def _degrade(self, key: RequestKey, reason: str, retry_after: Optional[float] = None) -> Any:
+        with self._lock:
+            if key in self._stale and key[0] not in UNSHARED_PATHS:
+                self._stats['degraded'] += 1
+                return self._stale[key]
+            self._stats['refused'] += 1
+        raise SpoonacularRateLimited(reason, retry_after)
+
+    def _remember(self, key: RequestKey, data: Any) -> None:
+        with self._lock:
+            self._stale[key] = data
+            self._stale.move_to_end(key)
+            while len(self._stale) > self.stale_entries:
+                self._stale.popitem(last=False)
+
+    def blocked_for(self) -> float:
+        """Seconds until requests are allowed again (0 when not blocked)."""
+        with self._lock:
+            return max(0.0, self._blocked_until - self.clock())
+
+    def _admit(self, max_wait: float) -> None:
+        """Check quota/back-off and take a token; raises _Refused when the request must not go out."""
+        blocked = self.blocked_for()
+        if blocked > 0:
+            raise _Refused('Spoonacular quota or rate limit reached', blocked)
+
+        if not self.bucket.acquire(max_wait):
+            self._count('throttled')
+            raise _Refused('Too many concurrent Spoonacular requests', 1 / self.bucket.rate)
+
+        self._count('requests')
+
+    def _handle(self, key: RequestKey, response: Any) -> Any:
+        """Record quota headers and turn the response into data, a degraded answer or an error."""
+        self._observe_quota(response.headers)
+
+        if response.status_code == 402:
+            self._block(_seconds_until_utc_midnight(self.clock()), 'daily quota exhausted (402)')
+            return self._degrade(key, 'Spoonacular daily quota exhausted', self.blocked_for())
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+            except ValueError:
+                retry_after = DEFAULT_RETRY_AFTER
+            self._block(retry_after, 'rate limited (429)')
+            return self._degrade(key, 'Spoonacular rate limit reached', retry_after)
+
+        response.raise_for_status()
+        data = response.json()
+        if key[0] not in UNSHARED_PATHS:
+            self._remember(key, data)
+        return data
+
+    def _send(self, key: RequestKey, fetch: Callable[[], Any]) -> Any:
+        try:
+            self._admit(self.max_wait)
+        except _Refused as refused:
+            return self._degrade(key, refused.reason, refused.retry_after)
+        return self._handle(key, fetch())
+
+    def request(self, path: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        """Send a GET through the limiter; fetch() performs it and returns the httpx response.
+
+        Returns the parsed JSON (possibly a cached earlier response when
+        degraded). Raises SpoonacularRateLimited when refused with nothing
+        cached, and httpx.HTTPStatusError for other non-2xx responses.
+        """
+        key = request_key(path, params)
+        if path in UNSHARED_PATHS:
+            return self._send(key, fetch)
+
+        data, shared = self.flights.do(key, lambda: self._send(key, fetch))
+        if shared:
+            self._count('coalesced')
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, remaining daily points and current back-off."""
+        with self._lock:
+            stats = {**self._stats, 'quotaLeft': self._quota_left}
+        stats['blockedForSeconds'] = round(self.blocked_for(), 1)
+        return stats
+
+
+_limiter: Optional[SpoonacularLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> SpoonacularLimiter:
+    """Get the container-wide Spoonacular limiter, creating it on first use."""
+    global _limiter
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = SpoonacularLimiter()
+    return _limiter
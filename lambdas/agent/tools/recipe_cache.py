@@ -0,0 +1,290 @@
+"""
+Recipe Details Cache for HOH Meal Agent
+
+Two-tier cache for normalized Spoonacular recipe details. Recipe details
+almost never change, and the weekly generation path asks for the same
+popular recipe IDs across many households, so lookups are served from:
+
+1. An in-process LRU (bounded by RECIPE_CACHE_MAX_ENTRIES) that survives
+   Lambda warm starts.
+2. A shared tier keyed by recipe ID - DynamoDB when RECIPE_CACHE_TABLE is
+   set, otherwise JSON files under RECIPE_CACHE_DIR (/tmp on Lambda).
+
+Entries younger than RECIPE_CACHE_TTL_SECONDS are fresh. Entries past the
+TTL but inside RECIPE_CACHE_STALE_SECONDS are stale: they are re-fetched
+in the request that finds them, and only served if that re-fetch fails.
+This gives up stale-while-revalidate's latency win on stale hits - Lambda
+freezes the container once the response is returned, so a background
+refresh may never run. A longer TTL is the lever for fewer stale hits.
+Past both windows an entry is a miss.
+
+Keys are Spoonacular recipe IDs and must be all digits (see
+is_recipe_key); the file tier uses them as file names.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECIPE_CACHE_TABLE = os.getenv('RECIPE_CACHE_TABLE')
+RECIPE_CACHE_DIR = os.getenv('RECIPE_CACHE_DIR', '/tmp/hoh-recipe-cache')
+RECIPE_CACHE_MAX_ENTRIES = int(os.getenv('RECIPE_CACHE_MAX_ENTRIES', '1024'))
+RECIPE_CACHE_TTL_SECONDS = int(os.getenv('RECIPE_CACHE_TTL_SECONDS', str(7 * 24 * 60 * 60)))
+RECIPE_CACHE_STALE_SECONDS = int(os.getenv('RECIPE_CACHE_STALE_SECONDS', str(30 * 24 * 60 * 60)))
+
+# (value, fetchedAt epoch seconds)
+CacheEntry = Tuple[Dict[str, Any], float]
+
+RECIPE_KEY_PATTERN = re.compile(r'[0-9]+')
+
+
+def is_recipe_key(key: str) -> bool:
+    """True for a cacheable recipe ID: ASCII digits only."""
+    return bool(RECIPE_KEY_PATTERN.fullmatch(key))
+
+
+class DynamoRecipeTier:
+    """Shared cache tier stored as RECIPE#<id> items in a DynamoDB table."""
+
+    def __init__(self, table_name: str, expire_after: int):
+        import boto3
+
+        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+        self.table = dynamodb.Table(table_name)
+        self.expire_after = expire_after
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        response = self.table.get_item(Key={'PK': f'RECIPE#{key}', 'SK': 'DETAILS'})
+        item = response.get('Item')
+        if not item:
+            return None
+        return json.loads(item['payload']), float(item['fetchedAt'])
+
+    def put(self, key: str, value: Dict[str, Any], fetched_at: float) -> None:
+        # Payload is stored as a JSON string so floats never hit Decimal conversion
+        self.table.put_item(Item={
+            'PK': f'RECIPE#{key}',
+            'SK': 'DETAILS',
+            'payload': json.dumps(value),
+            'fetchedAt': int(fetched_at),
+            'ttl': int(fetched_at) + self.expire_after,
+        })
+
+
+class FileRecipeTier:
+    """Shared cache tier stored as one JSON file per recipe ID."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Keys become file names, so anything but a numeric ID could escape the directory
+        if not is_recipe_key(key):
+            raise ValueError(f'Invalid recipe cache key: {key!r}')
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return data['payload'], float(data['fetchedAt'])
+
+    def put(self, key: str, value: Dict[str, Any], fetched_at: float) -> None:
+        # Write to a temp file and rename so readers never see a partial entry
+        tmp_path = f'{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'payload': value, 'fetchedAt': fetched_at}, f)
+        os.replace(tmp_path, self._path(key))
+
+
+class RecipeCache:
+    """In-process LRU in front of an optional shared tier, with TTL and stale-if-error."""
+
+    def __init__(
+        self,
+        shared_tier: Any = None,
+        max_entries: int = RECIPE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = RECIPE_CACHE_TTL_SECONDS,
+        stale_seconds: int = RECIPE_CACHE_STALE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.shared_tier = shared_tier
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.clock = clock
+
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'sharedHits': 0,
+            'staleHits': 0,
+            'staleServed': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'evictions': 0,
+            'errors': 0,
+        }
+
+    def _age_state(self, fetched_at: float) -> str:
+        age = self.clock() - fetched_at
+        if age < self.ttl_seconds:
+            return 'fresh'
+        if age < self.ttl_seconds + self.stale_seconds:
+            return 'stale'
+        return 'expired'
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return (value, state) without calling the loader; state is fresh, stale or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            state = self._age_state(entry[1])
+            if state != 'expired':
+                self._count('hits' if state == 'fresh' else 'staleHits')
+                return entry[0], state
+
+        if self.shared_tier is not None:
+            try:
+                shared = self.shared_tier.get(key)
+            except Exception as e:
+                logger.warning(f"Recipe cache shared tier read failed for {key}: {e}")
+                self._count('errors')
+                shared = None
+
+            if shared is not None:
+                state = self._age_state(shared[1])
+                if state != 'expired':
+                    self._remember(key, shared)
+                    self._count('sharedHits' if state == 'fresh' else 'staleHits')
+                    return shared[0], state
+
+        self._count('misses')
+        return None, 'miss'
+
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh or stale cached value without fetching anything."""
+        value, _ = self._lookup(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a value in both tiers."""
+        entry = (value, self.clock())
+        self._remember(key, entry)
+
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.put(key, value, entry[1])
+            except Exception as e:
+                logger.warning(f"Recipe cache shared tier write failed for {key}: {e}")
+                self._count('errors')
+
+    def get(self, key: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached value for key, calling loader on a miss.
+
+        Stale values are refreshed with loader before returning; the stale
+        value is returned only when that refresh fails. Loader exceptions on
+        a miss propagate to the caller.
+        """
+        value, state = self._lookup(key)
+        if state == 'fresh':
+            return value
+
+        try:
+            fresh = loader()
+        except Exception as e:
+            if state != 'stale':
+                raise
+            logger.warning(f"Recipe cache refresh failed for {key}, serving stale entry: {e}")
+            self._count('errors')
+            self._count('staleServed')
+            return value
+
+        self.put(key, fresh)
+        if state == 'stale':
+            self._count('refreshes')
+        return fresh
+
+    def get_many(self, keys: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], list]:
+        """Look up several keys at once.
+
+        Returns (found, missing) where found maps key to value for fresh and
+        stale entries, and missing lists keys that need fetching. Stale keys
+        are also listed in missing so the caller refreshes them in its batch.
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value, state = self._lookup(key)
+            if value is not None:
+                found[key] = value
+            if state != 'fresh':
+                missing.append(key)
+        return found, missing
+
+    def values(self) -> List[Dict[str, Any]]:
+        """Recipes currently held in process, least recently used first."""
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current in-process size."""
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop in-process entries (the shared tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+
+
+_recipe_cache = None
+
+
+def get_recipe_cache() -> RecipeCache:
+    """Get the process-wide recipe cache, creating it on first use."""
+    global _recipe_cache
+
+    if _recipe_cache is None:
+        shared_tier = None
+        try:
+            if RECIPE_CACHE_TABLE:
+                shared_tier = DynamoRecipeTier(
+                    RECIPE_CACHE_TABLE,
+                    expire_after=RECIPE_CACHE_TTL_SECONDS + RECIPE_CACHE_STALE_SECONDS,
+                )
+            elif RECIPE_CACHE_DIR:
+                shared_tier = FileRecipeTier(RECIPE_CACHE_DIR)
+        except Exception as e:
+            logger.warning(f"Recipe cache shared tier unavailable, using in-process only: {e}")
+
+        _recipe_cache = RecipeCache(shared_tier=shared_tier)
+
+    return _recipe_cache
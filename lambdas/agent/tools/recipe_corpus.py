@@ -0,0 +1,496 @@
+"""
+Local Recipe Corpus for HOH Meal Agent
+
+Households ask search_recipes for the same cuisine/diet/meal-type filters
+over and over, and every call used to go to Spoonacular's complexSearch.
+The corpus keeps a compact summary of every recipe already fetched (from
+search results and recipe details) with an inverted index per facet:
+
+    cuisine, diet, dish (dishTypes), free (verified intolerance-free),
+    term (title words), ingredient (ingredient name words),
+    item (whole normalized ingredient names, for pantry matching)
+
+plus numeric columns for readyInMinutes, healthScore and the compliance
+mask, so filtered searches are set intersections answered in well under
+a millisecond.
+
+On disk the corpus is one memory-mapped file (RECIPE_CORPUS_PATH):
+
+    header   magic, count and section offsets
+    records  concatenated UTF-8 JSON summaries, decoded only when returned
+    offsets  (count + 1) uint32 record boundaries
+    columns  uint32 ids, uint16 readyInMinutes, uint8 healthScore,
+             uint16 allergen/diet compliance mask (see compliance.py)
+    index    JSON {facet: {term: [doc, ...]}}
+
+Loading maps the file and reads only the offsets, columns and index.
+Recipes added after loading live in memory and are written back with the
+rest every RECIPE_CORPUS_SAVE_EVERY additions.
+"""
+
+import os
+import re
+import json
+import mmap
+import random
+import struct
+import logging
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+RECIPE_CORPUS_PATH = os.getenv('RECIPE_CORPUS_PATH', '/tmp/hoh-recipe-corpus.bin')
+RECIPE_CORPUS_SAVE_EVERY = int(os.getenv('RECIPE_CORPUS_SAVE_EVERY', '25'))
+# Random-sorted searches only run locally with this many times `number` matches,
+# so repeated pool fetches still see variety
+RECIPE_CORPUS_RANDOM_FACTOR = int(os.getenv('RECIPE_CORPUS_RANDOM_FACTOR', '3'))
+
+MAGIC = b'HOHRC2\x00\x00'
+HEADER = struct.Struct('<8sIIIIII')
+
+FACETS = ('cuisine', 'diet', 'dish', 'free', 'term', 'ingredient', 'item')
+
+# Spoonacular diet labels (and DIET_MAP values) -> canonical diet terms
+DIET_ALIASES = {
+    'vegetarian': ['vegetarian'],
+    'lacto ovo vegetarian': ['vegetarian', 'lacto-vegetarian', 'ovo-vegetarian'],
+    'lacto-vegetarian': ['lacto-vegetarian'],
+    'ovo-vegetarian': ['ovo-vegetarian'],
+    'vegan': ['vegan', 'vegetarian', 'lacto-vegetarian', 'ovo-vegetarian'],
+    'gluten free': ['gluten free'],
+    'dairy free': ['dairy free'],
+    'ketogenic': ['ketogenic'],
+    'paleo': ['paleo'],
+    'paleolithic': ['paleo'],
+    'primal': ['primal'],
+    'whole30': ['whole30'],
+    'whole 30': ['whole30'],
+    'pescetarian': ['pescetarian'],
+    'pescatarian': ['pescetarian'],
+}
+
+# Recipe detail flags -> canonical diet terms
+DIET_FLAGS = {
+    'vegetarian': 'vegetarian',
+    'vegan': 'vegan',
+    'glutenFree': 'gluten free',
+    'dairyFree': 'dairy free',
+}
+
+# Diets that also verify an intolerance
+DIET_FREE_OF = {
+    'gluten free': ['gluten', 'wheat'],
+    'dairy free': ['dairy'],
+    'vegan': ['dairy', 'egg', 'eggs'],
+}
+
+SUMMARY_FIELDS = ('id', 'title', 'image', 'readyInMinutes', 'servings', 'sourceUrl', 'cuisines', 'dishTypes', 'diets')
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+
+def normalize_ingredient(name: str) -> str:
+    """Lowercase an ingredient name and crudely singularize each word ("Cherry Tomatoes" -> "cherry tomato")."""
+    words = []
+    for word in tokenize(name):
+        if len(word) > 4 and word.endswith(('oes', 'ies')):
+            word = word[:-3] + ('o' if word.endswith('oes') else 'y')
+        elif len(word) > 4 and word.endswith(('ches', 'shes', 'xes')):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us')):
+            word = word[:-1]
+        words.append(word)
+    return ' '.join(words)
+
+
+# Ingredients Spoonacular treats as "typical pantry items" for ignorePantry
+PANTRY_STAPLES = frozenset(normalize_ingredient(name) for name in (
+    'water', 'ice', 'salt', 'kosher salt', 'sea salt', 'table salt', 'pepper', 'black pepper',
+    'salt and pepper', 'oil', 'olive oil', 'vegetable oil', 'canola oil', 'cooking oil',
+    'cooking spray', 'sugar', 'granulated sugar', 'flour', 'all purpose flour', 'butter',
+    'baking soda', 'baking powder',
+))
+
+# Size, freshness and prep words that do not make a different product ("2 large onions, chopped")
+PANTRY_QUALIFIERS = frozenset({
+    'fresh', 'large', 'medium', 'small', 'whole', 'raw', 'ripe', 'organic', 'boneless', 'skinless',
+    'chopped', 'diced', 'minced', 'sliced', 'grated', 'shredded', 'peeled', 'trimmed', 'halved',
+})
+
+# Other names of the same pantry item (singularized, qualifiers removed) -> canonical name
+PANTRY_ALIASES = {
+    'scallion': 'green onion',
+    'spring onion': 'green onion',
+    'garbanzo bean': 'chickpea',
+    'courgette': 'zucchini',
+    'aubergine': 'eggplant',
+    'all purpose flour': 'flour',
+    'plain flour': 'flour',
+    'granulated sugar': 'sugar',
+    'white sugar': 'sugar',
+    'confectioner sugar': 'powdered sugar',
+    'icing sugar': 'powdered sugar',
+    'kosher salt': 'salt',
+    'sea salt': 'salt',
+    'table salt': 'salt',
+    'extra virgin olive oil': 'olive oil',
+}
+
+
+def pantry_name(name: str) -> str:
+    """Canonical name a pantry item and a recipe ingredient are compared by.
+
+    Matching is exact on this name: "chicken" does not cover chicken broth,
+    nor "garlic powder" garlic. Only qualifiers and listed aliases are folded.
+    """
+    words = [word for word in normalize_ingredient(name).split() if word not in PANTRY_QUALIFIERS]
+    key = ' '.join(words)
+    return PANTRY_ALIASES.get(key, key)
+
+
+def _array(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def _norm(value: str) -> str:
+    return re.sub(r'\s+', ' ', (value or '').strip().lower())
+
+
+class RecipeCorpus:
+    """Searchable store of fetched recipe summaries with per-facet inverted indexes."""
+
+    def __init__(self, path: Optional[str] = None, save_every: int = RECIPE_CORPUS_SAVE_EVERY):
+        self.path = path
+        self.save_every = save_every
+        self._lock = threading.RLock()
+        self._reset()
+
+        if path and os.path.exists(path):
+            try:
+                self._load(path)
+            except Exception as e:
+                logger.warning(f"Recipe corpus at {path} unreadable, starting empty: {e}")
+                self._reset()
+
+    def _reset(self) -> None:
+        self._mmap: Optional[mmap.mmap] = None
+        self._offsets = array('I')
+        self._records: List[Optional[Dict[str, Any]]] = []  # None = record is in the mapped file
+        self._ids = array('I')
+        self._ready = array('H')
+        self._health = array('B')
+        self._compliance = array('H')
+        self._index: Dict[str, Dict[str, Set[int]]] = {facet: {} for facet in FACETS}
+        self._by_id: Dict[int, int] = {}
+        self._dead: Set[int] = set()
+        self._unsaved = 0
+        # Bumped on every change so derived structures (pantry bitsets) can rebuild
+        self.version = 0
+
+    def _load(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, records_off, offsets_off, columns_off, index_off, index_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError('bad magic')
+
+        offsets = _array('I', self._mmap[offsets_off:offsets_off + 4 * (count + 1)])
+        self._offsets = array('I', (records_off + o for o in offsets))
+        pos = columns_off
+        self._ids = _array('I', self._mmap[pos:pos + 4 * count])
+        pos += 4 * count
+        self._ready = _array('H', self._mmap[pos:pos + 2 * count])
+        pos += 2 * count
+        self._health = _array('B', self._mmap[pos:pos + count])
+        pos += count
+        self._compliance = _array('H', self._mmap[pos:pos + 2 * count])
+
+        index = json.loads(self._mmap[index_off:index_off + index_len].decode('utf-8'))
+        for facet, postings in index.items():
+            self._index[facet] = {term: set(docs) for term, docs in postings.items()}
+
+        self._records = [None] * count
+        self._by_id = {recipe_id: doc for doc, recipe_id in enumerate(self._ids)}
+        logger.info(f"Loaded recipe corpus with {count} recipes from {path}")
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the live corpus to disk atomically in the mapped format."""
+        path = path or self.path
+        if not path:
+            return
+
+        with self._lock:
+            live = [doc for doc in range(len(self._ids)) if doc not in self._dead]
+            renumber = {doc: i for i, doc in enumerate(live)}
+
+            blobs = [json.dumps(self.record(doc), separators=(',', ':')).encode('utf-8') for doc in live]
+            offsets = array('I', [0])
+            for blob in blobs:
+                offsets.append(offsets[-1] + len(blob))
+
+            index = {
+                facet: {
+                    term: sorted(renumber[d] for d in docs if d in renumber)
+                    for term, docs in postings.items()
+                }
+                for facet, postings in self._index.items()
+            }
+            index_blob = json.dumps(index, separators=(',', ':')).encode('utf-8')
+
+            ids = array('I', (self._ids[d] for d in live))
+            ready = array('H', (self._ready[d] for d in live))
+            health = array('B', (self._health[d] for d in live))
+            compliance = array('H', (self._compliance[d] for d in live))
+            self._unsaved = 0
+
+        records_off = HEADER.size
+        offsets_off = records_off + offsets[-1]
+        columns_off = offsets_off + 4 * len(offsets)
+        index_off = columns_off + 9 * len(live)
+
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(live), records_off, offsets_off, columns_off, index_off, len(index_blob)))
+            for blob in blobs:
+                f.write(blob)
+            f.write(offsets.tobytes())
+            f.write(ids.tobytes())
+            f.write(ready.tobytes())
+            f.write(health.tobytes())
+            f.write(compliance.tobytes())
+            f.write(index_blob)
+        os.replace(tmp_path, path)
+
+    def record(self, doc: int) -> Dict[str, Any]:
+        """Summary record for a document number."""
+        record = self._records[doc]
+        if record is None:
+            start, end = self._offsets[doc], self._offsets[doc + 1]
+            record = json.loads(self._mmap[start:end].decode('utf-8'))
+        return record
+
+    def _postings(self, facet: str, term: str) -> Set[int]:
+        return self._index[facet].get(term, set())
+
+    def _add_terms(self, doc: int, facet: str, terms: Iterable[str]) -> None:
+        postings = self._index[facet]
+        for term in terms:
+            if term:
+                postings.setdefault(term, set()).add(doc)
+
+    def add(self, recipe: Dict[str, Any], free_of: Iterable[str] = ()) -> None:
+        """Add or update a recipe from search results or normalized recipe details.
+
+        Args:
+            recipe: Spoonacular search result or normalized recipe details
+            free_of: Intolerances Spoonacular already filtered this recipe for
+        """
+        if not recipe.get('id') or not recipe.get('title'):
+            return
+        recipe_id = int(recipe['id'])
+
+        diets = set()
+        for label in recipe.get('diets', []):
+            diets.update(DIET_ALIASES.get(_norm(label), [_norm(label)]))
+        for flag, diet in DIET_FLAGS.items():
+            if recipe.get('dietary', {}).get(flag):
+                diets.update(DIET_ALIASES[diet])
+
+        free = {_norm(i) for i in free_of}
+
+        ingredient_words = set()
+        items = set()
+        for ingredient in recipe.get('ingredients', []):
+            ingredient_words.update(tokenize(ingredient.get('name', '')))
+            item = normalize_ingredient(ingredient.get('name', ''))
+            if item:
+                items.add(item)
+
+        with self._lock:
+            previous = self._by_id.get(recipe_id)
+            summary = {k: recipe.get(k) for k in SUMMARY_FIELDS if recipe.get(k) is not None}
+            if previous is not None:
+                # Keep what the earlier record knew (e.g. search-verified intolerances)
+                old = self.record(previous)
+                old_diets = set(old.get('diets', []))
+                old_free = {term for term, docs in self._index['free'].items() if previous in docs}
+                if not ingredient_words and diets <= old_diets and free <= old_free:
+                    return
+                summary = {**old, **summary}
+                diets |= old_diets
+                free |= old_free
+                ingredient_words |= {term for term, docs in self._index['ingredient'].items() if previous in docs}
+                items |= {term for term, docs in self._index['item'].items() if previous in docs}
+                self._dead.add(previous)
+
+            summary['diets'] = sorted(diets)
+            for diet in diets:
+                free.update(DIET_FREE_OF.get(diet, []))
+
+            doc = len(self._ids)
+            self._records.append(summary)
+            self._ids.append(recipe_id)
+            health = recipe.get('healthScore')
+            if health is None and previous is not None:
+                health = self._health[previous]
+            # Only recipe details (full ingredient lists) carry a compliance mask
+            compliance = recipe.get('compliance')
+            if compliance is None and previous is not None:
+                compliance = self._compliance[previous]
+            self._ready.append(min(int(summary.get('readyInMinutes') or 0), 0xFFFF))
+            self._health.append(min(int(health or 0), 0xFF))
+            self._compliance.append(int(compliance or 0))
+            self._by_id[recipe_id] = doc
+
+            self._add_terms(doc, 'cuisine', (_norm(c) for c in summary.get('cuisines', [])))
+            self._add_terms(doc, 'dish', (_norm(d) for d in summary.get('dishTypes', [])))
+            self._add_terms(doc, 'diet', diets)
+            self._add_terms(doc, 'free', free)
+            self._add_terms(doc, 'term', tokenize(summary['title']))
+            self._add_terms(doc, 'ingredient', ingredient_words)
+            self._add_terms(doc, 'item', items)
+            self.version += 1
+
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.save_every
+
+        if should_save:
+            try:
+                self.save()
+            except Exception as e:
+                logger.warning(f"Failed to save recipe corpus: {e}")
+
+    def add_many(self, recipes: Iterable[Dict[str, Any]], free_of: Iterable[str] = ()) -> None:
+        free_of = list(free_of)
+        for recipe in recipes:
+            self.add(recipe, free_of)
+
+    def search(
+        self,
+        query: str = '',
+        cuisine: Optional[str] = None,
+        diet: Optional[str] = None,
+        intolerances: Optional[str] = None,
+        exclude_ingredients: Optional[str] = None,
+        meal_type: Optional[str] = None,
+        max_ready_time: Optional[int] = None,
+        sort: Optional[str] = None,
+    ) -> List[int]:
+        """Document numbers matching every filter (sorted as requested).
+
+        A recipe only matches a diet or intolerance when Spoonacular verified
+        it (diet labels, or it came back from a search filtered for that
+        intolerance). Compliance masks are heuristic, so they only remove
+        verified recipes whose ingredients contradict the filter.
+        """
+        from .compliance import forbidden_mask, is_compliant
+
+        with self._lock:
+            sets: List[Set[int]] = []
+            forbidden = 0
+            if cuisine:
+                sets.append(set().union(*(self._postings('cuisine', _norm(c)) for c in cuisine.split(','))))
+            for term in (diet or '').split(','):
+                if term.strip():
+                    sets.append(self._postings('diet', _norm(term)))
+                    forbidden |= forbidden_mask(restrictions=[term])
+            if meal_type:
+                sets.append(self._postings('dish', _norm(meal_type)))
+            for intolerance in (intolerances or '').split(','):
+                if intolerance.strip():
+                    sets.append(self._postings('free', _norm(intolerance)))
+                    forbidden |= forbidden_mask(allergies=[intolerance])
+            for word in tokenize(query):
+                sets.append(self._postings('term', word) | self._postings('ingredient', word))
+
+            if sets:
+                sets.sort(key=len)
+                docs = set(sets[0])
+                for other in sets[1:]:
+                    docs &= other
+                    if not docs:
+                        break
+            else:
+                docs = set(range(len(self._ids)))
+            docs -= self._dead
+            if forbidden:
+                docs = {d for d in docs if is_compliant(self._compliance[d], forbidden) is not False}
+
+            for word in tokenize(exclude_ingredients or ''):
+                docs -= self._postings('term', word)
+                docs -= self._postings('ingredient', word)
+
+            if max_ready_time:
+                docs = {d for d in docs if 0 < self._ready[d] <= max_ready_time}
+
+            if sort == 'random':
+                result = list(docs)
+                random.shuffle(result)
+            elif sort == 'healthiness':
+                result = sorted(docs, key=lambda d: -self._health[d])
+            elif sort == 'time':
+                result = sorted(docs, key=lambda d: self._ready[d] or 0xFFFF)
+            else:
+                result = sorted(docs)
+            return result
+
+    def records(self, docs: Iterable[int]) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = []
+            for doc in docs:
+                record = dict(self.record(doc), healthScore=self._health[doc])
+                if self._compliance[doc]:
+                    record['compliance'] = self._compliance[doc]
+                records.append(record)
+            return records
+
+    def compliance(self, recipe_id: int) -> int:
+        """Compliance mask for a recipe ID (0 when unknown)."""
+        with self._lock:
+            doc = self._by_id.get(int(recipe_id))
+            return self._compliance[doc] if doc is not None else 0
+
+    def verified(self, recipe_id: int, term: str) -> bool:
+        """Whether Spoonacular verified a recipe for a diet or intolerance."""
+        with self._lock:
+            doc = self._by_id.get(int(recipe_id))
+            if doc is None:
+                return False
+            term = _norm(term)
+            return doc in self._postings('diet', term) or doc in self._postings('free', term)
+
+    def item_postings(self) -> Dict[str, Set[int]]:
+        """Whole-ingredient postings (normalized name -> docs), live docs only."""
+        with self._lock:
+            return {item: docs - self._dead for item, docs in self._index['item'].items()}
+
+    def doc_count(self) -> int:
+        """Number of document slots, including superseded ones."""
+        with self._lock:
+            return len(self._ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids) - len(self._dead)
+
+
+_recipe_corpus: Optional[RecipeCorpus] = None
+_recipe_corpus_lock = threading.Lock()
+
+
+def get_recipe_corpus() -> RecipeCorpus:
+    """Get the process-wide recipe corpus, loading it from disk on first use."""
+    global _recipe_corpus
+
+    if _recipe_corpus is None:
+        with _recipe_corpus_lock:
+            if _recipe_corpus is None:
+                _recipe_corpus = RecipeCorpus(path=RECIPE_CORPUS_PATH or None)
+    return _recipe_corpus
@@ -0,0 +1,298 @@
+"""
+Shopping List Builder for HOH Meal Agent
+
+Builds the grocery list for a saved weekly plan without the model summing
+ingredients in tokens:
+
+1. Load the plan (PLAN#<startDate>) and bulk-load every planned recipe
+   through the recipe cache.
+2. Scale each recipe's ingredients from its servings to the household size.
+3. Normalize ingredient names and units - volumes to millilitres, weights
+   to grams, everything else counted by its own unit - and sum them.
+4. Drop what the household already has (pantry items and, unless asked
+   for, typical staples like salt and oil).
+5. Group by store aisle and persist the list as the household's
+   LIST#<startDate> item.
+"""
+
+import math
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .tool_specs import tool
+
+from .compliance import ingredient_mask, DAIRY, EGG, MEAT, FISH, SHELLFISH
+from .dynamo_tools import dynamodb, MEAL_PLANS_TABLE, _get_household, load_plan
+from .recipe_corpus import PANTRY_STAPLES, normalize_ingredient, pantry_name
+from .spoonacular_tools import get_recipe_details_bulk
+
+logger = logging.getLogger()
+
+# US cup in millilitres; the other US volumes are exact fractions of it
+CUP_ML = 236.588
+
+# Unit name -> millilitres
+VOLUME_UNITS = {
+    'ml': 1.0, 'milliliter': 1.0, 'millilitre': 1.0,
+    'l': 1000.0, 'liter': 1000.0, 'litre': 1000.0,
+    'tsp': CUP_ML / 48, 'teaspoon': CUP_ML / 48,
+    'tbsp': CUP_ML / 16, 'tbs': CUP_ML / 16, 'tablespoon': CUP_ML / 16,
+    'cup': CUP_ML, 'c': CUP_ML,
+    'fl oz': CUP_ML / 8, 'fluid ounce': CUP_ML / 8,
+    'pint': CUP_ML * 2, 'pt': CUP_ML * 2,
+    'quart': CUP_ML * 4, 'qt': CUP_ML * 4,
+    'gallon': CUP_ML * 16, 'gal': CUP_ML * 16,
+}
+
+# Unit name -> grams
+WEIGHT_UNITS = {
+    'g': 1.0, 'gr': 1.0, 'gram': 1.0, 'gramme': 1.0,
+    'kg': 1000.0, 'kilogram': 1000.0,
+    'mg': 0.001, 'milligram': 0.001,
+    'oz': 28.3495, 'ounce': 28.3495,
+    'lb': 453.592, 'pound': 453.592,
+}
+
+# Fallback aisles (Spoonacular aisle names) for ingredients cached without one
+PRODUCE_WORDS = {
+    'onion', 'garlic', 'shallot', 'scallion', 'tomato', 'potato', 'carrot', 'celery', 'lettuce',
+    'spinach', 'kale', 'cabbage', 'broccoli', 'cauliflower', 'zucchini', 'cucumber', 'mushroom',
+    'avocado', 'lemon', 'lime', 'orange', 'apple', 'banana', 'berry', 'strawberry', 'blueberry',
+    'ginger', 'cilantro', 'parsley', 'basil', 'mint', 'jalapeno', 'squash', 'corn', 'pea',
+}
+FALLBACK_AISLE = 'Other'
+
+LIST_TTL_SECONDS = 90 * 24 * 60 * 60
+
+
+def _unit_key(unit: str) -> str:
+    unit = ' '.join((unit or '').lower().replace('.', '').split())
+    if unit.endswith('es') and unit[:-2] in VOLUME_UNITS:
+        return unit[:-2]
+    if unit.endswith('s') and (unit[:-1] in VOLUME_UNITS or unit[:-1] in WEIGHT_UNITS):
+        return unit[:-1]
+    return unit
+
+
+def normalize_quantity(amount: float, unit: str) -> Tuple[float, str]:
+    """Convert an amount to a summable (quantity, dimension) pair.
+
+    Volumes become ('ml'), weights ('g'); anything else keeps its own
+    singularized unit ("2 cloves" -> (2, 'clove'), "3" -> (3, '')).
+    """
+    key = _unit_key(unit)
+    if key in VOLUME_UNITS:
+        return amount * VOLUME_UNITS[key], 'ml'
+    if key in WEIGHT_UNITS:
+        return amount * WEIGHT_UNITS[key], 'g'
+    return amount, normalize_ingredient(key)
+
+
+def _round_up(value: float, step: float) -> float:
+    return math.ceil(round(value / step, 3)) * step
+
+
+def display_quantity(quantity: float, dimension: str) -> Tuple[float, str]:
+    """Shopping-friendly (amount, unit) rounded up: US cups/tbsp/tsp, oz/lb, whole counts."""
+    if dimension == 'ml':
+        for unit in ('cup', 'tbsp'):
+            if quantity >= VOLUME_UNITS[unit] * (0.25 if unit == 'cup' else 1):
+                return _round_up(quantity / VOLUME_UNITS[unit], 0.25), unit
+        return _round_up(quantity / VOLUME_UNITS['tsp'], 0.25), 'tsp'
+    if dimension == 'g':
+        if quantity >= WEIGHT_UNITS['lb']:
+            return _round_up(quantity / WEIGHT_UNITS['lb'], 0.25), 'lb'
+        return _round_up(quantity / WEIGHT_UNITS['oz'], 0.25), 'oz'
+    return float(max(1, math.ceil(round(quantity, 3)))), dimension
+
+
+def _aisle_of(ingredient: Dict[str, Any], name: str) -> str:
+    aisle = (ingredient.get('aisle') or '').split(';')[0].strip()
+    if aisle and aisle != '?':
+        return aisle
+
+    mask = ingredient_mask(name)
+    if mask & MEAT:
+        return 'Meat'
+    if mask & (FISH | SHELLFISH):
+        return 'Seafood'
+    if mask & (DAIRY | EGG):
+        return 'Milk, Eggs, Other Dairy'
+    if set(name.split()) & PRODUCE_WORDS:
+        return 'Produce'
+    return FALLBACK_AISLE
+
+
+def aggregate_ingredients(
+    recipes: Iterable[Dict[str, Any]],
+    household_size: int,
+    pantry: Iterable[str] = (),
+    include_staples: bool = False,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Sum the ingredients of planned recipes into shopping list items.
+
+    Args:
+        recipes: Normalized recipe details, one entry per planned meal
+        household_size: People eating each meal (recipes are scaled to it)
+        pantry: Ingredient names the household already has
+        include_staples: Keep salt, oil, flour and other staples on the list
+
+    Returns:
+        (items, from_pantry): items sorted by aisle then name, each with
+        ingredient, quantity, unit, category, checked and recipes; and the
+        ingredient names left off because the household has them
+    """
+    have = {pantry_name(name) for name in pantry} - {''}
+
+    totals: Dict[Tuple[str, str], Dict[str, Any]] = OrderedDict()
+    from_pantry = set()
+
+    for recipe in recipes:
+        servings = recipe.get('servings') or household_size
+        scale = household_size / servings
+
+        for ingredient in recipe.get('ingredients', []):
+            name = normalize_ingredient(ingredient.get('name', ''))
+            if not name:
+                continue
+            if (not include_staples and name in PANTRY_STAPLES) or pantry_name(name) in have:
+                from_pantry.add(name)
+                continue
+
+            quantity, dimension = normalize_quantity(float(ingredient.get('amount') or 0), ingredient.get('unit', ''))
+            total = totals.setdefault((name, dimension), {
+                'quantity': 0.0,
+                'category': _aisle_of(ingredient, name),
+                'recipes': [],
+            })
+            total['quantity'] += quantity * scale
+            if recipe.get('title') and recipe['title'] not in total['recipes']:
+                total['recipes'].append(recipe['title'])
+
+    items = []
+    for (name, dimension), total in totals.items():
+        quantity, unit = display_quantity(total['quantity'], dimension)
+        items.append({
+            'ingredient': name,
+            'quantity': quantity,
+            'unit': unit,
+            'category': total['category'],
+            'checked': False,
+            'recipes': total['recipes'],
+        })
+
+    items.sort(key=lambda item: (item['category'] == FALLBACK_AISLE, item['category'], item['ingredient']))
+    return items, sorted(from_pantry)
+
+
+def group_by_aisle(items: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Items keyed by category, keeping the list order."""
+    aisles: Dict[str, List[Dict[str, Any]]] = OrderedDict()
+    for item in items:
+        aisles.setdefault(item['category'], []).append(item)
+    return aisles
+
+
+def _planned_recipe_ids(meals: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Recipe IDs per planned meal (repeats kept), and names of meals without a recipe."""
+    recipe_ids = []
+    skipped = []
+    for meal in meals:
+        recipe_id = str(meal.get('recipeId', ''))
+        if meal.get('isUserMeal') or not recipe_id.isdigit():
+            skipped.append(meal.get('recipeName') or recipe_id)
+            continue
+        recipe_ids.append(recipe_id)
+    return recipe_ids, skipped
+
+
+def _decimal_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # DynamoDB numbers must be Decimal
+    return [dict(item, quantity=Decimal(str(item['quantity']))) for item in items]
+
+
+@tool
+def generate_shopping_list(
+    household_id: str,
+    start_date: str,
+    pantry_items: Optional[list] = None,
+    include_staples: bool = False,
+) -> dict:
+    """Build and save the grocery list for a saved weekly meal plan.
+
+    Use this tool when the family asks for a shopping or grocery list. It
+    sums every planned recipe's ingredients, scaled to the household size,
+    so you never need to read recipe details and add up quantities yourself.
+
+    Args:
+        household_id: The unique identifier for the household
+        start_date: The start date of the plan's week in YYYY-MM-DD format
+        pantry_items: Ingredients the family already has, to leave off the list
+        include_staples: Also list staples like salt, pepper, oil and flour
+
+    Returns:
+        A dictionary containing:
+        - aisles: Items grouped by store aisle, each with ingredient, quantity, unit and recipes
+        - fromPantry: Ingredients left off because the family has them
+        - skippedMeals: Planned meals without a recipe (e.g. the family's own typical meals)
+    """
+    try:
+        plan = load_plan(household_id, start_date)
+        if not plan:
+            return {
+                'status': 'not_found',
+                'message': f'No meal plan found for week starting {start_date}'
+            }
+
+        household = _get_household(household_id)
+        household_size = max(1, len(household['members']))
+        pantry = list(pantry_items or []) + list(household['preferences'].get('pantryItems', []))
+
+        recipe_ids, skipped = _planned_recipe_ids(plan.get('meals', []))
+        details = get_recipe_details_bulk(list(dict.fromkeys(recipe_ids))) if recipe_ids else {'recipes': []}
+        if details.get('status') == 'error':
+            return details
+        by_id = {str(recipe['id']): recipe for recipe in details.get('recipes', [])}
+
+        items, from_pantry = aggregate_ingredients(
+            (by_id[recipe_id] for recipe_id in recipe_ids if recipe_id in by_id),
+            household_size,
+            pantry,
+            include_staples,
+        )
+        not_found = sorted({recipe_id for recipe_id in recipe_ids if recipe_id not in by_id})
+
+        now = datetime.utcnow()
+        dynamodb.Table(MEAL_PLANS_TABLE).put_item(Item={
+            'PK': f'HOUSEHOLD#{household_id}',
+            'SK': f'LIST#{start_date}',
+            'planId': start_date,
+            'startDate': start_date,
+            'householdSize': household_size,
+            'items': _decimal_items(items),
+            'fromPantry': from_pantry,
+            'generatedAt': now.isoformat(),
+            'ttl': int(now.timestamp()) + LIST_TTL_SECONDS,
+        })
+        logger.info(f"Saved shopping list for {household_id} {start_date}: {len(items)} items")
+
+        return {
+            'status': 'success',
+            'householdId': household_id,
+            'startDate': start_date,
+            'householdSize': household_size,
+            'itemCount': len(items),
+            'aisles': group_by_aisle(items),
+            'fromPantry': from_pantry,
+            'skippedMeals': skipped,
+            'notFound': not_found,
+        }
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
@@ -8,11 +8,16 @@ and generate meal plans using the Spoonacular API.
 import os
 import json
 import httpx
-import boto3
-from strands import tool
+from .tool_specs import tool
 from typing import Optional
 
-SPOONACULAR_BASE_URL = 'https://api.spoonacular.com'
+from .http_client import spoonacular_get
+from .rate_limiter import SpoonacularRateLimited
+from .recipe_cache import get_recipe_cache, is_recipe_key
+from .recipe_corpus import get_recipe_corpus, normalize_ingredient, RECIPE_CORPUS_RANDOM_FACTOR
+from .compliance import recipe_mask, contains, forbidden_mask, is_compliant
+
+RECIPE_CORPUS_ENABLED = os.getenv('RECIPE_CORPUS_ENABLED', 'true').lower() == 'true'
 
 # Cache API key to avoid repeated Secrets Manager calls
 _cached_api_key = None
@@ -29,6 +34,8 @@ def _get_api_key() -> str:
     region = os.getenv('AWS_REGION', 'us-east-1')
 
     try:
+        import boto3
+
         client = boto3.client('secretsmanager', region_name=region)
         response = client.get_secret_value(SecretId=secret_name)
         secret = json.loads(response['SecretString'])
@@ -60,13 +67,133 @@ DIET_MAP = {
 }
 
 
-def _map_diet(restrictions: list) -> Optional[str]:
-    """Convert dietary restrictions to Spoonacular diet parameter."""
+# Diet/intolerance names that can be checked against cached recipe flags
+LOCAL_DIET_FLAGS = {
+    'vegetarian': 'vegetarian',
+    'vegan': 'vegan',
+    'gluten free': 'glutenFree',
+    'gluten': 'glutenFree',
+    'dairy free': 'dairyFree',
+    'dairy': 'dairyFree',
+}
+
+
+def _local_recipes(
+    words: Optional[list] = None,
+    diets: Optional[list] = None,
+    max_ready_time: Optional[int] = None,
+    ingredients: Optional[list] = None,
+    number: int = 10,
+    cuisine: Optional[str] = None,
+    meal_type: Optional[str] = None,
+    tags: Optional[list] = None,
+    exclude_ingredients: Optional[str] = None,
+) -> list:
+    """Recipes already held in the recipe cache that match, newest first.
+
+    Used to answer while Spoonacular is rate limited, with the filters the
+    API call would have applied. A diet or intolerance only matches recipes
+    Spoonacular verified for it (the cached dietary flags, or the corpus);
+    the compliance mask can only reject. cuisine (comma = any of them) and
+    meal_type match the cached cuisines and dishTypes; every tag must match
+    one of them.
+    """
+    flags = []
+    unflagged = []
+    forbidden = 0
+    for diet in diets or []:
+        if not diet.strip():
+            continue
+        forbidden |= forbidden_mask([diet], [diet])
+        flag = LOCAL_DIET_FLAGS.get(diet.strip().lower())
+        if flag is not None:
+            flags.append(flag)
+        else:
+            unflagged.append(diet)
+    corpus = get_recipe_corpus() if unflagged else None
+
+    words = [w.lower() for w in words or [] if w]
+    ingredients = [i.strip().lower() for i in ingredients or [] if i.strip()]
+    cuisines = {c.strip().lower() for c in (cuisine or '').split(',') if c.strip()}
+    tags = [t.strip().lower() for t in tags or [] if t.strip()]
+    if meal_type and meal_type.strip():
+        tags.append(meal_type.strip().lower())
+    excluded = set(normalize_ingredient(exclude_ingredients or '').split())
+
+    matches = []
+    for recipe in reversed(get_recipe_cache().values()):
+        title = recipe.get('title', '').lower()
+        if words and not any(word in title for word in words):
+            continue
+        if any(not recipe.get('dietary', {}).get(flag) for flag in flags):
+            continue
+        if any(not corpus.verified(recipe['id'], diet) for diet in unflagged):
+            continue
+        if forbidden:
+            compliance = recipe.get('compliance') or recipe_mask(recipe.get('ingredients', []))
+            if is_compliant(compliance, forbidden) is False:
+                continue
+        if max_ready_time and (recipe.get('readyInMinutes') or 0) > max_ready_time:
+            continue
+        if ingredients:
+            names = ' '.join(ing.get('name', '') for ing in recipe.get('ingredients', [])).lower()
+            if not any(ingredient in names for ingredient in ingredients):
+                continue
+        recipe_cuisines = {c.lower() for c in recipe.get('cuisines', [])}
+        if cuisines and not cuisines & recipe_cuisines:
+            continue
+        labels = recipe_cuisines | {d.lower() for d in recipe.get('dishTypes', [])}
+        if any(tag not in labels for tag in tags):
+            continue
+        if excluded:
+            text = ' '.join([recipe['title']] + [ing.get('name', '') for ing in recipe.get('ingredients', [])])
+            if excluded & set(normalize_ingredient(text).split()):
+                continue
+        matches.append({
+            'id': recipe['id'],
+            'title': recipe['title'],
+            'image': recipe.get('image', ''),
+            'readyInMinutes': recipe.get('readyInMinutes', 0),
+            'servings': recipe.get('servings', 0),
+            'sourceUrl': recipe.get('sourceUrl', ''),
+            'cuisines': recipe.get('cuisines', []),
+            'dishTypes': recipe.get('dishTypes', []),
+        })
+        if len(matches) >= number:
+            break
+    return matches
+
+
+def _rate_limited_result(e: SpoonacularRateLimited, recipes: Optional[list] = None) -> dict:
+    """Tool result while Spoonacular is rate limited: local recipes if any, else a no-retry error."""
+    if recipes:
+        return {
+            'status': 'success',
+            'degraded': True,
+            'note': f'{e.reason}; showing recently fetched recipes instead',
+            'resultsReturned': len(recipes),
+            'recipes': recipes,
+        }
+    return {
+        'status': 'error',
+        'retryable': False,
+        'error': f'{e.reason} - do not retry this call; use recipes you already have',
+    }
+
+
+def _map_diets(restrictions: list) -> list:
+    """Convert dietary restrictions to Spoonacular diets (unmappable ones are skipped)."""
+    diets = []
     for restriction in restrictions:
-        diet = DIET_MAP.get(restriction.lower())
-        if diet:
-            return diet
-    return None
+        diet = DIET_MAP.get(restriction.strip().lower())
+        if diet and diet not in diets:
+            diets.append(diet)
+    return diets
+
+
+def _map_diet(restrictions: list) -> Optional[str]:
+    """Convert dietary restrictions to Spoonacular's diet parameter (comma = all of them)."""
+    return ','.join(_map_diets(restrictions)) or None
 
 
 @tool
@@ -90,7 +217,7 @@ def search_recipes(
     Args:
         query: Search query for recipes (e.g., "pasta", "chicken dinner", "quick breakfast")
         cuisine: Cuisine type (e.g., "italian", "mexican", "asian", "mediterranean", "american", "indian")
-        diet: Dietary restriction (e.g., "vegetarian", "vegan", "gluten free", "ketogenic", "paleo")
+        diet: Dietary restriction (e.g., "vegetarian", "vegan", "gluten free", "ketogenic", "paleo"); comma-separate to require several
         intolerances: Comma-separated allergies to avoid (e.g., "dairy,gluten,peanut,shellfish")
         exclude_ingredients: Comma-separated ingredients to exclude (e.g., "mushrooms,olives")
         meal_type: Type of meal (e.g., "breakfast", "main course", "snack", "dessert", "soup", "salad")
@@ -104,13 +231,34 @@ def search_recipes(
         - results: List of recipe objects with id, title, image, readyInMinutes, servings
         - totalResults: Total number of matching recipes
     """
+    number = min(number, 100)
+    local_docs = []
     try:
+        # Answer from the local corpus when it has enough matches
+        if RECIPE_CORPUS_ENABLED:
+            corpus = get_recipe_corpus()
+            local_docs = corpus.search(
+                query, cuisine, diet, intolerances, exclude_ingredients, meal_type, max_ready_time, sort
+            )
+            needed = number * RECIPE_CORPUS_RANDOM_FACTOR if sort == 'random' else offset + number
+            if len(local_docs) >= needed:
+                window = local_docs[:number] if sort == 'random' else local_docs[offset:offset + number]
+                recipes = corpus.records(window)
+                return {
+                    'status': 'success',
+                    'query': query,
+                    'source': 'local',
+                    'totalResults': len(local_docs),
+                    'resultsReturned': len(recipes),
+                    'recipes': recipes
+                }
+
         api_key = _get_api_key()
 
         params = {
             'apiKey': api_key,
             'query': query,
-            'number': min(number, 100),
+            'number': number,
             'addRecipeInformation': 'true',
         }
 
@@ -132,14 +280,19 @@ def search_recipes(
             params['sort'] = sort
             params['sortDirection'] = 'desc'
 
-        with httpx.Client() as client:
-            response = client.get(
-                f'{SPOONACULAR_BASE_URL}/recipes/complexSearch',
-                params=params,
-                timeout=30.0
+        data = spoonacular_get('/recipes/complexSearch', params)
+
+        # Spoonacular applied the diet filter, so label results with it (a comma ANDs diets)
+        filtered_diets = [d.strip() for d in (diet or '').split(',') if d.strip()]
+        for recipe in data.get('results', []) if filtered_diets else []:
+            recipe['diets'] = list(dict.fromkeys(recipe.get('diets', []) + filtered_diets))
+
+        if RECIPE_CORPUS_ENABLED:
+            # Spoonacular applied the intolerance filter, so record it as verified
+            get_recipe_corpus().add_many(
+                data.get('results', []),
+                free_of=[i for i in (intolerances or '').split(',') if i.strip()],
             )
-            response.raise_for_status()
-            data = response.json()
 
         # Format results
         recipes = []
@@ -158,6 +311,14 @@ def search_recipes(
                 'diets': recipe.get('diets', []),
             })
 
+        if RECIPE_CORPUS_ENABLED:
+            # Attach compliance masks for recipes whose details were fetched before
+            corpus = get_recipe_corpus()
+            for recipe in recipes:
+                compliance = corpus.compliance(recipe['id'])
+                if compliance:
+                    recipe['compliance'] = compliance
+
         return {
             'status': 'success',
             'query': query,
@@ -166,6 +327,15 @@ def search_recipes(
             'recipes': recipes
         }
 
+    except SpoonacularRateLimited as e:
+        if local_docs:
+            return _rate_limited_result(e, get_recipe_corpus().records(local_docs[:number]))
+        diets = [d for d in (diet or '').split(',') if d.strip()]
+        diets += [i for i in (intolerances or '').split(',') if i.strip()]
+        return _rate_limited_result(e, _local_recipes(
+            words=query.split(), diets=diets, max_ready_time=max_ready_time, number=number,
+            cuisine=cuisine, meal_type=meal_type, exclude_ingredients=exclude_ingredients,
+        ))
     except httpx.HTTPStatusError as e:
         return {
             'status': 'error',
@@ -202,25 +372,35 @@ def search_recipes_by_ingredients(
         - usedIngredients: Ingredients from the list used in the recipe
         - missedIngredients: Additional ingredients needed
     """
+    number = min(number, 100)
+    pantry = [i.strip() for i in ingredients.split(',') if i.strip()]
+    local_matches = []
     try:
+        # Rank recipes already in the corpus before asking Spoonacular
+        if RECIPE_CORPUS_ENABLED:
+            from .pantry_matcher import get_pantry_matcher
+
+            local_matches = get_pantry_matcher().match(pantry, number, ranking, ignore_pantry)
+            if len(local_matches) >= number:
+                return {
+                    'status': 'success',
+                    'ingredients': ingredients,
+                    'source': 'local',
+                    'recipesFound': len(local_matches),
+                    'recipes': local_matches
+                }
+
         api_key = _get_api_key()
 
         params = {
             'apiKey': api_key,
             'ingredients': ingredients,
-            'number': min(number, 100),
+            'number': number,
             'ranking': ranking,
             'ignorePantry': str(ignore_pantry).lower(),
         }
 
-        with httpx.Client() as client:
-            response = client.get(
-                f'{SPOONACULAR_BASE_URL}/recipes/findByIngredients',
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = spoonacular_get('/recipes/findByIngredients', params)
 
         recipes = []
         for recipe in data:
@@ -234,6 +414,14 @@ def search_recipes_by_ingredients(
                 'missedIngredients': [i['name'] for i in recipe.get('missedIngredients', [])],
             })
 
+        if RECIPE_CORPUS_ENABLED:
+            get_recipe_corpus().add_many({
+                'id': recipe['id'],
+                'title': recipe['title'],
+                'image': recipe['image'],
+                'ingredients': [{'name': name} for name in recipe['usedIngredients'] + recipe['missedIngredients']],
+            } for recipe in recipes)
+
         return {
             'status': 'success',
             'ingredients': ingredients,
@@ -241,6 +429,10 @@ def search_recipes_by_ingredients(
             'recipes': recipes
         }
 
+    except SpoonacularRateLimited as e:
+        if local_matches:
+            return _rate_limited_result(e, local_matches)
+        return _rate_limited_result(e, _local_recipes(ingredients=pantry, number=number))
     except httpx.HTTPStatusError as e:
         return {
             'status': 'error',
@@ -253,6 +445,83 @@ def search_recipes_by_ingredients(
         }
 
 
+def _normalize_recipe_details(recipe: dict) -> dict:
+    """Convert a Spoonacular recipe information payload to the agent's recipe format."""
+    # Extract key nutrition info
+    nutrition = {}
+    if recipe.get('nutrition') and recipe['nutrition'].get('nutrients'):
+        for nutrient in recipe['nutrition']['nutrients']:
+            if nutrient['name'] in ['Calories', 'Protein', 'Carbohydrates', 'Fat']:
+                nutrition[nutrient['name'].lower()] = {
+                    'amount': nutrient['amount'],
+                    'unit': nutrient['unit']
+                }
+
+    # Format ingredients
+    ingredients = []
+    for ing in recipe.get('extendedIngredients', []):
+        ingredients.append({
+            'name': ing['name'],
+            'amount': ing['amount'],
+            'unit': ing['unit'],
+            'original': ing['original'],
+            'aisle': ing.get('aisle', ''),
+        })
+
+    # Format instructions
+    instructions = []
+    if recipe.get('analyzedInstructions'):
+        for instruction_set in recipe['analyzedInstructions']:
+            for step in instruction_set.get('steps', []):
+                instructions.append({
+                    'number': step['number'],
+                    'step': step['step']
+                })
+
+    # Precomputed allergen/diet mask so callers can filter without reading ingredients
+    compliance = recipe_mask(ingredients)
+
+    return {
+        'id': recipe['id'],
+        'title': recipe['title'],
+        'image': recipe.get('image', ''),
+        'sourceUrl': recipe.get('sourceUrl', ''),
+        'readyInMinutes': recipe.get('readyInMinutes', 0),
+        'servings': recipe.get('servings', 0),
+        'summary': recipe.get('summary', ''),
+        'ingredients': ingredients,
+        'instructions': instructions,
+        'nutrition': nutrition,
+        'dietary': {
+            'vegetarian': recipe.get('vegetarian', False),
+            'vegan': recipe.get('vegan', False),
+            'glutenFree': recipe.get('glutenFree', False),
+            'dairyFree': recipe.get('dairyFree', False),
+            'veryHealthy': recipe.get('veryHealthy', False),
+        },
+        'cuisines': recipe.get('cuisines', []),
+        'dishTypes': recipe.get('dishTypes', []),
+        'compliance': compliance,
+        'contains': contains(compliance),
+    }
+
+
+def _fetch_recipe_details(recipe_id: int) -> dict:
+    """Fetch and normalize one recipe from Spoonacular, bypassing the cache."""
+    api_key = _get_api_key()
+
+    params = {
+        'apiKey': api_key,
+        'includeNutrition': 'true',
+    }
+
+    recipe = _normalize_recipe_details(spoonacular_get(f'/recipes/{recipe_id}/information', params))
+
+    if RECIPE_CORPUS_ENABLED:
+        get_recipe_corpus().add(recipe)
+    return recipe
+
+
 @tool
 def get_recipe_details(recipe_id: int) -> dict:
     """Get detailed information about a specific recipe.
@@ -272,78 +541,120 @@ def get_recipe_details(recipe_id: int) -> dict:
         - step-by-step instructions
         - nutrition information
         - dietary information (vegetarian, vegan, gluten-free, etc.)
+        - contains: allergens and animal products found in the ingredients
     """
     try:
-        api_key = _get_api_key()
+        key = str(recipe_id).strip()
+        if not is_recipe_key(key):
+            return {
+                'status': 'error',
+                'error': f'Invalid recipe ID: {recipe_id}'
+            }
+
+        # Recipe details rarely change - serve repeats from the recipe cache
+        recipe = get_recipe_cache().get(key, lambda: _fetch_recipe_details(key))
 
+        return {
+            'status': 'success',
+            'recipe': recipe
+        }
+
+    except SpoonacularRateLimited as e:
+        return _rate_limited_result(e)
+    except httpx.HTTPStatusError as e:
+        return {
+            'status': 'error',
+            'error': f'Spoonacular API error: {e.response.status_code}'
+        }
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+# Maximum IDs per informationBulk request
+RECIPE_BULK_CHUNK_SIZE = int(os.getenv('RECIPE_BULK_CHUNK_SIZE', '50'))
+
+
+def _fetch_recipe_details_bulk(recipe_ids: list) -> dict:
+    """Fetch and normalize many recipes via informationBulk, bypassing the cache.
+
+    Returns a dictionary mapping recipe ID (as a string) to the normalized recipe.
+    """
+    api_key = _get_api_key()
+
+    recipes = {}
+    for i in range(0, len(recipe_ids), RECIPE_BULK_CHUNK_SIZE):
+        chunk = recipe_ids[i:i + RECIPE_BULK_CHUNK_SIZE]
         params = {
             'apiKey': api_key,
+            'ids': ','.join(str(recipe_id) for recipe_id in chunk),
             'includeNutrition': 'true',
         }
 
-        with httpx.Client() as client:
-            response = client.get(
-                f'{SPOONACULAR_BASE_URL}/recipes/{recipe_id}/information',
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            recipe = response.json()
-
-        # Extract key nutrition info
-        nutrition = {}
-        if recipe.get('nutrition') and recipe['nutrition'].get('nutrients'):
-            for nutrient in recipe['nutrition']['nutrients']:
-                if nutrient['name'] in ['Calories', 'Protein', 'Carbohydrates', 'Fat']:
-                    nutrition[nutrient['name'].lower()] = {
-                        'amount': nutrient['amount'],
-                        'unit': nutrient['unit']
-                    }
-
-        # Format ingredients
-        ingredients = []
-        for ing in recipe.get('extendedIngredients', []):
-            ingredients.append({
-                'name': ing['name'],
-                'amount': ing['amount'],
-                'unit': ing['unit'],
-                'original': ing['original']
-            })
+        data = spoonacular_get('/recipes/informationBulk', params)
 
-        # Format instructions
-        instructions = []
-        if recipe.get('analyzedInstructions'):
-            for instruction_set in recipe['analyzedInstructions']:
-                for step in instruction_set.get('steps', []):
-                    instructions.append({
-                        'number': step['number'],
-                        'step': step['step']
-                    })
+        for recipe in data:
+            recipes[str(recipe['id'])] = _normalize_recipe_details(recipe)
 
-        return {
+    if RECIPE_CORPUS_ENABLED:
+        get_recipe_corpus().add_many(recipes.values())
+    return recipes
+
+
+@tool
+def get_recipe_details_bulk(recipe_ids: list) -> dict:
+    """Get detailed information about many recipes in one call.
+
+    Use this tool instead of calling get_recipe_details repeatedly when you
+    need details for several recipes (e.g., every meal in a weekly plan).
+
+    Args:
+        recipe_ids: List of Spoonacular recipe IDs (e.g., [715538, 716429])
+
+    Returns:
+        A dictionary containing:
+        - recipes: List of recipe details, each in the same format as get_recipe_details
+        - notFound: Recipe IDs Spoonacular did not return (or that are not numeric IDs)
+    """
+    try:
+        # Deduplicate while keeping the caller's order
+        keys = list(dict.fromkeys(str(recipe_id).strip() for recipe_id in recipe_ids))
+        keys = [key for key in keys if key]
+
+        # Only numeric IDs reach the cache or the API; the rest are reported as not found
+        cache = get_recipe_cache()
+        found, missing = cache.get_many([key for key in keys if is_recipe_key(key)])
+
+        rate_limited = None
+        if missing:
+            try:
+                fetched = _fetch_recipe_details_bulk(missing)
+            except SpoonacularRateLimited as e:
+                # Return whatever the cache already had
+                rate_limited = e
+                fetched = {}
+            for key, recipe in fetched.items():
+                cache.put(key, recipe)
+            found.update(fetched)
+
+        recipes = [found[key] for key in keys if key in found]
+        not_found = [key for key in keys if key not in found]
+
+        if rate_limited and not recipes:
+            return _rate_limited_result(rate_limited)
+
+        result = {
             'status': 'success',
-            'recipe': {
-                'id': recipe['id'],
-                'title': recipe['title'],
-                'image': recipe.get('image', ''),
-                'sourceUrl': recipe.get('sourceUrl', ''),
-                'readyInMinutes': recipe.get('readyInMinutes', 0),
-                'servings': recipe.get('servings', 0),
-                'summary': recipe.get('summary', ''),
-                'ingredients': ingredients,
-                'instructions': instructions,
-                'nutrition': nutrition,
-                'dietary': {
-                    'vegetarian': recipe.get('vegetarian', False),
-                    'vegan': recipe.get('vegan', False),
-                    'glutenFree': recipe.get('glutenFree', False),
-                    'dairyFree': recipe.get('dairyFree', False),
-                    'veryHealthy': recipe.get('veryHealthy', False),
-                },
-                'cuisines': recipe.get('cuisines', []),
-                'dishTypes': recipe.get('dishTypes', []),
-            }
+            'recipesReturned': len(recipes),
+            'recipes': recipes,
+            'notFound': not_found,
         }
+        if rate_limited:
+            result['degraded'] = True
+            result['note'] = f'{rate_limited.reason}; notFound recipes were not fetched'
+        return result
 
     except httpx.HTTPStatusError as e:
         return {
@@ -395,14 +706,7 @@ def generate_meal_plan_from_api(
         if exclude:
             params['exclude'] = exclude
 
-        with httpx.Client() as client:
-            response = client.get(
-                f'{SPOONACULAR_BASE_URL}/mealplanner/generate',
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = spoonacular_get('/mealplanner/generate', params)
 
         if time_frame == 'day':
             meals = []
@@ -446,6 +750,8 @@ def generate_meal_plan_from_api(
                 'week': week_plan
             }
 
+    except SpoonacularRateLimited as e:
+        return _rate_limited_result(e)
     except httpx.HTTPStatusError as e:
         return {
             'status': 'error',
@@ -486,14 +792,7 @@ def get_random_recipes(
         if tags:
             params['tags'] = tags
 
-        with httpx.Client() as client:
-            response = client.get(
-                f'{SPOONACULAR_BASE_URL}/recipes/random',
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        data = spoonacular_get('/recipes/random', params)
 
         recipes = []
         for recipe in data.get('recipes', []):
@@ -515,6 +814,15 @@ def get_random_recipes(
             'recipes': recipes
         }
 
+    except SpoonacularRateLimited as e:
+        # Diet tags are checked against the dietary flags, the rest against cuisines and dish types
+        tag_list = [t for t in (tags or '').split(',') if t.strip()]
+        diet_tags = [t for t in tag_list if t.strip().lower() in LOCAL_DIET_FLAGS]
+        return _rate_limited_result(e, _local_recipes(
+            diets=diet_tags,
+            tags=[t for t in tag_list if t not in diet_tags],
+            number=number,
+        ))
     except httpx.HTTPStatusError as e:
         return {
             'status': 'error',
@@ -0,0 +1,243 @@
+"""
+Precompiled Tool Specs for HOH Meal Agent
+
+strands' @tool builds a Pydantic input model and JSON schema for every
+tool function when its module is imported, on every cold start, although
+the HOH tool signatures only change with a deploy.
+
+build.sh freezes the specs into tools/tool_specs.json:
+
+    {"<tool name>": {"fingerprint": "...", "spec": {...}}}
+
+At import, `tool` registers each function straight from the manifest and
+validates arguments against the frozen JSON schema (required fields,
+defaults, JSON types with Pydantic-style lax coercion) instead of a
+Pydantic model. The fingerprint covers the function's signature and
+docstring, so a tool edited since the manifest was built - or a tree with
+no manifest at all, as in development and tests - falls back to strands'
+own decorator.
+
+Rebuild the manifest with:
+
+    TOOL_SPEC_MANIFEST= python -m tools.tool_specs <output path>
+"""
+
+import os
+import sys
+import copy
+import json
+import inspect
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from strands import tool as strands_tool
+from strands.tools.decorator import DecoratedFunctionTool
+
+logger = logging.getLogger()
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tool_specs.json')
+
+# Path of the frozen manifest; empty disables the fast path
+TOOL_SPEC_MANIFEST = os.getenv('TOOL_SPEC_MANIFEST', DEFAULT_MANIFEST_PATH)
+
+# Modules whose tools go into the manifest
+TOOL_MODULES = ('tools.dynamo_tools', 'tools.spoonacular_tools', 'tools.shopping_list')
+
+_manifest: Optional[Dict[str, Any]] = None
+_manifest_lock = threading.Lock()
+
+
+def fingerprint(func: Callable[..., Any]) -> str:
+    """Hash of what a tool spec is derived from: name, signature and docstring."""
+    source = '\n'.join([func.__name__, str(inspect.signature(func)), inspect.getdoc(func) or ''])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+def load_manifest(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the frozen manifest once per container ({} when absent or disabled)."""
+    global _manifest
+
+    if path is not None:
+        return _read_manifest(path)
+
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = _read_manifest(TOOL_SPEC_MANIFEST)
+    return _manifest
+
+
+def _read_manifest(path: str) -> Dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable tool spec manifest {path}: {e}")
+        return {}
+
+
+class ManifestToolMetadata:
+    """Argument validation for a tool registered from its frozen spec.
+
+    Stands in for strands' FunctionToolMetadata inside DecoratedFunctionTool:
+    the same validate_input / inject_special_parameters contract, checked
+    against the JSON schema instead of a Pydantic model.
+    """
+
+    def __init__(self, func: Callable[..., Any], spec: Dict[str, Any]):
+        self.func = func
+        self.signature = inspect.signature(func)
+        schema = spec['inputSchema']['json']
+        self.properties: Dict[str, Dict[str, Any]] = schema.get('properties', {})
+        self.required = set(schema.get('required', []))
+        self.defaults = {
+            name: param.default
+            for name, param in self.signature.parameters.items()
+            if param.default is not inspect.Parameter.empty
+        }
+
+    def validate_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return every parameter with defaults filled in; unknown keys are dropped.
+
+        Raises:
+            ValueError: If a required parameter is missing or a value has the wrong type
+        """
+        validated = {}
+        errors = []
+        for name, prop in self.properties.items():
+            if name not in input_data:
+                if name in self.required:
+                    errors.append(f"{name}: Field required")
+                else:
+                    validated[name] = copy.deepcopy(self.defaults.get(name, prop.get('default')))
+                continue
+            try:
+                validated[name] = _coerce(input_data[name], prop, nullable=self.defaults.get(name, 0) is None)
+            except ValueError as e:
+                errors.append(f"{name}: {e}")
+
+        if errors:
+            raise ValueError(f"Validation failed for input parameters: {'; '.join(errors)}")
+        return validated
+
+    def inject_special_parameters(self, validated_input: Dict[str, Any], tool_use: Any, invocation_state: Dict[str, Any]) -> None:
+        # Same backward-compatible agent injection as strands; HOH tools take no context parameter
+        if 'agent' in self.signature.parameters and 'agent' in invocation_state:
+            validated_input['agent'] = invocation_state['agent']
+
+
+def _coerce(value: Any, prop: Dict[str, Any], nullable: bool = False) -> Any:
+    """Check a value against a JSON schema property, converting like Pydantic's lax mode."""
+    if value is None and (nullable or prop.get('type') == 'null'):
+        return None
+
+    if 'anyOf' in prop:
+        for option in prop['anyOf']:
+            try:
+                return _coerce(value, option)
+            except ValueError:
+                continue
+        raise ValueError(f"Input does not match any allowed type: {value!r}")
+
+    expected = prop.get('type')
+    if expected is None:
+        return value
+    if expected == 'string' and isinstance(value, str):
+        return value
+    if expected == 'integer':
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+            return int(value)
+    if expected == 'number':
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    if expected == 'boolean':
+        if isinstance(value, bool):
+            return value
+        if value in (0, 1):
+            return bool(value)
+        if isinstance(value, str) and value.lower() in ('true', 'false', 'yes', 'no', '1', '0'):
+            return value.lower() in ('true', 'yes', '1')
+    if expected == 'array' and isinstance(value, (list, tuple)):
+        items = prop.get('items')
+        return [_coerce(item, items) for item in value] if items else list(value)
+    if expected == 'object' and isinstance(value, dict):
+        return value
+    raise ValueError(f"Input should be a valid {expected}, got {type(value).__name__}")
+
+
+def tool(func: Callable[..., Any]) -> DecoratedFunctionTool:
+    """Drop-in for strands' @tool that registers from the frozen manifest when it is current."""
+    entry = load_manifest().get(func.__name__)
+    if entry and entry.get('fingerprint') == fingerprint(func):
+        return manifest_tool(func, entry['spec'])
+    if entry:
+        logger.warning(f"Tool spec manifest is stale for {func.__name__}; building spec at import")
+    return strands_tool(func)
+
+
+def manifest_tool(func: Callable[..., Any], spec: Dict[str, Any]) -> DecoratedFunctionTool:
+    """Wrap a function as a strands tool using a precompiled spec."""
+    spec = copy.deepcopy(spec)
+    return DecoratedFunctionTool(spec['name'], spec, func, ManifestToolMetadata(func, spec))
+
+
+def build_manifest(tools: List[DecoratedFunctionTool]) -> Dict[str, Any]:
+    """Freeze the specs strands generates for these tools, already normalized and validated."""
+    from strands.tools.registry import ToolRegistry
+    from strands.tools.tools import normalize_tool_spec
+
+    registry = ToolRegistry()
+    manifest = {}
+    for agent_tool in tools:
+        spec = normalize_tool_spec(copy.deepcopy(agent_tool.tool_spec))
+        registry.validate_tool_spec(spec)
+        manifest[agent_tool.tool_name] = {
+            'fingerprint': fingerprint(agent_tool._tool_func),
+            'spec': spec,
+        }
+    return manifest
+
+
+def collect_tools(module_names=TOOL_MODULES) -> List[DecoratedFunctionTool]:
+    """Every @tool defined in the given modules."""
+    import importlib
+
+    found = []
+    for module_name in module_names:
+        module = importlib.import_module(module_name)
+        found.extend(
+            value for value in vars(module).values()
+            if isinstance(value, DecoratedFunctionTool) and value.__module__ == module.__name__
+        )
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    output = argv[0] if argv else DEFAULT_MANIFEST_PATH
+    if load_manifest():
+        print("Set TOOL_SPEC_MANIFEST= so specs are generated, not copied from an existing manifest", file=sys.stderr)
+        return 1
+
+    manifest = build_manifest(collect_tools())
+    with open(output, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    print(f"Wrote {len(manifest)} tool specs to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,501 @@
+"""
+Deterministic Weekly Meal Planner for HOH
+
+Builds a 21-meal weekly plan without an LLM tool loop. Candidate recipe
+pools are pulled from the Spoonacular tools in parallel, then each
+(day, meal type) slot is filled by a scoring pass that enforces the hard
+constraints (allergies, cooking time, no repeats, recently used recipes)
+and rewards cuisine/protein rotation and the household's likes.
+
+The LLM is only used afterwards for the short explanation text.
+"""
+
+import re
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger()
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+DAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Max readyInMinutes per cookingTime preference (None = no limit)
+COOKING_TIME_LIMITS = {
+    'quick': 20,
+    'medium': 45,
+    'elaborate': None,
+}
+
+# Tags for the Spoonacular random/search endpoints per meal type
+POOL_TAGS = {
+    'breakfast': 'breakfast',
+    'lunch': 'lunch,main course',
+    'dinner': 'dinner,main course',
+}
+POOL_SEARCH_TYPES = {
+    'breakfast': 'breakfast',
+    'lunch': 'main course',
+    'dinner': 'main course',
+}
+POOL_SIZE = 20
+
+# Keyword -> protein group, used for rotation
+PROTEIN_KEYWORDS = {
+    'chicken': 'chicken',
+    'beef': 'beef',
+    'steak': 'beef',
+    'pork': 'pork',
+    'bacon': 'pork',
+    'ham': 'pork',
+    'sausage': 'pork',
+    'turkey': 'turkey',
+    'lamb': 'lamb',
+    'salmon': 'fish',
+    'tuna': 'fish',
+    'cod': 'fish',
+    'fish': 'fish',
+    'shrimp': 'seafood',
+    'prawn': 'seafood',
+    'crab': 'seafood',
+    'tofu': 'vegetarian',
+    'lentil': 'vegetarian',
+    'chickpea': 'vegetarian',
+    'bean': 'vegetarian',
+    'egg': 'egg',
+}
+
+# Keywords that make a title unsafe for a given allergy (belt and braces on
+# top of Spoonacular's intolerance filter)
+ALLERGY_KEYWORDS = {
+    'peanut': ['peanut'],
+    'peanuts': ['peanut'],
+    'tree nut': ['almond', 'walnut', 'pecan', 'cashew', 'pistachio', 'hazelnut'],
+    'tree nuts': ['almond', 'walnut', 'pecan', 'cashew', 'pistachio', 'hazelnut'],
+    'shellfish': ['shrimp', 'prawn', 'crab', 'lobster', 'scallop', 'clam', 'mussel', 'oyster'],
+    'fish': ['salmon', 'tuna', 'cod', 'fish', 'anchov', 'tilapia'],
+    'dairy': ['cheese', 'milk', 'cream', 'butter', 'yogurt'],
+    'egg': ['egg', 'omelet', 'frittata', 'quiche'],
+    'eggs': ['egg', 'omelet', 'frittata', 'quiche'],
+    'gluten': ['bread', 'pasta', 'noodle', 'flour', 'toast', 'pancake', 'waffle'],
+    'wheat': ['bread', 'pasta', 'noodle', 'flour', 'toast', 'pancake', 'waffle'],
+    'soy': ['tofu', 'soy', 'edamame', 'tempeh'],
+    'sesame': ['sesame', 'tahini'],
+}
+
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r'\s+', ' ', (name or '').strip().lower())
+
+
+def _protein_of(recipe: dict) -> str:
+    title = _normalize_name(recipe.get('title', ''))
+    for keyword, protein in PROTEIN_KEYWORDS.items():
+        if keyword in title:
+            return protein
+    return 'other'
+
+
+def _cuisine_of(recipe: dict) -> str:
+    cuisines = recipe.get('cuisines') or []
+    return cuisines[0].lower() if cuisines else 'other'
+
+
+def _allergy_keywords(allergies: List[str]) -> List[str]:
+    keywords = []
+    for allergy in allergies:
+        key = _normalize_name(allergy)
+        keywords.extend(ALLERGY_KEYWORDS.get(key, [key]))
+    return keywords
+
+
+def _diet_labels(recipe: dict) -> set:
+    from tools.recipe_corpus import DIET_ALIASES
+
+    labels = set()
+    for label in recipe.get('diets') or []:
+        label = _normalize_name(label)
+        labels.update(DIET_ALIASES.get(label, [label]))
+    return labels
+
+
+def planner_blockers(context: dict) -> List[str]:
+    """Household needs the deterministic planner cannot enforce.
+
+    The planner only checks Spoonacular diets, classified allergies and one
+    shared menu, so any restriction without a Spoonacular diet, allergy
+    without a classification, or member who eats separately sends the
+    household to the agent.
+    """
+    from tools.spoonacular_tools import DIET_MAP
+    from tools.compliance import ALLERGEN_BITS
+
+    aggregated = context.get('aggregatedNeeds', {})
+    blockers = [
+        f"restriction '{r}' has no Spoonacular diet"
+        for r in aggregated.get('allRestrictions', [])
+        if r.strip().lower() not in DIET_MAP
+    ]
+    blockers += [
+        f"allergy '{a}' cannot be checked"
+        for a in aggregated.get('allAllergies', [])
+        if _normalize_name(a).replace('-', ' ') not in ALLERGEN_BITS
+    ]
+    blockers += [
+        f"{m.get('name', 'a member')} eats separate meals"
+        for m in context.get('members', [])
+        if not m.get('sameAsAdults', True)
+    ]
+    return blockers
+
+
+def fetch_candidate_pools(context: dict, pool_size: int = POOL_SIZE) -> Dict[str, List[dict]]:
+    """Fetch candidate recipes for every meal type concurrently.
+
+    When the household has allergies or dietary restrictions the filtered
+    complexSearch endpoint is used so Spoonacular excludes unsafe recipes
+    (every mapped diet is required); otherwise random recipes are mixed with
+    a random-sorted search.
+
+    Returns:
+        Dictionary mapping meal type to a list of recipe summaries
+    """
+    from tools.spoonacular_tools import search_recipes, get_random_recipes, _map_diet
+
+    aggregated = context.get('aggregatedNeeds', {})
+    allergies = aggregated.get('allAllergies', [])
+    restrictions = aggregated.get('allRestrictions', [])
+    cooking_time = context.get('preferences', {}).get('cookingTime', 'medium')
+    max_ready_time = COOKING_TIME_LIMITS.get(cooking_time)
+
+    diet = _map_diet(restrictions)
+    intolerances = ','.join(allergies) if allergies else None
+    filtered = bool(diet or intolerances)
+
+    calls = []
+    for meal_type in MEAL_TYPES:
+        calls.append((meal_type, search_recipes, {
+            'query': '',
+            'meal_type': POOL_SEARCH_TYPES[meal_type],
+            'diet': diet,
+            'intolerances': intolerances,
+            'max_ready_time': max_ready_time,
+            'number': pool_size,
+            'sort': 'random',
+        }))
+        if not filtered:
+            calls.append((meal_type, get_random_recipes, {
+                'number': pool_size,
+                'tags': POOL_TAGS[meal_type],
+            }))
+
+    pools: Dict[str, List[dict]] = {meal_type: [] for meal_type in MEAL_TYPES}
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [
+            (meal_type, executor.submit(fn, **kwargs))
+            for meal_type, fn, kwargs in calls
+        ]
+        for meal_type, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Candidate pool fetch failed for {meal_type}: {e}")
+                continue
+            if result.get('status') == 'success':
+                pools[meal_type].extend(result.get('recipes', []))
+            else:
+                logger.warning(f"Candidate pool fetch failed for {meal_type}: {result.get('error')}")
+
+    return pools
+
+
+def compact_candidates(
+    pools: Dict[str, List[dict]],
+    recent_recipes: List[str],
+    per_meal_type: int = 15,
+) -> str:
+    """Render candidate pools as compact prompt lines (id | title | minutes | cuisine).
+
+    Recently used recipes and duplicates are dropped so the model only sees
+    usable options.
+    """
+    recent = {_normalize_name(str(r)) for r in recent_recipes}
+    sections = []
+
+    for meal_type in MEAL_TYPES:
+        lines = []
+        seen = set()
+        for recipe in pools.get(meal_type, []):
+            recipe_id = recipe.get('id')
+            title = recipe.get('title', '')
+            if not recipe_id or recipe_id in seen:
+                continue
+            if str(recipe_id) in recent or _normalize_name(title) in recent:
+                continue
+            seen.add(recipe_id)
+            minutes = recipe.get('readyInMinutes') or '?'
+            lines.append(f"- {recipe_id} | {title} | {minutes} min | {_cuisine_of(recipe)}")
+            if len(lines) >= per_meal_type:
+                break
+        sections.append(f"{meal_type.title()}:\n" + ('\n'.join(lines) if lines else '- (none found)'))
+
+    return '\n\n'.join(sections)
+
+
+def hydrate_meals(meals: List[dict], pools: Dict[str, List[dict]]) -> List[dict]:
+    """Fill image, servings, time and source URL for meals picked from the candidate pools.
+
+    The model only has to emit recipe IDs and names for pooled recipes; the
+    remaining fields come from the data we already fetched.
+    """
+    index = {
+        str(recipe['id']): recipe
+        for pool in pools.values()
+        for recipe in pool
+        if recipe.get('id')
+    }
+
+    for meal in meals:
+        recipe = index.get(str(meal.get('recipeId', '')))
+        if not recipe:
+            continue
+        meal['recipeImage'] = meal.get('recipeImage') or recipe.get('image') or None
+        meal['readyInMinutes'] = meal.get('readyInMinutes') or recipe.get('readyInMinutes') or None
+        meal['servings'] = meal.get('servings') or recipe.get('servings') or None
+        meal['sourceUrl'] = meal.get('sourceUrl') or recipe.get('sourceUrl') or None
+
+    return meals
+
+
+def _score(
+    recipe: dict,
+    meal_type: str,
+    day_index: int,
+    history: Dict[str, list],
+    likes: List[str],
+    dislikes: List[str],
+    rng: random.Random,
+) -> float:
+    """Score a candidate for a slot; higher is better."""
+    title = _normalize_name(recipe.get('title', ''))
+    cuisine = _cuisine_of(recipe)
+    protein = _protein_of(recipe)
+
+    score = (recipe.get('healthScore') or 0) / 100.0
+
+    # Rotate cuisines and proteins across the week, harder for the same meal yesterday
+    cuisines_used = history['cuisines']
+    proteins_used = history['proteins']
+    if cuisine != 'other':
+        score -= 1.0 * cuisines_used.count(cuisine)
+    if protein != 'other':
+        score -= 1.0 * proteins_used.count(protein)
+
+    yesterday = history['slots'].get((day_index - 1, meal_type))
+    if yesterday:
+        if cuisine != 'other' and cuisine == _cuisine_of(yesterday):
+            score -= 3.0
+        if protein != 'other' and protein == _protein_of(yesterday):
+            score -= 3.0
+
+    score += sum(1.0 for like in likes if like and like in title)
+    score -= sum(5.0 for dislike in dislikes if dislike and dislike in title)
+
+    # Small jitter so equal-scoring candidates vary week to week
+    return score + rng.random() * 0.5
+
+
+def _user_meal(name: str, meal_type: str, date: str, day: str) -> dict:
+    slug = re.sub(r'[^a-z0-9]+', '-', _normalize_name(name)).strip('-')
+    return {
+        'date': date,
+        'day': day,
+        'mealType': meal_type,
+        'recipeId': f'user-{slug}-{date}',
+        'recipeName': name,
+        'recipeImage': None,
+        'readyInMinutes': None,
+        'servings': None,
+        'sourceUrl': None,
+        'source': 'user_preference',
+        'isUserMeal': True,
+    }
+
+
+def _recipe_meal(recipe: dict, meal_type: str, date: str, day: str) -> dict:
+    return {
+        'date': date,
+        'day': day,
+        'mealType': meal_type,
+        'recipeId': str(recipe['id']),
+        'recipeName': recipe.get('title', ''),
+        'recipeImage': recipe.get('image') or None,
+        'readyInMinutes': recipe.get('readyInMinutes') or None,
+        'servings': recipe.get('servings') or None,
+        'sourceUrl': recipe.get('sourceUrl') or None,
+        'source': 'ai_suggest',
+        'isUserMeal': False,
+    }
+
+
+def build_weekly_plan(
+    context: dict,
+    recent_recipes: List[str],
+    start_date: str,
+    pools: Dict[str, List[dict]],
+    seed: Optional[int] = None,
+    on_progress: Optional[Callable[[List[dict]], None]] = None,
+) -> Optional[List[dict]]:
+    """Assign a recipe to every (day, meal type) slot of the week.
+
+    Args:
+        context: Output of get_household_context
+        recent_recipes: Recipe IDs and lowercased names from recent plans (to avoid)
+        start_date: Start date in YYYY-MM-DD format
+        pools: Candidate recipes per meal type (see fetch_candidate_pools)
+        seed: Seed for tie-breaking jitter (None = different plan each run)
+        on_progress: Called with the meals so far after each day is filled
+
+    Returns:
+        List of 21 meal objects, or None if some slot could not be filled or
+        the household has needs the planner cannot enforce (see planner_blockers)
+    """
+    if planner_blockers(context):
+        return None
+
+    preferences = context.get('preferences', {})
+    aggregated = context.get('aggregatedNeeds', {})
+    mode = preferences.get('mealSuggestionMode', 'ai_and_user')
+    time_limit = COOKING_TIME_LIMITS.get(preferences.get('cookingTime', 'medium'))
+
+    rng = random.Random(seed)
+
+    from tools.compliance import forbidden_mask, is_compliant
+    from tools.spoonacular_tools import _map_diets
+
+    recent = {_normalize_name(str(r)) for r in recent_recipes}
+    unsafe_keywords = _allergy_keywords(aggregated.get('allAllergies', []))
+    # Precomputed ingredient masks settle allergies/diets for recipes we have details for
+    forbidden = forbidden_mask(aggregated.get('allAllergies', []), aggregated.get('allRestrictions', []))
+    # Every diet must be labelled on the recipe (search results carry the diets Spoonacular filtered for)
+    diets = [_normalize_name(d) for d in _map_diets(aggregated.get('allRestrictions', []))]
+    dislikes = [_normalize_name(d) for d in aggregated.get('allDislikes', [])]
+    likes = [
+        _normalize_name(like)
+        for member in context.get('members', [])
+        for like in member.get('likes', [])
+    ]
+
+    typical = {
+        'breakfast': preferences.get('typicalBreakfast', []),
+        'lunch': preferences.get('typicalLunch', []),
+        'dinner': preferences.get('typicalDinner', []),
+    }
+
+    def eligible(recipe: dict) -> bool:
+        if not recipe.get('id') or not recipe.get('title'):
+            return False
+        title = _normalize_name(recipe['title'])
+        if str(recipe['id']) in recent or title in recent:
+            return False
+        if any(keyword in title for keyword in unsafe_keywords):
+            return False
+        if forbidden and is_compliant(recipe.get('compliance'), forbidden) is False:
+            return False
+        if diets and not set(diets) <= _diet_labels(recipe):
+            return False
+        ready = recipe.get('readyInMinutes') or 0
+        if time_limit and ready > time_limit:
+            return False
+        return True
+
+    # Deduplicate pools by ID and drop ineligible candidates up front
+    candidates: Dict[str, List[dict]] = {}
+    for meal_type in MEAL_TYPES:
+        seen = set()
+        candidates[meal_type] = []
+        for recipe in pools.get(meal_type, []):
+            if recipe.get('id') in seen or not eligible(recipe):
+                continue
+            seen.add(recipe.get('id'))
+            candidates[meal_type].append(recipe)
+
+    # Lunch and dinner can borrow from each other's pools
+    fallbacks = {'breakfast': [], 'lunch': ['dinner'], 'dinner': ['lunch']}
+
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    used_ids = set()
+    used_titles = set()
+    history = {'cuisines': [], 'proteins': [], 'slots': {}}
+    typical_used = {meal_type: 0 for meal_type in MEAL_TYPES}
+    meals = []
+
+    def next_typical(meal_type: str) -> str:
+        options = typical[meal_type]
+        name = options[typical_used[meal_type] % len(options)]
+        typical_used[meal_type] += 1
+        return name
+
+    for day_index in range(7):
+        day_date = start + timedelta(days=day_index)
+        date = day_date.strftime('%Y-%m-%d')
+        day = DAY_NAMES[day_date.weekday()]
+
+        for meal_type in MEAL_TYPES:
+            # Typical meals: every slot in user_preference mode, alternate days in ai_and_user
+            use_typical = typical[meal_type] and (
+                mode == 'user_preference' or (mode == 'ai_and_user' and day_index % 2 == 0)
+            )
+            if use_typical:
+                meals.append(_user_meal(next_typical(meal_type), meal_type, date, day))
+                continue
+
+            pool = list(candidates[meal_type])
+            for other in fallbacks[meal_type]:
+                pool.extend(candidates[other])
+
+            best = None
+            best_score = float('-inf')
+            for recipe in pool:
+                title = _normalize_name(recipe['title'])
+                if recipe['id'] in used_ids or title in used_titles:
+                    continue
+                score = _score(recipe, meal_type, day_index, history, likes, dislikes, rng)
+                if score > best_score:
+                    best, best_score = recipe, score
+
+            if best is None:
+                if typical[meal_type]:
+                    # Out of candidates - fall back to the family's own meals
+                    meals.append(_user_meal(next_typical(meal_type), meal_type, date, day))
+                    continue
+                logger.info(f"Planner ran out of candidates for {meal_type} on {date}")
+                return None
+
+            used_ids.add(best['id'])
+            used_titles.add(_normalize_name(best['title']))
+            history['cuisines'].append(_cuisine_of(best))
+            history['proteins'].append(_protein_of(best))
+            history['slots'][(day_index, meal_type)] = best
+            meals.append(_recipe_meal(best, meal_type, date, day))
+
+        if on_progress:
+            on_progress(list(meals))
+
+    return meals
+
+
+def summarize_plan(meals: List[dict]) -> str:
+    """Build a template explanation, used when the LLM explanation is unavailable."""
+    user_meals = sum(1 for m in meals if m.get('isUserMeal'))
+    ai_meals = len(meals) - user_meals
+
+    parts = [f"Planned {len(meals)} meals for the week"]
+    if user_meals:
+        parts.append(f"{user_meals} from your typical meals")
+    if ai_meals:
+        parts.append(f"{ai_meals} new recipes rotated across cuisines and proteins")
+    return ', '.join(parts) + ', with no repeats and your allergies and cooking time respected.'